@@ -0,0 +1,50 @@
+"""add upload_sessions and upload_chunks for resumable uploads
+
+Revision ID: 2f7a6c1d9b84
+Revises: 9c4d1a7e3f62
+Create Date: 2026-10-19 16:05:12.318240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7a6c1d9b84'
+down_revision: Union[str, Sequence[str], None] = '9c4d1a7e3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['file_id'], ['plant_files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('file_id'),
+    )
+    op.create_table(
+        'upload_chunks',
+        sa.Column('session_id', sa.String(length=36), nullable=False),
+        sa.Column('index', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['session_id'], ['upload_sessions.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('session_id', 'index'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('upload_chunks')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,31 @@
+"""index plant_files.file_path for shared content-addressed blobs
+
+Revision ID: 3e8d5f1a6b29
+Revises: b5a3e9c27d10
+Create Date: 2026-10-19 22:05:41.318640
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8d5f1a6b29'
+down_revision: Union[str, Sequence[str], None] = 'b5a3e9c27d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # blobs are deleted once no row references them
+    op.create_index(
+        op.f('ix_plant_files_file_path'), 'plant_files', ['file_path'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_plant_files_file_path'), table_name='plant_files')
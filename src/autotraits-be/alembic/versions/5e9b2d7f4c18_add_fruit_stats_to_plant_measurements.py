@@ -0,0 +1,44 @@
+"""add derived fruit statistics to plant_measurements
+
+Revision ID: 5e9b2d7f4c18
+Revises: a3f5c8d2e1b4
+Create Date: 2026-10-19 14:22:51.604317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9b2d7f4c18'
+down_revision: Union[str, Sequence[str], None] = 'a3f5c8d2e1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    ('fruit_width_mean', sa.Float),
+    ('fruit_width_median', sa.Float),
+    ('fruit_height_mean', sa.Float),
+    ('fruit_height_median', sa.Float),
+    ('fruit_mass_total', sa.Float),
+    ('fruit_mass_mean', sa.Float),
+    ('fruit_count_small', sa.Integer),
+    ('fruit_count_medium', sa.Integer),
+    ('fruit_count_large', sa.Integer),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled for existing rows by scripts/backfill_fruit_stats.py
+    for name, type_ in COLUMNS:
+        op.add_column('plant_measurements', sa.Column(name, type_(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(COLUMNS):
+        op.drop_column('plant_measurements', name)
@@ -0,0 +1,46 @@
+"""add plant_file_variants for 2D thumbnails and previews
+
+Revision ID: 6b1e4d8a2c57
+Revises: 2f7a6c1d9b84
+Create Date: 2026-10-19 17:41:03.527719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b1e4d8a2c57'
+down_revision: Union[str, Sequence[str], None] = '2f7a6c1d9b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by scripts/generate_variants.py
+    op.create_table(
+        'plant_file_variants',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('file_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'variant',
+            sa.Enum('THUMB', 'PREVIEW', name='filevariantenum'),
+            nullable=False,
+        ),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['file_id'], ['plant_files.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('file_id', 'variant', name='uix_file_variant'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('plant_file_variants')
+    sa.Enum(name='filevariantenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""on delete cascade for plant measurement, fruit and file foreign keys
+
+Revision ID: 7d1c9e2a5b36
+Revises: 4b8e2f1c7a90
+Create Date: 2026-10-19 11:03:27.540112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1c9e2a5b36'
+down_revision: Union[str, Sequence[str], None] = '4b8e2f1c7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (constraint, table, column, referred table); names are PostgreSQL's
+# defaults for the unnamed constraints created by earlier revisions
+FOREIGN_KEYS = [
+    ('plant_measurements_plant_id_fkey', 'plant_measurements', 'plant_id', 'plants'),
+    ('plant_fruits_measurement_id_fkey', 'plant_fruits', 'measurement_id', 'plant_measurements'),
+    ('plant_files_plant_id_fkey', 'plant_files', 'plant_id', 'plants'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(
+            name, table, referred, [column], ['id'], ondelete='CASCADE'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, column, referred in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'])
@@ -0,0 +1,161 @@
+"""partition plant_measurements and plant_fruits by date
+
+plant_measurements becomes range-partitioned by `date` and plant_fruits by a
+new `measurement_date` column, one partition per month plus a DEFAULT
+partition each. Partitioned tables need the partition key in every unique
+constraint, so the measurement primary key becomes (id, date) and fruits
+reference it with a composite foreign key. Later months are created by
+app.db.partitions.ensure_partitions at startup.
+
+PostgreSQL 15+ only: earlier versions turn a cross-partition UPDATE of a
+measurement's date into a DELETE for foreign key actions, which would
+cascade to its fruits. Rows are copied in one transaction; on large
+databases run it in a maintenance window.
+
+Revision ID: 9c4d1a7e3f62
+Revises: 5e9b2d7f4c18
+Create Date: 2026-10-19 15:08:44.193027
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1a7e3f62'
+down_revision: Union[str, Sequence[str], None] = '5e9b2d7f4c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONTHS_AHEAD = 3
+
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _create_partitions(first, last):
+    month = first.replace(day=1)
+    while month <= last:
+        for table in ('plant_measurements', 'plant_fruits'):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+            )
+        month = _next_month(month)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Move the current tables and their index-backed constraints aside
+    op.rename_table('plant_fruits', 'plant_fruits_unpartitioned')
+    op.rename_table('plant_measurements', 'plant_measurements_unpartitioned')
+    for table, name in [
+        ('plant_measurements_unpartitioned', 'plant_measurements_pkey'),
+        ('plant_measurements_unpartitioned', 'uix_plant_date'),
+        ('plant_fruits_unpartitioned', 'plant_fruits_pkey'),
+    ]:
+        op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {name} TO {name}_old')
+
+    # 2. Partitioned tables with the same columns (and id sequences)
+    op.execute(
+        'CREATE TABLE plant_measurements '
+        '(LIKE plant_measurements_unpartitioned INCLUDING DEFAULTS) '
+        'PARTITION BY RANGE (date)'
+    )
+    op.create_primary_key('plant_measurements_pkey', 'plant_measurements', ['id', 'date'])
+    op.create_unique_constraint('uix_plant_date', 'plant_measurements', ['plant_id', 'date'])
+    op.create_foreign_key(
+        'plant_measurements_plant_id_fkey', 'plant_measurements', 'plants',
+        ['plant_id'], ['id'], ondelete='CASCADE',
+    )
+
+    op.execute(
+        'CREATE TABLE plant_fruits '
+        '(LIKE plant_fruits_unpartitioned INCLUDING DEFAULTS, '
+        'measurement_date date NOT NULL) '
+        'PARTITION BY RANGE (measurement_date)'
+    )
+    op.create_primary_key('plant_fruits_pkey', 'plant_fruits', ['id', 'measurement_date'])
+    op.create_foreign_key(
+        'plant_fruits_measurement_fkey', 'plant_fruits', 'plant_measurements',
+        ['measurement_id', 'measurement_date'], ['id', 'date'],
+        ondelete='CASCADE', onupdate='CASCADE',
+    )
+    op.create_index(
+        'ix_plant_fruits_measurement', 'plant_fruits', ['measurement_id', 'measurement_date']
+    )
+
+    # 3. Monthly partitions from the oldest measurement to MONTHS_AHEAD
+    today = date.today().replace(day=1)
+    oldest = op.get_bind().scalar(
+        sa.text('SELECT min(date) FROM plant_measurements_unpartitioned')
+    )
+    last = today
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    _create_partitions(min(oldest or today, today), last)
+    for table in ('plant_measurements', 'plant_fruits'):
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    # 4. Copy the rows, hand the id sequences over, drop the old tables
+    op.execute(
+        'INSERT INTO plant_measurements SELECT * FROM plant_measurements_unpartitioned'
+    )
+    op.execute(
+        'INSERT INTO plant_fruits '
+        'SELECT f.*, m.date FROM plant_fruits_unpartitioned f '
+        'JOIN plant_measurements_unpartitioned m ON m.id = f.measurement_id'
+    )
+    op.execute('ALTER SEQUENCE plant_measurements_id_seq OWNED BY plant_measurements.id')
+    op.execute('ALTER SEQUENCE plant_fruits_id_seq OWNED BY plant_fruits.id')
+    op.drop_table('plant_fruits_unpartitioned')
+    op.drop_table('plant_measurements_unpartitioned')
+    op.execute('ANALYZE plant_measurements')
+    op.execute('ANALYZE plant_fruits')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('plant_fruits', 'plant_fruits_partitioned')
+    op.rename_table('plant_measurements', 'plant_measurements_partitioned')
+    for table, name in [
+        ('plant_measurements_partitioned', 'plant_measurements_pkey'),
+        ('plant_measurements_partitioned', 'uix_plant_date'),
+        ('plant_fruits_partitioned', 'plant_fruits_pkey'),
+    ]:
+        op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {name} TO {name}_old')
+    op.execute('ALTER INDEX ix_plant_fruits_measurement RENAME TO ix_plant_fruits_measurement_old')
+
+    op.execute(
+        'CREATE TABLE plant_measurements '
+        '(LIKE plant_measurements_partitioned INCLUDING DEFAULTS)'
+    )
+    op.execute(
+        'CREATE TABLE plant_fruits (LIKE plant_fruits_partitioned INCLUDING DEFAULTS)'
+    )
+    op.execute('INSERT INTO plant_measurements SELECT * FROM plant_measurements_partitioned')
+    op.execute('INSERT INTO plant_fruits SELECT * FROM plant_fruits_partitioned')
+    op.drop_column('plant_fruits', 'measurement_date')
+
+    op.create_primary_key('plant_measurements_pkey', 'plant_measurements', ['id'])
+    op.create_unique_constraint('uix_plant_date', 'plant_measurements', ['plant_id', 'date'])
+    op.create_foreign_key(
+        'plant_measurements_plant_id_fkey', 'plant_measurements', 'plants',
+        ['plant_id'], ['id'], ondelete='CASCADE',
+    )
+    op.create_primary_key('plant_fruits_pkey', 'plant_fruits', ['id'])
+    op.create_foreign_key(
+        'plant_fruits_measurement_id_fkey', 'plant_fruits', 'plant_measurements',
+        ['measurement_id'], ['id'], ondelete='CASCADE',
+    )
+
+    op.execute('ALTER SEQUENCE plant_measurements_id_seq OWNED BY plant_measurements.id')
+    op.execute('ALTER SEQUENCE plant_fruits_id_seq OWNED BY plant_fruits.id')
+    # dropping a partitioned table drops its partitions
+    op.drop_table('plant_fruits_partitioned')
+    op.drop_table('plant_measurements_partitioned')
@@ -0,0 +1,31 @@
+"""add fruits_packed to plant_measurements
+
+Revision ID: a3f5c8d2e1b4
+Revises: 7d1c9e2a5b36
+Create Date: 2026-10-19 13:41:09.271853
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f5c8d2e1b4'
+down_revision: Union[str, Sequence[str], None] = '7d1c9e2a5b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by scripts/backfill_packed_fruits.py
+    op.add_column(
+        'plant_measurements', sa.Column('fruits_packed', sa.LargeBinary(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('plant_measurements', 'fruits_packed')
@@ -0,0 +1,45 @@
+"""add blob size, etag and created_at to plant_files
+
+Revision ID: b5a3e9c27d10
+Revises: d84f2b7c1e93
+Create Date: 2026-10-19 20:34:18.775102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5a3e9c27d10'
+down_revision: Union[str, Sequence[str], None] = 'd84f2b7c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('plant_files', sa.Column('size', sa.BigInteger(), nullable=True))
+    op.add_column('plant_files', sa.Column('etag', sa.String(), nullable=True))
+    # existing rows count as created now: PENDING ones expire a TTL from here
+    op.add_column(
+        'plant_files',
+        sa.Column(
+            'created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True
+        ),
+    )
+    op.create_index(
+        'ix_plant_files_unsettled',
+        'plant_files',
+        ['id'],
+        postgresql_where=sa.text("status <> 'COMPLETED'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_plant_files_unsettled', table_name='plant_files')
+    op.drop_column('plant_files', 'created_at')
+    op.drop_column('plant_files', 'etag')
+    op.drop_column('plant_files', 'size')
@@ -0,0 +1,48 @@
+"""add point cloud level-of-detail variants
+
+Revision ID: d84f2b7c1e93
+Revises: 6b1e4d8a2c57
+Create Date: 2026-10-19 19:12:47.906251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84f2b7c1e93'
+down_revision: Union[str, Sequence[str], None] = '6b1e4d8a2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ALTER TYPE ... ADD VALUE cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE filevariantenum ADD VALUE IF NOT EXISTS 'LOD'")
+    op.add_column(
+        'plant_file_variants',
+        sa.Column('level', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'plant_file_variants', sa.Column('point_count', sa.BigInteger(), nullable=True)
+    )
+    op.drop_constraint('uix_file_variant', 'plant_file_variants', type_='unique')
+    op.create_unique_constraint(
+        'uix_file_variant', 'plant_file_variants', ['file_id', 'variant', 'level']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the enum keeps its LOD value: PostgreSQL cannot drop enum values
+    op.execute("DELETE FROM plant_file_variants WHERE variant = 'LOD'")
+    op.drop_constraint('uix_file_variant', 'plant_file_variants', type_='unique')
+    op.create_unique_constraint(
+        'uix_file_variant', 'plant_file_variants', ['file_id', 'variant']
+    )
+    op.drop_column('plant_file_variants', 'point_count')
+    op.drop_column('plant_file_variants', 'level')
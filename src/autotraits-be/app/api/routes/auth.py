@@ -3,16 +3,17 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
 )
 from app.db.models import Breeder, User
-from app.dependencies import get_db
+from app.dependencies import check_token_version, get_db
 from app.schemas import UserCreate, UserInDB
 
 router = APIRouter()
@@ -21,13 +22,20 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # 7 days
 
 
-# ======= AUTH API =======
-@router.post("/signup", response_model=UserInDB)
-def signup(user: UserCreate, db: Session = Depends(get_db)):
+# Password hashing runs in the password process pool (see app.core.security);
+# the async routes below only hop to the threadpool for their short DB calls.
+def _check_signup(db: Session, user: UserCreate):
     existing = db.query(User).filter(User.email == user.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
+    if not user.breeder_name and user.role != "admin":
+        # breeder required for normal users
+        raise HTTPException(
+            status_code=400, detail="Breeder name required for non-admins"
+        )
+
 
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     breeder = None
     if user.breeder_name:
         breeder = db.query(Breeder).filter(Breeder.name == user.breeder_name).first()
@@ -36,15 +44,10 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
             db.add(breeder)
             db.commit()
             db.refresh(breeder)
-    elif user.role != "admin":
-        # breeder required for normal users
-        raise HTTPException(
-            status_code=400, detail="Breeder name required for non-admins"
-        )
 
     db_user = User(
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=hashed_password,
         full_name=user.full_name,
         role=user.role or "user",
         breeder_id=breeder.id if breeder else None,
@@ -55,25 +58,58 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
+def _get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _store_password_hash(db: Session, user_id: int, hashed_password: str):
+    db.query(User).filter(User.id == user_id).update(
+        {User.hashed_password: hashed_password}, synchronize_session=False
+    )
+    db.commit()
+
+
+# ======= AUTH API =======
+@router.post("/signup", response_model=UserInDB)
+async def signup(user: UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_signup, db, user)
+    hashed_password = await hash_password_async(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+
 @router.post("/login")
-def login(
+async def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_email, db, form_data.username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password_async(
+        form_data.password, user.hashed_password
+    )
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     access_token = create_access_token(
-        {"user_id": user.id, "breeder_id": user.breeder_id, "role": user.role},
+        {
+            "user_id": user.id,
+            "breeder_id": user.breeder_id,
+            "role": user.role,
+            "ver": user.token_version,
+        },
         timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
     refresh_token = create_refresh_token(
-        {"user_id": user.id},
+        {"user_id": user.id, "ver": user.token_version},
         timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
     )
 
+    # Transparent rehash when BCRYPT_ROUNDS changed since the hash was made
+    if new_hash:
+        await run_in_threadpool(_store_password_hash, db, user.id, new_hash)
+
     # Set HttpOnly cookies
     response.set_cookie(
         key="access_token",
@@ -110,9 +146,15 @@ def refresh_token_endpoint(
     user = db.query(User).filter(User.id == payload.user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    check_token_version(payload, user.token_version)
 
     new_access_token = create_access_token(
-        {"user_id": user.id, "breeder_id": user.breeder_id, "role": user.role},
+        {
+            "user_id": user.id,
+            "breeder_id": user.breeder_id,
+            "role": user.role,
+            "ver": user.token_version,
+        },
         timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.coalesce import single_flight
+from app.db.models import Role
+from app.db.session import pool_metrics
+from app.dependencies import get_current_principal
+from app.schemas import Principal
+
+router = APIRouter()
+
+
+# ========== METRICS (admin only) ==========
+@router.get("/metrics/coalescing")
+def get_coalescing_metrics(current_user: Principal = Depends(get_current_principal)):
+    """
+    Per-function counters of the read coalescer for this worker process:
+    calls, executions against the DB, and calls served by an in-flight twin.
+    """
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return single_flight.metrics()
+
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(current_user: Principal = Depends(get_current_principal)):
+    """
+    Connection pool state of the worker process serving this request:
+    checked-out/overflow connections, checkout wait time and timeouts.
+    """
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return pool_metrics()
@@ -1,19 +1,36 @@
+import asyncio
 import uuid
 from datetime import date
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Form, File, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.adls import generate_sas_url, upload_to_blob
-from app.dependencies import get_db, get_current_user
+from app.core.conf import settings
+from app.core.storage import get_storage
+from app.core.storage.upload import (
+    UploadTooLargeError,
+    block_id,
+    file_blobs,
+    hash_upload,
+    release_blobs,
+    store_content_addressed,
+)
+from app.dependencies import get_async_db, get_db, get_current_principal
 import app.crud as crud
-from app.db.models import Role, User, PlantFile
+from app.db.models import Role, PlantFile, FileVariantEnum
 
 from app.schemas import (
     FileTypeEnum,
     FileStatusEnum,
     BulkUploadRequest,
+    ImageVariantEnum,
     StatusUpdateRequest,
+    UploadManifestItem,
+    UploadSessionCreate,
+    Principal,
 )
 
 router = APIRouter()
@@ -42,40 +59,101 @@ router = APIRouter()
 #     return file
 
 
-# @router.delete("/files/{file_id}", response_model=FileInDB)
-# def delete_file_route(file_id: int, db: Session = Depends(get_db)):
-#     return crud.delete_file(db, file_id)
+@router.delete("/files/{file_id}")
+def delete_file_route(
+    file_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Delete a plant file with its variants. The blob is deleted too unless
+    another file shares it (identical uploads share one blob).
+    """
+    file = crud.get_file(db, file_id)
+    if not file or (
+        current_user.role != Role.ADMIN
+        and file.plant.breeder_id != current_user.breeder_id
+    ):
+        raise HTTPException(status_code=404, detail="File not found")
+    blobs = file_blobs([file])
+    crud.delete_file(db, file_id)
+    release_blobs(db, get_storage(), blobs)
+    return {"deleted": file_id}
 
 
 @router.get("/plant/{plant_code}/images")
-def get_plant_images(
+async def get_plant_images(
     plant_code: str,
     file_type: FileTypeEnum,  # This expects 'TWO_D' or 'THREE_D'
     date: Optional[date] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    variant: ImageVariantEnum = ImageVariantEnum.ORIGINAL,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
+    """
+    Files of a plant with read URLs. `variant=thumb|preview` links the WebP
+    rendition instead of the original, for files that have one yet. 3D files
+    also list their levels of detail (`lods`, coarsest first), so a viewer
+    can draw a coarse cloud first and refine it.
+    """
     try:
+        with_variants = (
+            variant != ImageVariantEnum.ORIGINAL or file_type == FileTypeEnum.THREE_D
+        )
         if current_user.role == Role.ADMIN:
-            files = crud.get_plant_files(db, plant_code, file_type, date)
+            files = await crud.get_plant_files_async(
+                db, plant_code, file_type, date, with_variants=with_variants
+            )
         else:
-            files = crud.get_plant_files(
-                db, plant_code, file_type, date, current_user.breeder_id
+            files = await crud.get_plant_files_async(
+                db,
+                plant_code,
+                file_type,
+                date,
+                current_user.breeder_id,
+                with_variants=with_variants,
             )
 
+        paths = {}  # file id -> (blob served, variant)
+        lods = {}  # file id -> LOD variants by level
+        for f in files:
+            paths[f.id] = (f.file_path, ImageVariantEnum.ORIGINAL)
+            lods[f.id] = []
+            for v in f.variants if with_variants else ():
+                if v.variant == FileVariantEnum.LOD:
+                    lods[f.id].append(v)
+                elif v.variant.value == variant.value:
+                    paths[f.id] = (v.file_path, variant)
+            lods[f.id].sort(key=lambda v: v.level)
+
+        # files whose upload failed before the content was named have no blob
+        urls = get_storage().presign_read(
+            [path for path, _ in paths.values() if path]
+            + [v.file_path for levels in lods.values() for v in levels]
+        )
         result = []
         for f in files:
-            sas_url = generate_sas_url(f.file_path)
-            result.append(
-                {
-                    "id": f.id,
-                    "plant_id": f.plant_id,
-                    "url": sas_url,
-                    "file_type": f.file_type,
-                    "date": f.date,
-                    "status": f.status,
-                }
-            )
+            path, served = paths[f.id]
+            item = {
+                "id": f.id,
+                "plant_id": f.plant_id,
+                "url": urls[path] if path else None,
+                "variant": served,
+                "file_type": f.file_type,
+                "date": f.date,
+                "status": f.status,
+            }
+            if f.file_type == FileTypeEnum.THREE_D:
+                item["lods"] = [
+                    {
+                        "level": v.level,
+                        "url": urls[v.file_path],
+                        "point_count": v.point_count,
+                        "size": v.size,
+                    }
+                    for v in lods[f.id]
+                ]
+            result.append(item)
         return result
 
     except Exception as e:
@@ -89,7 +167,7 @@ def create_upload_and_register(
     file_type: FileTypeEnum,
     extension: str,  # let client specify, e.g. "jpg", "png", "ply"
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Generate an upload SAS URL and register the file in DB as 'pending'.
@@ -98,7 +176,7 @@ def create_upload_and_register(
         # Generate blob path
         blob_name = f"{uuid.uuid4()}.{extension}"
         # Generate upload SAS URL
-        upload_url = generate_sas_url(blob_name, isUpload=True)
+        upload_url = get_storage().presign_write(blob_name)
         # Register in DB
         file_record = crud.create_plant_file(
             db=db,
@@ -122,8 +200,25 @@ def create_upload_and_register(
         raise HTTPException(status_code=500, detail=f"SAS generation failed: {str(e)}")
 
 
+def _check_extension(extension: str, file_type: FileTypeEnum):
+    # Validate extension
+    if extension not in ["png", "ply"]:
+        raise HTTPException(status_code=400, detail="Unsupported file extension")
+
+    # Check if extension matches file_type
+    if (file_type == FileTypeEnum.TWO_D and extension != "png") or (
+        file_type == FileTypeEnum.THREE_D and extension != "ply"
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File extension {extension} does not match file_type {file_type}",
+        )
+
+
 # user upload multi-part/form data
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+# whole multipart request (file + form fields), see BodySizeLimitMiddleware
+MAX_UPLOAD_BODY_SIZE = MAX_FILE_SIZE + 64 * 1024
 
 
 @router.post("/plant/{plant_id}/upload-file-v2")
@@ -133,42 +228,31 @@ async def upload_plant_file(
     file_type: FileTypeEnum = Form(...),
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Upload a file + metadata in one request (multipart/form-data).
     Uses two-step workflow: PENDING -> COMPLETED/FAILED to record every attempt.
+    The blob is named after the file's SHA-256 and not written again if it
+    exists. The request body is not streamed to storage: the multipart
+    parser spools the whole file (BodySizeLimitMiddleware caps it) before
+    this runs, then hashing, storage and DB calls run in the threadpool, so
+    the event loop keeps serving other requests meanwhile.
     """
-    # Validate extension
     extension = file.filename.split(".")[-1].lower()
-    if extension not in ["png", "ply"]:
-        raise HTTPException(status_code=400, detail="Unsupported file extension")
+    _check_extension(extension, file_type)
 
-    # Check if extension matches file_type
-    if (file_type == FileTypeEnum.TWO_D and extension != "png") or (
-        file_type == FileTypeEnum.THREE_D and extension != "ply"
-    ):
-        raise HTTPException(
-            status_code=400,
-            detail=f"File extension {extension} does not match file_type {file_type}",
-        )
-
-    # Check size
-    file.file.seek(0, 2)  # move pointer to end
-    size = file.file.tell()
-    file.file.seek(0)  # reset pointer for upload
-    if size > MAX_FILE_SIZE:
+    # Check size (known once the multipart parser has spooled the file)
+    if file.size is not None and file.size > MAX_FILE_SIZE:
         raise HTTPException(status_code=400, detail="File too large (max 10MB)")
 
-    # Generate blob name
-    blob_name = f"{uuid.uuid4()}.{extension}"
-
     # Step 1: Insert DB record as PENDING
-    file_record = crud.create_plant_file(
+    file_record = await run_in_threadpool(
+        crud.create_plant_file,
         db=db,
         plant_id=plant_id,
         date=date,
-        file_path=blob_name,
+        file_path=None,  # named by content once read
         file_type=file_type,
         breeder_id=(
             current_user.breeder_id if current_user.role != Role.ADMIN else None
@@ -177,12 +261,26 @@ async def upload_plant_file(
     )
 
     try:
-        # Step 2: Upload to blob storage
-        upload_to_blob(blob_name, file.file)
+        # Step 2: Name the blob by content and reference it, then store the
+        # content unless a blob already holds it
+        blob_name = await hash_upload(file, extension, MAX_FILE_SIZE)
+        await run_in_threadpool(
+            crud.update_file_status,
+            db,
+            file_record.id,
+            FileStatusEnum.PENDING,
+            file_path=blob_name,
+        )
+        info = await store_content_addressed(get_storage(), blob_name, file)
 
         # Step 3: Update DB record -> COMPLETED
-        file_record = crud.update_file_status(
-            db, file_record.id, FileStatusEnum.COMPLETED
+        file_record = await run_in_threadpool(
+            crud.update_file_status,
+            db,
+            file_record.id,
+            FileStatusEnum.COMPLETED,
+            info.size,
+            info.etag,
         )
 
         return {
@@ -191,12 +289,321 @@ async def upload_plant_file(
             "status": file_record.status,
         }
 
+    except UploadTooLargeError:
+        await run_in_threadpool(
+            crud.update_file_status, db, file_record.id, FileStatusEnum.FAILED
+        )
+        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+
     except Exception as e:
         # Step 4: Update DB record -> FAILED
-        crud.update_file_status(db, file_record.id, FileStatusEnum.FAILED)
+        await run_in_threadpool(
+            crud.update_file_status, db, file_record.id, FileStatusEnum.FAILED
+        )
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
 
+@router.post("/plant/{plant_id}/upload-files")
+async def upload_plant_files(
+    plant_id: str,
+    manifest: str = Form(...),
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Upload many files in one multipart request. `manifest` is a JSON list
+    of {filename, date, file_type}, one entry per file part (matched by
+    filename). Everything is validated before any upload; files are then
+    named by content (see upload-file-v2), all rows are inserted at once,
+    the files are stored MULTI_UPLOAD_CONCURRENCY at a time and all rows
+    are settled COMPLETED or FAILED at once. Returns one result per file,
+    in manifest order.
+    """
+    try:
+        items = TypeAdapter(List[UploadManifestItem]).validate_json(manifest)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid manifest: {e}")
+    if len(files) > settings.MAX_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=400, detail=f"Too many files (max {settings.MAX_UPLOAD_FILES})"
+        )
+
+    # Validate everything first
+    parts = {file.filename: file for file in files}
+    names = [item.filename for item in items]
+    errors = []
+    if len(parts) != len(files) or len(set(names)) != len(names):
+        errors.append({"filename": None, "error": "Duplicate filenames"})
+    for name in parts.keys() - set(names):
+        errors.append({"filename": name, "error": "File missing from manifest"})
+    for item in items:
+        extension = item.filename.split(".")[-1].lower()
+        try:
+            _check_extension(extension, item.file_type)
+            if item.filename not in parts:
+                raise HTTPException(status_code=400, detail="No file part")
+            size = parts[item.filename].size
+            if size is not None and size > MAX_FILE_SIZE:
+                raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+        except HTTPException as e:
+            errors.append({"filename": item.filename, "error": e.detail})
+    if errors:
+        raise HTTPException(
+            status_code=400, detail={"message": "Invalid upload", "errors": errors}
+        )
+
+    plant = await run_in_threadpool(
+        crud.get_plant,
+        db,
+        plant_id,
+        current_user.breeder_id if current_user.role != Role.ADMIN else None,
+    )
+    if not plant:
+        raise HTTPException(status_code=404, detail="Plant not found")
+
+    storage = get_storage()
+    slots = asyncio.Semaphore(settings.MULTI_UPLOAD_CONCURRENCY)
+
+    async def name(item: UploadManifestItem):
+        async with slots:
+            try:
+                blob_name = await hash_upload(
+                    parts[item.filename],
+                    item.filename.split(".")[-1].lower(),
+                    MAX_FILE_SIZE,
+                )
+                return blob_name, None
+            except UploadTooLargeError:
+                return None, "File too large (max 10MB)"
+            except Exception as e:
+                return None, f"File upload failed: {e}"
+
+    async def store(item: UploadManifestItem, blob_name: str):
+        async with slots:
+            try:
+                info = await store_content_addressed(
+                    storage, blob_name, parts[item.filename]
+                )
+                return info, None
+            except Exception as e:
+                return None, f"File upload failed: {e}"
+
+    # Name every file by content and reference the blobs, then store them
+    named = await asyncio.gather(*(name(item) for item in items))
+    rows = [
+        {
+            "plant_id": plant.id,
+            "date": item.date,
+            "file_path": blob_name,
+            "file_type": item.file_type,
+            "status": FileStatusEnum.PENDING if blob_name else FileStatusEnum.FAILED,
+        }
+        for item, (blob_name, _) in zip(items, named)
+    ]
+    ids = await run_in_threadpool(crud.create_plant_files, db, rows)
+    pending = [
+        (i, item, row["file_path"])
+        for i, (item, row) in enumerate(zip(items, rows))
+        if row["file_path"]
+    ]
+    stored = await asyncio.gather(
+        *(store(item, blob_name) for _, item, blob_name in pending)
+    )
+    errors = [error for _, error in named]
+    changes = []
+    for (i, _, _), (info, error) in zip(pending, stored):
+        rows[i]["status"] = FileStatusEnum.COMPLETED if info else FileStatusEnum.FAILED
+        errors[i] = error
+        changes.append(
+            {
+                "id": ids[i],
+                "status": rows[i]["status"],
+                "size": info.size if info else None,
+                "etag": info.etag if info else None,
+            }
+        )
+    await run_in_threadpool(crud.update_files, db, changes)
+
+    results = []
+    for item, db_id, row, error in zip(items, ids, rows, errors):
+        result = {
+            "filename": item.filename,
+            "db_id": db_id,
+            "file_path": row["file_path"],
+            "status": row["status"],
+        }
+        if error:
+            result["error"] = error
+        results.append(result)
+    return results
+
+
+# ========== RESUMABLE UPLOADS ==========
+# Create a session, PUT chunks 0..chunk_count-1 (in any order, in parallel,
+# again after a failure), GET the session to see which chunks arrived, then
+# commit. The file stays PENDING until the commit.
+MAX_UPLOAD_CHUNKS = 50000  # Azure's limit of blocks per blob
+
+
+def _upload_session_response(upload, received):
+    return {
+        "upload_id": upload.id,
+        "db_id": upload.file_id,
+        "blob_path": upload.file.file_path,
+        "size": upload.size,
+        "chunk_size": upload.chunk_size,
+        "chunk_count": upload.chunk_count,
+        "received": sorted(received),
+        "status": upload.file.status,
+    }
+
+
+def _get_upload_session(db: Session, upload_id: str, current_user: Principal):
+    upload = crud.get_upload_session(
+        db,
+        upload_id,
+        breeder_id=current_user.breeder_id if current_user.role != Role.ADMIN else None,
+    )
+    if not upload:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return upload
+
+
+@router.post("/plant/{plant_id}/uploads")
+def create_upload_session(
+    plant_id: str,
+    request: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Start a resumable upload; registers the file as PENDING."""
+    extension = request.extension.lower()
+    _check_extension(extension, request.file_type)
+    if request.size > settings.MAX_CHUNKED_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large (max {settings.MAX_CHUNKED_UPLOAD_SIZE} bytes)",
+        )
+    chunk_size = request.chunk_size or settings.UPLOAD_CHUNK_SIZE
+    if chunk_size > settings.MAX_UPLOAD_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk too large (max {settings.MAX_UPLOAD_CHUNK_SIZE} bytes)",
+        )
+    if -(-request.size // chunk_size) > MAX_UPLOAD_CHUNKS:
+        raise HTTPException(
+            status_code=400, detail=f"Too many chunks (max {MAX_UPLOAD_CHUNKS})"
+        )
+
+    try:
+        upload = crud.create_upload_session(
+            db,
+            plant_id=plant_id,
+            date=request.date,
+            file_path=f"{uuid.uuid4()}.{extension}",
+            file_type=request.file_type,
+            size=request.size,
+            chunk_size=chunk_size,
+            breeder_id=(
+                current_user.breeder_id if current_user.role != Role.ADMIN else None
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _upload_session_response(upload, [])
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Session state; `received` lists the chunk indexes stored so far."""
+    upload = _get_upload_session(db, upload_id, current_user)
+    return _upload_session_response(upload, crud.get_upload_chunks(db, upload_id))
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Store chunk `index` (raw request body) as a staged block. Every chunk
+    but the last must be exactly `chunk_size` bytes; sending a chunk again
+    replaces it.
+    """
+    upload = await run_in_threadpool(_get_upload_session, db, upload_id, current_user)
+    if not 0 <= index < upload.chunk_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk index must be in [0, {upload.chunk_count - 1}]",
+        )
+    expected = upload.chunk_length(index)
+
+    data = bytearray()
+    async for chunk in request.stream():
+        data += chunk
+        if len(data) > expected:
+            break
+    if len(data) != expected:
+        raise HTTPException(
+            status_code=400, detail=f"Chunk {index} must be {expected} bytes"
+        )
+
+    await run_in_threadpool(
+        get_storage().stage_block, upload.file.file_path, block_id(index), bytes(data)
+    )
+    await run_in_threadpool(crud.record_upload_chunk, db, upload_id, index, expected)
+    return {"index": index, "size": expected}
+
+
+@router.post("/uploads/{upload_id}/commit")
+def commit_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Assemble the blob from all chunks and mark the file COMPLETED."""
+    upload = _get_upload_session(db, upload_id, current_user)
+    received = crud.get_upload_chunks(db, upload_id)
+    missing = [i for i in range(upload.chunk_count) if i not in received]
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload has missing chunks", "missing": missing},
+        )
+
+    block_ids = [block_id(i) for i in range(upload.chunk_count)]
+    info = get_storage().commit_blocks(upload.file.file_path, block_ids)
+    file_record = crud.finish_upload_session(
+        db, upload, FileStatusEnum.COMPLETED, etag=info.etag
+    )
+    return {
+        "db_id": file_record.id,
+        "file_path": file_record.file_path,
+        "status": file_record.status,
+    }
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload_session(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Give up on an upload: staged chunks are dropped, the file is FAILED."""
+    upload = _get_upload_session(db, upload_id, current_user)
+    get_storage().discard_blocks(upload.file.file_path)
+    file_record = crud.finish_upload_session(db, upload, FileStatusEnum.FAILED)
+    return {"db_id": file_record.id, "status": file_record.status}
+
+
 # for admin only
 @router.post("/plant/{plant_id}/bulk-upload")
 def bulk_upload(
@@ -208,7 +615,7 @@ def bulk_upload(
     results = []
     for file in request.files:
         blob_name = f"{uuid.uuid4()}.{file.extension}"
-        upload_url = generate_sas_url(blob_name, isUpload=True)
+        upload_url = get_storage().presign_write(blob_name)
 
         file_record = crud.create_plant_file(
             db=db,
@@ -5,16 +5,20 @@ from datetime import date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
 from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 import app.crud as crud
-from app.db.models import Role, User
-from app.dependencies import get_db, get_current_user
+from app.core.conf import settings
+from app.db.models import Role
+from app.dependencies import get_async_db, get_db, get_current_principal
 from app.schemas import (
     PaginatedResponse,
+    MeasurementBatchResult,
     MeasurementCreate,
     MeasurementInDB,
     MeasurementUpdate,
+    Principal,
 )
 
 router = APIRouter()
@@ -26,7 +30,7 @@ def create_measurement_route(
     measurement: MeasurementCreate,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: int = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if not measurement.plant_id:
         raise HTTPException(status_code=400, detail="plant_id is required")
@@ -45,24 +49,99 @@ def create_measurement_route(
     return crud.create_measurement(db, measurement, breeder_id=final_breeder_id)
 
 
+@router.post("/measurements/batch", response_model=MeasurementBatchResult)
+def create_measurements_batch_route(
+    measurements: List[MeasurementCreate],
+    upsert: bool = False,
+    breeder_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Create (or with `upsert=true`, replace by plant_id + date) many
+    measurements in one transaction. Invalid items are skipped and reported
+    per item; the rest are written.
+    """
+    if not measurements:
+        raise HTTPException(status_code=400, detail="No measurements given")
+    if len(measurements) > settings.MEASUREMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.MEASUREMENT_BATCH_MAX_ITEMS} measurements per batch",
+        )
+
+    if current_user.role == Role.ADMIN:
+        if not breeder_id:
+            raise HTTPException(status_code=400, detail="breeder_id is required")
+        final_breeder_id = breeder_id
+    else:
+        if breeder_id and breeder_id != current_user.breeder_id:
+            raise HTTPException(
+                status_code=403, detail="Cannot create measurement for other breeder"
+            )
+        final_breeder_id = current_user.breeder_id
+
+    return crud.create_measurements_batch(
+        db, measurements, breeder_id=final_breeder_id, upsert=upsert
+    )
+
+
 @router.get("/measurements", response_model=PaginatedResponse[MeasurementInDB])
-def list_measurements_route(
+async def list_measurements_route(
     plant_code: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     variety: Optional[str] = None,
     field: Optional[str] = None,
+    min_fruit_count: Optional[int] = Query(None, ge=0),
+    max_fruit_count: Optional[int] = Query(None, ge=0),
+    min_fruit_width_mean: Optional[float] = None,
+    max_fruit_width_mean: Optional[float] = None,
+    min_fruit_height_mean: Optional[float] = None,
+    max_fruit_height_mean: Optional[float] = None,
+    min_fruit_mass_mean: Optional[float] = None,
+    max_fruit_mass_mean: Optional[float] = None,
+    sort_by: str = "date",
+    descending: bool = False,
     offset: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
+    """
+    Filters and `sort_by` on fruit statistics use the columns stored on each
+    measurement (fruit count is `ripe`); plant_fruits is not read.
+    """
+    if sort_by not in crud.MEASUREMENT_SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort_by must be one of {', '.join(crud.MEASUREMENT_SORT_FIELDS)}",
+        )
+    ranges = tuple(
+        (name, low, high)
+        for name, low, high in [
+            ("ripe", min_fruit_count, max_fruit_count),
+            ("fruit_width_mean", min_fruit_width_mean, max_fruit_width_mean),
+            ("fruit_height_mean", min_fruit_height_mean, max_fruit_height_mean),
+            ("fruit_mass_mean", min_fruit_mass_mean, max_fruit_mass_mean),
+        ]
+        if low is not None or high is not None
+    )
+
     if current_user.role == Role.ADMIN:
-        total, items = crud.get_measurements(
-            db, plant_code, start_date, end_date, offset=offset, limit=limit
+        total, items = await crud.get_measurements_async(
+            db,
+            plant_code,
+            start_date,
+            end_date,
+            offset=offset,
+            limit=limit,
+            ranges=ranges,
+            sort_by=sort_by,
+            descending=descending,
         )
     else:
-        total, items = crud.get_measurements(
+        total, items = await crud.get_measurements_async(
             db,
             plant_code,
             start_date,
@@ -72,6 +151,9 @@ def list_measurements_route(
             offset=offset,
             limit=limit,
             breeder_id=current_user.breeder_id,
+            ranges=ranges,
+            sort_by=sort_by,
+            descending=descending,
         )
     return {"total": total, "offset": offset, "limit": limit, "items": items}
 
@@ -159,7 +241,7 @@ def import_measurements(
     file: UploadFile = File(...),
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed")
@@ -185,12 +267,50 @@ def import_measurements(
     return result
 
 
+@router.delete("/measurements")
+def delete_measurements_route(
+    plant_code: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    variety: Optional[str] = None,
+    field: Optional[str] = None,
+    breeder_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Bulk delete the breeder's measurements matching every given filter
+    (fruits included) in one statement. At least one filter is required.
+    """
+    if not any([plant_code, start_date, end_date, variety, field]):
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of plant_code, start_date, end_date, variety or field is required",
+        )
+
+    if current_user.role == Role.ADMIN:
+        if not breeder_id:
+            raise HTTPException(status_code=400, detail="breeder_id is required")
+        final_breeder_id = breeder_id
+    else:
+        if breeder_id and breeder_id != current_user.breeder_id:
+            raise HTTPException(
+                status_code=403, detail="Cannot delete measurements for other breeder"
+            )
+        final_breeder_id = current_user.breeder_id
+
+    deleted = crud.delete_measurements(
+        db, final_breeder_id, plant_code, start_date, end_date, variety, field
+    )
+    return {"deleted": deleted}
+
+
 @router.get("/measurements/{measurement_id}", response_model=MeasurementInDB)
 def get_measurement_route(
     measurement_id: int,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         if not breeder_id:
@@ -210,13 +330,36 @@ def get_measurement_route(
     return measurement
 
 
+# Declared before /measurements/{measurement_id}, which would swallow "by-key"
+@router.put("/measurements/by-key", response_model=MeasurementInDB)
+def upsert_measurement_route(
+    measurement: MeasurementCreate,
+    breeder_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Create or replace the measurement for (plant_id, date), fruits included."""
+    if current_user.role == Role.ADMIN:
+        if not breeder_id:
+            raise HTTPException(status_code=400, detail="breeder_id is required")
+        final_breeder_id = breeder_id
+    else:
+        if breeder_id and breeder_id != current_user.breeder_id:
+            raise HTTPException(
+                status_code=403, detail="Cannot update measurement for other breeder"
+            )
+        final_breeder_id = current_user.breeder_id
+
+    return crud.upsert_measurement(db, measurement, breeder_id=final_breeder_id)
+
+
 @router.put("/measurements/{measurement_id}", response_model=MeasurementInDB)
 def update_measurement_route(
     measurement_id: int,
     measurement: MeasurementUpdate,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         if not breeder_id:
@@ -239,7 +382,7 @@ def delete_measurement_route(
     measurement_id: int,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         if not breeder_id:
@@ -260,11 +403,11 @@ def delete_measurement_route(
 
 # ====== AGGREGATED SUMMARY ======
 @router.get("/summary")
-def get_dashboard_summary(
+async def get_dashboard_summary(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Returns aggregated dashboard data for the current user's breeder_id:
@@ -272,21 +415,24 @@ def get_dashboard_summary(
     - unique varieties
     - number of samples per variety
     - last measured date
+    - fruit count, total mass and size classes per variety
     Supports optional start_date and end_date filters.
     """
-    return crud.get_summary(db, current_user.breeder_id, start_date, end_date)
+    return await crud.get_summary_async(
+        db, current_user.breeder_id, start_date, end_date
+    )
 
 
 @router.get("/plant/{plant_code}/unique-measurement-dates", response_model=List[date])
-def get_unique_dates(
+async def get_unique_dates(
     plant_code: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
-        dates = crud.get_unique_measurement_dates(db, plant_code)
+        dates = await crud.get_unique_measurement_dates_async(db, plant_code)
     else:
-        dates = crud.get_unique_measurement_dates(
+        dates = await crud.get_unique_measurement_dates_async(
             db, plant_code, breeder_id=current_user.breeder_id
         )
     return dates
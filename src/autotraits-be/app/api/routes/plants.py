@@ -3,9 +3,18 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 import app.crud as crud
-from app.db.models import Role, User
-from app.dependencies import get_db, get_current_user
-from app.schemas import PlantInDB, PlantCreate, PlantUpdate, PaginatedResponse
+from app.core.storage import get_storage
+from app.core.storage.upload import file_blobs, release_blobs
+from app.db.models import Role
+from app.dependencies import get_db, get_current_principal
+from app.schemas import (
+    PlantInDB,
+    PlantCreate,
+    PlantUpdate,
+    PlantWithStatsInDB,
+    PaginatedResponse,
+    Principal,
+)
 
 router = APIRouter()
 
@@ -16,7 +25,7 @@ def create_plant_route(
     plant: PlantCreate,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         # Admin can assign plant to any breeder explicitly
@@ -32,17 +41,25 @@ def create_plant_route(
     return crud.create_plant(db, plant, breeder_id=final_breeder_id)
 
 
-@router.get("/plants", response_model=PaginatedResponse[PlantInDB])
+@router.get("/plants", response_model=PaginatedResponse[PlantWithStatsInDB])
 def list_plants_route(
     offset: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    include: Optional[str] = Query(None, pattern="^stats$"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
+    """
+    Paginated plants. With ?include=stats every item also carries its rollups
+    (measurement count, latest date/traits, image counts) from a single query.
+    """
+    list_plants = (
+        crud.get_all_plants_with_stats if include == "stats" else crud.get_all_plants
+    )
     if current_user.role == Role.ADMIN:
-        total, items = crud.get_all_plants(db, offset=offset, limit=limit)
+        total, items = list_plants(db, offset=offset, limit=limit)
     else:
-        total, items = crud.get_all_plants(
+        total, items = list_plants(
             db, current_user.breeder_id, offset=offset, limit=limit
         )
     return {"total": total, "offset": offset, "limit": limit, "items": items}
@@ -52,7 +69,7 @@ def list_plants_route(
 def get_plant_route(
     plant_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         return crud.get_plant(db, plant_id)
@@ -66,7 +83,7 @@ def update_plant_route(
     plant: PlantUpdate,
     breeder_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     if current_user.role == Role.ADMIN:
         if not breeder_id:
@@ -109,12 +126,16 @@ def update_plant_route(
 def delete_plant_by_id_route(
     plant_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
+    # blobs are released once the rows are gone; shared ones are kept
+    blobs = file_blobs(crud.get_files(db, plant_id=plant_id))
     if current_user.role == Role.ADMIN:
-        return crud.delete_plant(db, plant_id)
+        plant = crud.delete_plant(db, plant_id)
     else:
-        return crud.delete_plant(db, plant_id, current_user.breeder_id)
+        plant = crud.delete_plant(db, plant_id, current_user.breeder_id)
+    release_blobs(db, get_storage(), blobs)
+    return plant
 
 
 # @router.delete("/plants/code/{plant_code}", response_model=PlantInDB)
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from app.core.storage import BlobNotFoundError, get_storage
+from app.core.storage.base import read_url_max_age
+from app.core.storage.local import LocalStorage
+from app.core.storage.upload import upload_stream
+
+router = APIRouter()
+
+
+def _local_storage(method: str, name: str, expires: int, sig: str) -> LocalStorage:
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    try:
+        valid = storage.verify(method, name, expires, sig)
+    except ValueError:
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    return storage
+
+
+# ========== LOCAL STORAGE (STORAGE_BACKEND=local) ==========
+# Targets of LocalStorage presigned URLs; the signature is the authorization
+@router.get("/storage/local/{name:path}")
+def read_local_blob(name: str, expires: int, sig: str):
+    storage = _local_storage("GET", name, expires, sig)
+    try:
+        info = storage.info(name)
+    except (BlobNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Blob not found")
+    return FileResponse(
+        storage.path(name),
+        headers={
+            "Cache-Control": f"max-age={read_url_max_age()}, immutable",
+            "ETag": info.etag,
+        },
+    )
+
+
+@router.put("/storage/local/{name:path}", status_code=201)
+async def write_local_blob(name: str, expires: int, sig: str, request: Request):
+    # file writes run in the threadpool (upload_stream), off the event loop
+    storage = _local_storage("PUT", name, expires, sig)
+    try:
+        info = await upload_stream(storage, name, request.stream())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid blob name")
+    return {"name": info.name, "size": info.size, "etag": info.etag}
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
 
-from app.dependencies import get_current_user
-from app.db.models import User
-from app.schemas import UserInDB
+import app.crud as crud
+from app.dependencies import get_current_principal, get_current_user, get_db
+from app.db.models import Role, User
+from app.schemas import Principal, UserInDB, UserUpdate
 
 router = APIRouter()
 
@@ -14,3 +16,32 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
     Returns the information of the currently logged-in user
     """
     return current_user
+
+
+# ======= USER ADMINISTRATION (admin only) =======
+@router.patch("/{user_id}", response_model=UserInDB)
+def update_user_route(
+    user_id: int,
+    user: UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Change a user's role or breeder. Their tokens are revoked, so they sign
+    in again with the new role and breeder.
+    """
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return crud.update_user(db, user_id, user)
+
+
+@router.delete("/{user_id}", response_model=UserInDB)
+def delete_user_route(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    """Delete a user; their tokens stop working."""
+    if current_user.role != Role.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return crud.delete_user(db, user_id)
@@ -1,29 +1,78 @@
-from datetime import datetime, timedelta
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable
 
+import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+from app.core.cache import TTLCache
 from app.core.conf import settings
+from app.core.storage.base import read_url_expiry, read_url_max_age
 
+# One client per process, shared by all threads: its transport keeps a pool
+# of keep-alive connections to the storage account
+_client_lock = threading.Lock()
+_client = None
+_client_pid = None
 
-def get_blob_service_client():
+
+def _build_client() -> BlobServiceClient:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=settings.ADLS_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    transport = RequestsTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=settings.ADLS_CONNECTION_TIMEOUT,
+        read_timeout=settings.ADLS_READ_TIMEOUT,
+    )
+    return BlobServiceClient.from_connection_string(
+        settings.ADLS_CONNECTION_STRING, transport=transport
+    )
+
+
+def get_blob_service_client() -> BlobServiceClient:
     """
-    Lazily create a BlobServiceClient.
-    This avoids import-time errors in tests with fake connection strings.
+    Process-wide BlobServiceClient, created on first use (so tests with
+    fake connection strings can import this module) and again in a forked
+    worker, which must not share the parent's connections.
     """
-    return BlobServiceClient.from_connection_string(settings.ADLS_CONNECTION_STRING)
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = _build_client()
+                _client_pid = pid
+    return _client
 
 
-def generate_sas_url(blob_path: str, expiry_minutes: int = 60, isUpload=False) -> str:
-    client = get_blob_service_client()
+def get_container_client():
+    return get_blob_service_client().get_container_client(settings.ADLS_CONTAINER_NAME)
+
 
+def get_account_credentials() -> tuple:
+    """(account name, account key) used to sign SAS tokens."""
+    client = get_blob_service_client()
     # account_key might be None if using a connection string with a SAS token
     account_key = getattr(client.credential, "account_key", None)
     if not account_key:
         raise ValueError(
             "BlobServiceClient missing account key; cannot generate SAS URL."
         )
+    return client.account_name, account_key
+
+
+def generate_sas_url(blob_path: str, expiry_minutes: int = 60, isUpload=False) -> str:
+    account_name, account_key = get_account_credentials()
 
     sas_token = generate_blob_sas(
-        account_name=client.account_name,
+        account_name=account_name,
         container_name=settings.ADLS_CONTAINER_NAME,
         blob_name=blob_path,
         account_key=account_key,
@@ -34,12 +83,56 @@ def generate_sas_url(blob_path: str, expiry_minutes: int = 60, isUpload=False) -
         ),
         expiry=datetime.utcnow() + timedelta(minutes=expiry_minutes),
     )
-    url = f"https://{client.account_name}.blob.core.windows.net/{settings.ADLS_CONTAINER_NAME}/{blob_path}?{sas_token}"
+    url = f"https://{account_name}.blob.core.windows.net/{settings.ADLS_CONTAINER_NAME}/{blob_path}?{sas_token}"
     return url
 
 
+# Read SAS URLs keyed by (blob path, expiry)
+_read_sas_cache = TTLCache(maxsize=settings.SAS_CACHE_SIZE)
+
+
+def generate_read_sas_urls(blob_paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Read SAS URLs for many blobs, signed with one credential lookup and
+    cached until the end of the current bucket. A URL is therefore always
+    served with at least SAS_EXPIRY_MINUTES - SAS_BUCKET_MINUTES left, which
+    is the max-age the blob responses carry (signed `rscc`), so browsers and
+    CDNs can cache the content by URL until shortly before it expires.
+    """
+    expiry = read_url_expiry(time.time())
+    max_age = read_url_max_age()
+    bucket_end = expiry - max_age
+
+    urls, missing = {}, []
+    for blob_path in blob_paths:
+        url = _read_sas_cache.get((blob_path, expiry))
+        if url is None:
+            missing.append(blob_path)
+        else:
+            urls[blob_path] = url
+    if not missing:
+        return urls
+
+    account_name, account_key = get_account_credentials()
+    container = settings.ADLS_CONTAINER_NAME
+    expiry_time = datetime.fromtimestamp(expiry, tz=timezone.utc)
+    permission = BlobSasPermissions(read=True)
+    for blob_path in missing:
+        sas_token = generate_blob_sas(
+            account_name=account_name,
+            container_name=container,
+            blob_name=blob_path,
+            account_key=account_key,
+            permission=permission,
+            expiry=expiry_time,
+            cache_control=f"max-age={max_age}, immutable",
+        )
+        url = f"https://{account_name}.blob.core.windows.net/{container}/{blob_path}?{sas_token}"
+        _read_sas_cache.set((blob_path, expiry), url, expires_at=bucket_end)
+        urls[blob_path] = url
+    return urls
+
+
 def upload_to_blob(blob_name: str, file_obj):
-    client = get_blob_service_client()
-    container_client = client.get_container_client(settings.ADLS_CONTAINER_NAME)
-    blob_client = container_client.get_blob_client(blob_name)
+    blob_client = get_container_client().get_blob_client(blob_name)
     blob_client.upload_blob(file_obj, overwrite=True)
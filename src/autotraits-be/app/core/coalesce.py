@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Hashable, Optional, Union
+
+
+class DataVersions:
+    """
+    Per-breeder write counters. Every write path bumps the breeder's version,
+    so read keys built from it never mix data from before and after a write.
+    Admin reads (breeder_id=None) span all breeders and use the global counter.
+    The time of the last write (time.monotonic) is kept alongside, for
+    read-your-writes routing in app.db.session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = 0
+        self._versions: dict[int, int] = {}
+        self._global_written_at = float("-inf")
+        self._written_at: dict[int, float] = {}
+
+    def get(self, breeder_id: Optional[int] = None) -> int:
+        with self._lock:
+            if breeder_id is None:
+                return self._global
+            return self._versions.get(breeder_id, 0)
+
+    def last_write(self, breeder_id: Optional[int] = None) -> float:
+        with self._lock:
+            if breeder_id is None:
+                return self._global_written_at
+            return self._written_at.get(breeder_id, float("-inf"))
+
+    def bump(self, breeder_id: Optional[int] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._global += 1
+            self._global_written_at = now
+            if breeder_id is not None:
+                self._versions[breeder_id] = self._versions.get(breeder_id, 0) + 1
+                self._written_at[breeder_id] = now
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+    The first caller (leader) runs the function, the others block on its
+    Future and receive the same result (or exception).
+    Coalescing is per process: each gunicorn worker has its own instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Union[Future, asyncio.Task]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def do(self, name: str, key: Hashable, fn: Callable):
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"calls": 0, "executions": 0, "coalesced": 0}
+            )
+            stats["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                stats["executions"] += 1
+            else:
+                stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, name: str, key: Hashable, fn: Callable):
+        """
+        Async counterpart of do(). The call runs in its own task, which the
+        leader and followers all await through shield: a cancelled caller
+        (a dropped client) leaves it running for the others.
+        """
+        loop = asyncio.get_running_loop()
+        # asyncio tasks are bound to their loop, so key per event loop
+        key = (id(loop), key)
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"calls": 0, "executions": 0, "coalesced": 0}
+            )
+            stats["calls"] += 1
+            task = self._calls.get(key)
+            if task is None:
+                task = loop.create_task(self._run_async(key, fn))
+                # mark retrieved, in case every caller was cancelled
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self._calls[key] = task
+                stats["executions"] += 1
+            else:
+                stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def _run_async(self, key: Hashable, fn: Callable):
+        try:
+            return await fn()
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "functions": {name: dict(s) for name, s in self._stats.items()},
+            }
+
+
+data_versions = DataVersions()
+single_flight = SingleFlight()
+
+
+def coalesce(fn):
+    """
+    Decorator for read-only CRUD functions taking `db` as first argument.
+    Calls are keyed by function name, every other argument and the current
+    data version of `breeder_id`, so only truly identical reads are shared.
+    Works for both plain and `async def` functions.
+    """
+    signature = inspect.signature(fn)
+    name = fn.__name__
+
+    def make_key(db, args, kwargs):
+        bound = signature.bind(db, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple((k, v) for k, v in bound.arguments.items() if k != "db")
+        breeder_id = bound.arguments.get("breeder_id")
+        return (name, params, data_versions.get(breeder_id))
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(db, *args, **kwargs):
+            key = make_key(db, args, kwargs)
+            return await single_flight.do_async(
+                name, key, lambda: fn(db, *args, **kwargs)
+            )
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(db, *args, **kwargs):
+        key = make_key(db, args, kwargs)
+        return single_flight.do(name, key, lambda: fn(db, *args, **kwargs))
+
+    return wrapper
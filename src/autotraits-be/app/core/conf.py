@@ -1,12 +1,116 @@
+from typing import Literal, Optional, Tuple
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Defaults to DATABASE_URL with the asyncpg / aiosqlite driver
+    DATABASE_ASYNC_URL: Optional[str] = None
+    # Optional read replica for read-only CRUD calls (see app.db.session)
+    DATABASE_READ_URL: Optional[str] = None
+    # After a write, the breeder's reads in that worker and the writing
+    # client's reads in every worker stay on the primary this long;
+    # keep it >= REPLICA_MAX_LAG_SECONDS
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    # Replica is skipped while its lag exceeds this or it is unreachable
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
     SECRET_KEY: str
     ALGORITHM: str
     ADLS_CONNECTION_STRING: str
     ADLS_CONTAINER_NAME: str
+    # "azure": the ADLS container above. "local": files under LOCAL_STORAGE_ROOT,
+    # presigned URLs served by /api/storage/local (development, load tests)
+    STORAGE_BACKEND: Literal["azure", "local"] = "azure"
+    LOCAL_STORAGE_ROOT: str = "storage"
+    # Public base URL of this API, used in local presigned URLs
+    LOCAL_STORAGE_BASE_URL: str = "http://localhost:8000"
+    # Streamed uploads: files larger than one block are staged as blocks,
+    # this many at a time (and in memory) per upload
+    UPLOAD_BLOCK_SIZE: int = 4 * 1024 * 1024
+    UPLOAD_CONCURRENCY: int = 4
+    # Multi-file uploads (/upload-files): files and total body per request,
+    # files streamed to storage at a time
+    MAX_UPLOAD_FILES: int = 500
+    MAX_MULTI_UPLOAD_SIZE: int = 1024 * 1024 * 1024
+    MULTI_UPLOAD_CONCURRENCY: int = 4
+    # Resumable uploads (/uploads): files up to MAX_CHUNKED_UPLOAD_SIZE are sent
+    # as numbered chunks of UPLOAD_CHUNK_SIZE (or a client-chosen size up to
+    # MAX_UPLOAD_CHUNK_SIZE), each staged as one block
+    MAX_CHUNKED_UPLOAD_SIZE: int = 5 * 1024 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    MAX_UPLOAD_CHUNK_SIZE: int = 64 * 1024 * 1024
+    # Sessions with no new chunk for this long are dropped (blocks discarded,
+    # file FAILED); checked every UPLOAD_SESSION_GC_INTERVAL_SECONDS by the
+    # process leading the periodic jobs (app.core.periodic.LeaderLock)
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    UPLOAD_SESSION_GC_INTERVAL_SECONDS: int = 900
+    # Files registered before the client writes the blob (SAS uploads) are
+    # reconciled with storage listings every FILE_RECONCILE_INTERVAL_SECONDS,
+    # at most this many files and listings per run (app.core.reconcile);
+    # PENDING files still without a blob after PENDING_FILE_TTL_HOURS fail
+    FILE_RECONCILE_INTERVAL_SECONDS: int = 300
+    FILE_RECONCILE_BATCH_SIZE: int = 1000
+    FILE_RECONCILE_MAX_LISTINGS: int = 50
+    PENDING_FILE_TTL_HOURS: int = 24
+    # 2D image variants (scripts/generate_variants.py): WebP thumbnails
+    # cropped to IMAGE_THUMB_SIZE squares and previews within IMAGE_PREVIEW_SIZE
+    IMAGE_THUMB_SIZE: int = 256
+    IMAGE_PREVIEW_SIZE: int = 1280
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_VARIANT_WORKERS: int = 2
+    # Larger images are skipped (decoded size bounds each worker's memory)
+    IMAGE_MAX_PIXELS: int = 64_000_000
+    # 3D variants: voxel-downsampled levels of detail keeping about these
+    # fractions of each PLY's points, in app.core.pointcloud's LOD format
+    POINT_CLOUD_LOD_FRACTIONS: Tuple[float, ...] = (0.01, 0.1, 1.0)
+    # Blob client (one per worker process): keep-alive connections and timeouts
+    ADLS_POOL_SIZE: int = 32
+    ADLS_CONNECTION_TIMEOUT: int = 10
+    ADLS_READ_TIMEOUT: int = 120
+    # Read SAS URLs share one expiry per bucket and are cached for the bucket,
+    # so listings return the same URLs; they have >= EXPIRY - BUCKET left
+    SAS_EXPIRY_MINUTES: int = 60
+    SAS_BUCKET_MINUTES: int = 15
+    SAS_CACHE_SIZE: int = 20000
+    # Connection pool, per gunicorn worker (ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PostgreSQL: monthly partitions of plant_measurements / plant_fruits are
+    # created at startup for the current month and this many months ahead,
+    # and again every PARTITION_CHECK_INTERVAL_SECONDS (periodic jobs)
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_CHECK_INTERVAL_SECONDS: int = 6 * 60 * 60
+    # Authenticated requests resolve role/breeder/token_version from this cache
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_SIZE: int = 1024
+    # Verified JWTs (keyed by digest) kept until their `exp`
+    TOKEN_CACHE_SIZE: int = 4096
+    # bcrypt cost; hashes with another cost are rehashed on the next login
+    BCRYPT_ROUNDS: int = 12
+    # Password hashing process pool (per gunicorn worker) and its queue bound
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    # Max measurements per POST /measurements/batch
+    MEASUREMENT_BATCH_MAX_ITEMS: int = 500
+    # "table": one plant_fruits row per fruit. "packed": float32 triplets in
+    # plant_measurements.fruits_packed; run scripts/backfill_packed_fruits.py
+    # before switching an existing database
+    FRUIT_STORAGE_MODE: Literal["table", "packed"] = "table"
+    # Fruit width bounds of the small/medium/large size classes counted on
+    # each measurement; run scripts/backfill_fruit_stats.py --all after a change
+    FRUIT_SIZE_CLASS_WIDTHS: Tuple[float, float] = (25.0, 35.0)
+
+    # Per-request SQL instrumentation: Server-Timing header + one log line
+    SQL_STATS_ENABLED: bool = True
+    SQL_SLOWEST_STATEMENTS: int = 3
+    # Flag statement shapes run more than this often in one request (0 = off)
+    N_PLUS_ONE_THRESHOLD: int = 10
 
     model_config = {
         "env_file": ".env",
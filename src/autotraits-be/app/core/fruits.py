@@ -0,0 +1,80 @@
+import math
+import statistics
+import struct
+from typing import Iterable
+
+from app.core.conf import settings
+
+# Packed fruit storage (FRUIT_STORAGE_MODE=packed): one little-endian
+# float32 (width, height, mass) triplet per fruit, None stored as NaN
+FRUIT_FIELDS = ("width", "height", "mass")
+_TRIPLET = struct.Struct("<3f")
+
+
+def _field(fruit, name: str) -> float:
+    value = fruit.get(name) if isinstance(fruit, dict) else getattr(fruit, name)
+    return math.nan if value is None else value
+
+
+def _number(value: float):
+    # float32 keeps ~7 significant digits; print them back as entered
+    return None if math.isnan(value) else float(f"{value:.7g}")
+
+
+def pack_fruits(fruits: Iterable) -> bytes:
+    """Fruit objects or dicts -> packed bytes (12 bytes per fruit)."""
+    return b"".join(
+        _TRIPLET.pack(*(_field(fruit, name) for name in FRUIT_FIELDS))
+        for fruit in fruits
+    )
+
+
+def unpack_fruits(data: bytes) -> list[dict]:
+    """
+    Packed bytes -> FruitInDB-shaped dicts. Packed fruits have no row id, so
+    `id` is the fruit's 1-based position within its measurement.
+    """
+    return [
+        {"id": position, **dict(zip(FRUIT_FIELDS, map(_number, triplet)))}
+        for position, triplet in enumerate(_TRIPLET.iter_unpack(data), start=1)
+    ]
+
+
+# Per-measurement fruit statistics stored on plant_measurements (the fruit
+# count itself is `ripe`). Size classes count fruits by width against
+# FRUIT_SIZE_CLASS_WIDTHS: small < first bound <= medium < second <= large.
+FRUIT_STAT_FIELDS = (
+    "fruit_width_mean",
+    "fruit_width_median",
+    "fruit_height_mean",
+    "fruit_height_median",
+    "fruit_mass_total",
+    "fruit_mass_mean",
+    "fruit_count_small",
+    "fruit_count_medium",
+    "fruit_count_large",
+)
+
+
+def fruit_stats(fruits: Iterable, size_class_widths=None) -> dict:
+    """Fruit objects or dicts -> FRUIT_STAT_FIELDS values (None = no data)."""
+    small, large = size_class_widths or settings.FRUIT_SIZE_CLASS_WIDTHS
+    values = {name: [] for name in FRUIT_FIELDS}
+    for fruit in fruits:
+        for name in FRUIT_FIELDS:
+            value = _field(fruit, name)
+            if not math.isnan(value):
+                values[name].append(value)
+
+    widths, heights, masses = (values[name] for name in FRUIT_FIELDS)
+    return {
+        "fruit_width_mean": statistics.fmean(widths) if widths else None,
+        "fruit_width_median": statistics.median(widths) if widths else None,
+        "fruit_height_mean": statistics.fmean(heights) if heights else None,
+        "fruit_height_median": statistics.median(heights) if heights else None,
+        "fruit_mass_total": math.fsum(masses) if masses else None,
+        "fruit_mass_mean": statistics.fmean(masses) if masses else None,
+        "fruit_count_small": sum(w < small for w in widths),
+        "fruit_count_medium": sum(small <= w < large for w in widths),
+        "fruit_count_large": sum(w >= large for w in widths),
+    }
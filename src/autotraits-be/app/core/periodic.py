@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import threading
+from typing import Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+logger = logging.getLogger(__name__)
+
+# advisory lock key of the process running the periodic jobs
+JOBS_LOCK_KEY = 0x6A6F6273
+
+
+class LeaderLock:
+    """
+    Elects one process, among all gunicorn workers and instances, to run the
+    periodic jobs: a PostgreSQL session-level advisory lock taken on a
+    connection of its own, opened outside `engine`'s pool (so the pool keeps
+    DB_POOL_SIZE connections), and kept while that connection lives. The
+    leader keeps the jobs' in-memory state (e.g. the reconciler's cursor);
+    if it dies its connection closes and another process takes over on its
+    next try. On other databases every process leads.
+    """
+
+    def __init__(self, engine: Engine, key: int):
+        self.dialect = engine.dialect.name
+        self.engine = engine
+        if self.dialect == "postgresql":
+            self.engine = create_engine(engine.url, poolclass=NullPool)
+        self.key = key
+        self.conn: Optional[Connection] = None
+        self._mutex = threading.Lock()  # jobs check it from several threads
+
+    def acquire(self) -> bool:
+        """Whether this process leads; tried again on every call."""
+        if self.dialect != "postgresql":
+            return True
+        params = {"key": self.key}
+        with self._mutex:
+            leading, conn = self.conn is not None, self.conn
+            try:
+                conn = conn or self.engine.connect()
+                held = conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), params)
+                if held and leading:  # re-entrant: keep one hold, not one per call
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), params)
+                # the lock outlives the transaction; do not sit idle in one
+                conn.commit()
+            except DBAPIError:
+                logger.exception("Could not check the periodic jobs lock")
+                if conn is not None:
+                    conn.invalidate()  # closing it drops the lock
+                    conn.close()
+                self.conn = None
+                return False
+            if held:
+                self.conn = conn
+            else:
+                conn.close()
+            return held
+
+    def release(self):
+        with self._mutex:
+            if self.conn is not None:
+                self.conn.close()  # the lock goes with the connection
+                self.conn = None
+
+
+async def run_periodically(
+    job: Callable[..., int],
+    session_factory: Optional[Callable[[], Session]],
+    interval: float,
+    description: str,
+    lock: Optional[LeaderLock] = None,
+):
+    """
+    Every `interval` seconds, run `job` in the threadpool with a fresh
+    session (without arguments if `session_factory` is None); it returns
+    how many items it handled, logged as
+    "<count> <description>". With a `lock`, only the process holding it
+    runs the job. Errors are logged and the next run goes ahead.
+    """
+
+    def run() -> int:
+        if lock is not None and not lock.acquire():
+            return 0
+        if session_factory is None:
+            return job()
+        with session_factory() as db:
+            return job(db)
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            count = await run_in_threadpool(run)
+        except Exception:
+            logger.exception("Periodic job failed: %s", description)
+            continue
+        if count:
+            logger.info("%d %s", count, description)
@@ -0,0 +1,216 @@
+"""
+Point clouds: PLY reading, voxel-grid downsampling and the compact LOD
+format served to the 3D viewer.
+
+LOD format (little-endian), 36-byte header then two arrays:
+    magic    4s   b"PCL1"
+    count    u4   number of points
+    flags    u1   bit 0: colors present; then 3 padding bytes
+    origin   3f4  bounding box minimum
+    scale    3f4  position = origin + q * scale
+    q        count x 3 u2   quantized positions
+    rgb      count x 3 u1   colors, if flagged
+"""
+
+import struct
+from typing import BinaryIO, List, Optional, Tuple
+
+import numpy as np
+
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+PLY_FORMATS = {
+    "ascii": None,
+    "binary_little_endian": "<",
+    "binary_big_endian": ">",
+}
+COLOR_PROPERTIES = [
+    ("red", "green", "blue"),
+    ("diffuse_red", "diffuse_green", "diffuse_blue"),
+]
+
+LOD_MAGIC = b"PCL1"
+LOD_HEADER = struct.Struct("<4sIB3x3f3f")
+# voxel size search: accept point counts within this ratio of the target
+LOD_TOLERANCE = 0.2
+LOD_MAX_ITERATIONS = 8
+
+
+class PlyElement:
+    def __init__(self, name: str, count: int):
+        self.name = name
+        self.count = count
+        self.properties: List[Tuple[str, str]] = []  # (name, numpy type)
+        self.has_lists = False
+
+
+def read_ply_header(f: BinaryIO) -> Tuple[Optional[str], List[PlyElement], int]:
+    """(byte order or None for ascii, elements, header length in bytes)."""
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    byte_order, elements = None, []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header has no end_header")
+        words = line.decode("ascii", "replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            return byte_order, elements, f.tell()
+        if words[0] == "format":
+            if words[1] not in PLY_FORMATS:
+                raise ValueError(f"Unsupported PLY format {words[1]}")
+            byte_order = PLY_FORMATS[words[1]]
+        elif words[0] == "element":
+            elements.append(PlyElement(words[1], int(words[2])))
+        elif words[0] == "property":
+            if words[1] == "list":
+                elements[-1].has_lists = True
+            else:
+                elements[-1].properties.append((words[2], PLY_TYPES[words[1]]))
+
+
+def read_ply(path: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Vertex positions (N x 3 float32) and colors (N x 3 uint8, or None) of a
+    PLY file. Binary vertex data is memory-mapped, not read into memory, and
+    copied once into these arrays.
+    """
+    with open(path, "rb") as f:
+        byte_order, elements, offset = read_ply_header(f)
+    names = [element.name for element in elements]
+    if "vertex" not in names:
+        raise ValueError("PLY file has no vertex element")
+    vertex = elements[names.index("vertex")]
+    if vertex.has_lists:
+        raise ValueError("PLY vertex lists are not supported")
+    before = elements[: names.index("vertex")]
+    properties = [name for name, _ in vertex.properties]
+    colors = next((c for c in COLOR_PROPERTIES if set(c) <= set(properties)), None)
+
+    if byte_order is None:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            columns = [properties.index(name) for name in ("x", "y", "z")]
+            columns += [properties.index(name) for name in colors or ()]
+            data = np.loadtxt(
+                f,
+                skiprows=sum(element.count for element in before),
+                max_rows=vertex.count,
+                usecols=columns,
+                dtype=np.float32,
+                ndmin=2,
+            )
+        xyz = data[:, :3]
+        rgb = data[:, 3:].astype(np.uint8) if colors else None
+        return xyz, rgb
+
+    for element in before:
+        if element.has_lists:
+            raise ValueError(f"PLY element {element.name} before vertex has lists")
+        offset += element.count * _dtype(element, byte_order).itemsize
+    data = np.memmap(
+        path,
+        dtype=_dtype(vertex, byte_order),
+        mode="r",
+        offset=offset,
+        shape=(vertex.count,),
+    )
+    xyz = np.column_stack([data[name] for name in ("x", "y", "z")]).astype(np.float32)
+    rgb = (
+        np.column_stack([data[name] for name in colors]).astype(np.uint8)
+        if colors
+        else None
+    )
+    return xyz, rgb
+
+
+def _dtype(element: PlyElement, byte_order: str) -> np.dtype:
+    return np.dtype([(name, byte_order + type_) for name, type_ in element.properties])
+
+
+def voxel_downsample(xyz: np.ndarray, voxel_size: float) -> np.ndarray:
+    """Indexes of the first point in each occupied voxel, in input order."""
+    cells = np.floor((xyz - xyz.min(axis=0)) / voxel_size).astype(np.int64)
+    # one int64 key per voxel: 21 bits per axis
+    keys = (cells[:, 0] << 42) | (cells[:, 1] << 21) | cells[:, 2]
+    _, first = np.unique(keys, return_index=True)
+    return np.sort(first)
+
+
+def downsample_to(xyz: np.ndarray, target: int) -> np.ndarray:
+    """
+    Indexes of about `target` points, one per voxel of a grid sized by a
+    few rounds of search. Scans are surfaces, so the count goes roughly
+    with 1 / voxel_size^2.
+    """
+    if target >= len(xyz):
+        return np.arange(len(xyz))
+    extent = float((xyz.max(axis=0) - xyz.min(axis=0)).max()) or 1.0
+    # finest grid the 21-bit keys allow
+    voxel_size = max(extent / np.sqrt(target), extent / (2**21 - 1))
+    for _ in range(LOD_MAX_ITERATIONS):
+        kept = voxel_downsample(xyz, voxel_size)
+        if abs(len(kept) - target) <= LOD_TOLERANCE * target:
+            break
+        voxel_size *= np.sqrt(len(kept) / target)
+    return kept
+
+
+def lod_levels(
+    xyz: np.ndarray, rgb: Optional[np.ndarray], fractions: Tuple[float, ...]
+) -> List[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    One (positions, colors) level per fraction, coarsest first. Each level
+    is downsampled from the next finer one, so later rounds are cheap.
+    """
+    levels, total = [], len(xyz)
+    for fraction in sorted(fractions, reverse=True):
+        kept = downsample_to(xyz, int(np.ceil(fraction * total)))
+        xyz = xyz[kept]
+        rgb = rgb[kept] if rgb is not None else None
+        levels.append((xyz, rgb))
+    return levels[::-1]
+
+
+def encode_lod(xyz: np.ndarray, rgb: Optional[np.ndarray]) -> bytes:
+    origin = xyz.min(axis=0) if len(xyz) else np.zeros(3)
+    extent = xyz.max(axis=0) - origin if len(xyz) else np.zeros(3)
+    # quantize against the float32 values the reader will see
+    origin = origin.astype(np.float32)
+    scale = np.where(extent > 0, extent / 65535, 1.0).astype(np.float32)
+    q = np.clip(np.rint((xyz - origin) / scale), 0, 65535).astype("<u2")
+    header = LOD_HEADER.pack(LOD_MAGIC, len(xyz), rgb is not None, *origin, *scale)
+    body = q.tobytes() + (rgb.astype(np.uint8).tobytes() if rgb is not None else b"")
+    return header + body
+
+
+def decode_lod(data: bytes) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    magic, count, flags, *values = LOD_HEADER.unpack_from(data)
+    if magic != LOD_MAGIC:
+        raise ValueError("Not a LOD point cloud")
+    origin, scale = np.array(values[:3]), np.array(values[3:])
+    q = np.frombuffer(data, "<u2", count * 3, LOD_HEADER.size).reshape(-1, 3)
+    xyz = origin + q * scale
+    rgb = None
+    if flags & 1:
+        rgb = np.frombuffer(data, np.uint8, count * 3, LOD_HEADER.size + q.nbytes)
+        rgb = rgb.reshape(-1, 3)
+    return xyz, rgb
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+import app.crud as crud
+from app.core.conf import settings
+from app.core.storage import BlobInfo, StorageBackend
+from app.db.models import FileStatusEnum, PlantFile
+
+# blobs are listed by name prefix: directory plus this many name characters
+# (4096 prefixes for uuid names), so one listing covers many files
+PREFIX_CHARS = 3
+
+
+def listing_prefix(name: str) -> str:
+    directory, _, base = name.rpartition("/")
+    return name[: len(name) - len(base) + PREFIX_CHARS]
+
+
+class FileReconciler:
+    """
+    Settles plant files whose blob is written by the client (SAS uploads,
+    app.api.routes.plant_images): a file whose blob exists becomes
+    COMPLETED with the blob's size and etag, and a PENDING file without one
+    past PENDING_FILE_TTL_HOURS becomes FAILED. So does an upload through
+    the API abandoned before its content was named (no file_path), without
+    a listing.
+
+    Each run checks at most FILE_RECONCILE_BATCH_SIZE files with at most
+    FILE_RECONCILE_MAX_LISTINGS storage listings, writes all changes in one
+    statement, and resumes after the files it checked on the next run. One
+    process runs it (app.core.periodic.LeaderLock), so that cursor is the
+    only one.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self.after_id = 0
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> int:
+        """One bounded pass; returns how many files changed status."""
+        cutoff = (now or datetime.utcnow()) - timedelta(
+            hours=settings.PENDING_FILE_TTL_HOURS
+        )
+        files = crud.get_files_to_reconcile(
+            db, self.after_id, settings.FILE_RECONCILE_BATCH_SIZE, cutoff
+        )
+        groups: Dict[str, List[PlantFile]] = {}
+        changes = []
+        for f in files:
+            if f.file_path:
+                groups.setdefault(listing_prefix(f.file_path), []).append(f)
+            elif self._expired(f, cutoff):
+                # the upload died before its blob was named: nothing to list
+                changes.append(self._failed(f))
+        prefixes = list(groups)[: settings.FILE_RECONCILE_MAX_LISTINGS]
+
+        for prefix in prefixes:
+            blobs = self._list(prefix, {f.file_path for f in groups[prefix]})
+            for f in groups[prefix]:
+                blob = blobs.get(f.file_path)
+                if blob:
+                    changes.append(
+                        {
+                            "id": f.id,
+                            "status": FileStatusEnum.COMPLETED,
+                            "size": blob.size,
+                            "etag": blob.etag,
+                        }
+                    )
+                elif self._expired(f, cutoff):
+                    changes.append(self._failed(f))
+        crud.update_files(db, changes)
+
+        unchecked = [
+            f.id for prefix in list(groups)[len(prefixes) :] for f in groups[prefix]
+        ]
+        if unchecked:
+            self.after_id = min(unchecked) - 1
+        elif len(files) == settings.FILE_RECONCILE_BATCH_SIZE:
+            self.after_id = files[-1].id
+        else:  # through the whole table: start over
+            self.after_id = 0
+        return len(changes)
+
+    @staticmethod
+    def _expired(f: PlantFile, cutoff: datetime) -> bool:
+        return (
+            f.status == FileStatusEnum.PENDING
+            and f.created_at is not None
+            and f.created_at < cutoff
+        )
+
+    @staticmethod
+    def _failed(f: PlantFile) -> dict:
+        return {
+            "id": f.id,
+            "status": FileStatusEnum.FAILED,
+            "size": f.size,
+            "etag": f.etag,
+        }
+
+    def _list(self, prefix: str, names: set) -> Dict[str, BlobInfo]:
+        return {
+            blob.name: blob for blob in self.storage.list(prefix) if blob.name in names
+        }
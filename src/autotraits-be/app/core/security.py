@@ -1,8 +1,16 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 
+from fastapi import HTTPException
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.conf import settings
 from app.schemas import TokenData
 
@@ -11,7 +19,21 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # 7 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# sha256(token) -> TokenData, evicted at the token's `exp`
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+# user_id -> (token_version, Principal), read by get_current_principal
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_cached_user(user_id: int):
+    user_cache.pop(user_id)
 
 
 def hash_password(password: str) -> str:
@@ -22,6 +44,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str | None
+) -> tuple[bool, str | None]:
+    """(valid, new_hash): new_hash is set when the stored hash uses an old cost."""
+    if not hashed_password:
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# ======= PASSWORD POOL =======
+# bcrypt is CPU-bound by design; run it in a dedicated process pool so login
+# bursts neither hold the GIL nor occupy the shared request threadpool.
+_password_pool: ProcessPoolExecutor | None = None
+_password_pool_lock = threading.Lock()
+_password_jobs_pending = 0
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                # spawn: never fork a process that already runs threads
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _password_pool
+
+
+def _reset_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        _password_pool = None
+
+
+async def _run_in_password_pool(fn, *args):
+    """
+    Admission control: at most PASSWORD_HASH_MAX_PENDING jobs are queued or
+    running per worker; beyond that callers get an immediate 503.
+    """
+    global _password_jobs_pending
+    with _password_pool_lock:
+        if _password_jobs_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent logins, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_jobs_pending += 1
+    try:
+        return await asyncio.wrap_future(_get_password_pool().submit(fn, *args))
+    except BrokenProcessPool:
+        _reset_password_pool()
+        raise HTTPException(
+            status_code=503,
+            detail="Password service restarting, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    finally:
+        with _password_pool_lock:
+            _password_jobs_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_password_pool(hash_password, password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str | None
+) -> tuple[bool, str | None]:
+    return await _run_in_password_pool(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (
@@ -41,8 +138,22 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None):
 
 
 def decode_token(token: str) -> TokenData | None:
+    """
+    Verify and parse a JWT. Successful results are cached until the token's
+    `exp`, so a cookie presented on every poll is only verified once.
+    Tokens without `exp` and invalid tokens are never cached.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return TokenData(**payload)
+        data = TokenData(**payload)
     except JWTError:
         return None
+
+    if isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(key, data, expires_at=payload["exp"])
+    return data
@@ -0,0 +1,23 @@
+from functools import lru_cache
+
+from app.core.conf import settings
+from app.core.storage.base import BlobData, BlobInfo, BlobNotFoundError, StorageBackend
+
+
+def get_storage() -> StorageBackend:
+    """Storage backend selected by STORAGE_BACKEND, one per process."""
+    return _storage(settings.STORAGE_BACKEND, settings.LOCAL_STORAGE_ROOT)
+
+
+@lru_cache(maxsize=None)
+def _storage(backend: str, local_root: str) -> StorageBackend:
+    # imported here: app.core.adls itself imports app.core.storage.base
+    if backend == "local":
+        from app.core.storage.local import LocalStorage
+
+        return LocalStorage(
+            local_root, settings.LOCAL_STORAGE_BASE_URL, settings.SECRET_KEY
+        )
+    from app.core.storage.azure import AzureStorage
+
+    return AzureStorage()
@@ -0,0 +1,61 @@
+from typing import Dict, Iterable, Iterator, List
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobBlock
+
+from app.core import adls
+from app.core.storage.base import BlobData, BlobInfo, BlobNotFoundError, StorageBackend
+
+
+class AzureStorage(StorageBackend):
+    """ADLS / Blob Storage container ADLS_CONTAINER_NAME (see app.core.adls)."""
+
+    def put(self, name: str, data: BlobData) -> BlobInfo:
+        blob = adls.get_container_client().get_blob_client(name)
+        result = blob.upload_blob(data, overwrite=True)
+        size = len(data) if isinstance(data, bytes) else None
+        return BlobInfo(name, size, result.get("etag"), result.get("last_modified"))
+
+    def get(self, name: str) -> bytes:
+        try:
+            return adls.get_container_client().download_blob(name).readall()
+        except ResourceNotFoundError:
+            raise BlobNotFoundError(name)
+
+    def stream(self, name: str) -> Iterator[bytes]:
+        try:
+            downloader = adls.get_container_client().download_blob(name)
+        except ResourceNotFoundError:
+            raise BlobNotFoundError(name)
+        return downloader.chunks()
+
+    def presign_read(self, names: Iterable[str]) -> Dict[str, str]:
+        return adls.generate_read_sas_urls(names)
+
+    def presign_write(self, name: str, expiry_minutes: int = 60) -> str:
+        return adls.generate_sas_url(name, expiry_minutes, isUpload=True)
+
+    def list(self, prefix: str = "") -> Iterator[BlobInfo]:
+        for blob in adls.get_container_client().list_blobs(
+            name_starts_with=prefix or None
+        ):
+            yield BlobInfo(blob.name, blob.size, blob.etag, blob.last_modified)
+
+    def delete(self, name: str) -> None:
+        try:
+            adls.get_container_client().delete_blob(name)
+        except ResourceNotFoundError:
+            pass
+
+    def stage_block(self, name: str, block_id: str, data: bytes) -> None:
+        blob = adls.get_container_client().get_blob_client(name)
+        blob.stage_block(block_id, data, length=len(data))
+
+    def commit_blocks(self, name: str, block_ids: List[str]) -> BlobInfo:
+        blob = adls.get_container_client().get_blob_client(name)
+        result = blob.commit_block_list([BlobBlock(block_id) for block_id in block_ids])
+        return BlobInfo(name, None, result.get("etag"), result.get("last_modified"))
+
+    def discard_blocks(self, name: str) -> None:
+        # uncommitted blocks are garbage-collected by the service after 7 days
+        pass
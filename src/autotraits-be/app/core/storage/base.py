@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+from app.core.conf import settings
+
+# bytes, a readable file object or an iterable of byte chunks
+BlobData = Union[bytes, BinaryIO, Iterable[bytes]]
+
+
+@dataclass(frozen=True)
+class BlobInfo:
+    name: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+
+class BlobNotFoundError(KeyError):
+    pass
+
+
+def read_url_expiry(now: float) -> float:
+    """
+    Expiry (epoch seconds) shared by every read URL presigned in the current
+    SAS_BUCKET_MINUTES bucket, so repeated listings return identical URLs.
+    """
+    bucket = settings.SAS_BUCKET_MINUTES * 60
+    return now - now % bucket + settings.SAS_EXPIRY_MINUTES * 60
+
+
+def read_url_max_age() -> int:
+    """Validity (seconds) left on a read URL presigned at the end of its bucket."""
+    return (settings.SAS_EXPIRY_MINUTES - settings.SAS_BUCKET_MINUTES) * 60
+
+
+class StorageBackend(ABC):
+    """
+    Blob storage used for plant files. Blob names are relative paths
+    ("<uuid>.png"); presigned URLs let clients read or write one blob
+    directly without going through the API.
+    """
+
+    @abstractmethod
+    def put(self, name: str, data: BlobData) -> BlobInfo:
+        """Create or overwrite a blob."""
+
+    @abstractmethod
+    def get(self, name: str) -> bytes:
+        """Whole blob content; raises BlobNotFoundError."""
+
+    @abstractmethod
+    def stream(self, name: str) -> Iterator[bytes]:
+        """Blob content in chunks; raises BlobNotFoundError."""
+
+    @abstractmethod
+    def presign_read(self, names: Iterable[str]) -> Dict[str, str]:
+        """Read URLs for many blobs, stable within a SAS bucket."""
+
+    @abstractmethod
+    def presign_write(self, name: str, expiry_minutes: int = 60) -> str:
+        """URL a client can PUT the blob's content to."""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Iterator[BlobInfo]:
+        """Blobs whose name starts with `prefix`."""
+
+    @abstractmethod
+    def delete(self, name: str) -> None:
+        """Delete a blob; missing blobs are ignored."""
+
+    # ---- block uploads: stage parts (in any order, concurrently), then commit ----
+    @abstractmethod
+    def stage_block(self, name: str, block_id: str, data: bytes) -> None:
+        """
+        Store one uncommitted block of a blob. All block ids of a blob must
+        have the same length.
+        """
+
+    @abstractmethod
+    def commit_blocks(self, name: str, block_ids: List[str]) -> BlobInfo:
+        """Create or overwrite the blob from staged blocks, in this order."""
+
+    @abstractmethod
+    def discard_blocks(self, name: str) -> None:
+        """Drop a blob's uncommitted blocks (Azure expires them by itself)."""
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import hmac
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+from urllib.parse import quote
+
+from app.core.storage.base import (
+    BlobData,
+    BlobInfo,
+    BlobNotFoundError,
+    StorageBackend,
+    read_url_expiry,
+)
+
+CHUNK_SIZE = 1024 * 1024
+# in-progress writes, hidden from list()
+_TEMP_PREFIX = ".upload-"
+# uncommitted blocks: <root>/.blocks/<sha1 of blob name>/<block id>
+_BLOCKS_DIR = ".blocks"
+
+
+class LocalStorage(StorageBackend):
+    """
+    Blobs as files under a local directory, for development, tests and
+    offline load tests. Presigned URLs point at /api/storage/local/<name>
+    (app.api.routes.storage) and carry an HMAC-SHA256 signature, keyed
+    from SECRET_KEY, over the method, blob name and expiry.
+    """
+
+    def __init__(self, root: str, base_url: str, secret: str):
+        self.root = os.path.realpath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.base_url = base_url.rstrip("/")
+        self._key = hmac.new(secret.encode(), b"local-storage", hashlib.sha256).digest()
+
+    def path(self, name: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    @contextmanager
+    def writer(self, name: str) -> Iterator[BinaryIO]:
+        """
+        File to write a blob's content to. The blob is replaced atomically
+        when the block exits, and left untouched if it raises.
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=_TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, name: str, data: BlobData) -> BlobInfo:
+        with self.writer(name) as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            elif hasattr(data, "read"):
+                shutil.copyfileobj(data, f, CHUNK_SIZE)
+            else:
+                for chunk in data:
+                    f.write(chunk)
+        return self.info(name)
+
+    def info(self, name: str) -> BlobInfo:
+        try:
+            stat = os.stat(self.path(name))
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+        return BlobInfo(
+            name,
+            stat.st_size,
+            f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        )
+
+    def get(self, name: str) -> bytes:
+        try:
+            with open(self.path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+
+    def stream(self, name: str) -> Iterator[bytes]:
+        try:
+            f = open(self.path(name), "rb")
+        except FileNotFoundError:
+            raise BlobNotFoundError(name)
+        return self._chunks(f)
+
+    @staticmethod
+    def _chunks(f) -> Iterator[bytes]:
+        with f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    # ---- presigned URLs ----
+    def sign(self, method: str, name: str, expires: int) -> str:
+        message = f"{method}\n{name}\n{expires}".encode()
+        digest = hmac.new(self._key, message, hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def verify(self, method: str, name: str, expires: int, signature: str) -> bool:
+        return expires >= time.time() and hmac.compare_digest(
+            self.sign(method, name, expires), signature
+        )
+
+    def _url(self, method: str, name: str, expires: int) -> str:
+        signature = self.sign(method, name, expires)
+        return (
+            f"{self.base_url}/api/storage/local/{quote(name)}"
+            f"?expires={expires}&sig={signature}"
+        )
+
+    def presign_read(self, names: Iterable[str]) -> Dict[str, str]:
+        expires = int(read_url_expiry(time.time()))
+        return {name: self._url("GET", name, expires) for name in names}
+
+    def presign_write(self, name: str, expiry_minutes: int = 60) -> str:
+        return self._url("PUT", name, int(time.time()) + expiry_minutes * 60)
+
+    def list(self, prefix: str = "") -> Iterator[BlobInfo]:
+        # in name order, like Azure
+        names = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != _BLOCKS_DIR]
+            for filename in filenames:
+                if filename.startswith(_TEMP_PREFIX):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                name = name.replace(os.sep, "/")
+                if name.startswith(prefix):
+                    names.append(name)
+        for name in sorted(names):
+            try:
+                yield self.info(name)
+            except BlobNotFoundError:  # deleted meanwhile
+                continue
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    # ---- block uploads ----
+    def _blocks_path(self, name: str) -> str:
+        self.path(name)  # validate the name
+        digest = hashlib.sha1(name.encode()).hexdigest()
+        return os.path.join(self.root, _BLOCKS_DIR, digest)
+
+    def _block_path(self, name: str, block_id: str) -> str:
+        if not block_id or not block_id.replace("-", "").isalnum():
+            raise ValueError(f"Invalid block id: {block_id}")
+        return os.path.join(self._blocks_path(name), block_id)
+
+    def stage_block(self, name: str, block_id: str, data: bytes) -> None:
+        path = self._block_path(name, block_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{time.monotonic_ns()}"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def commit_blocks(self, name: str, block_ids: List[str]) -> BlobInfo:
+        with self.writer(name) as f:
+            for block_id in block_ids:
+                try:
+                    with open(self._block_path(name, block_id), "rb") as block:
+                        shutil.copyfileobj(block, f, CHUNK_SIZE)
+                except FileNotFoundError:
+                    raise BlobNotFoundError(f"{name} block {block_id}")
+        self.discard_blocks(name)
+        return self.info(name)
+
+    def discard_blocks(self, name: str) -> None:
+        shutil.rmtree(self._blocks_path(name), ignore_errors=True)
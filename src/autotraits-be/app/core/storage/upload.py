@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, List, Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+import app.crud as crud
+from app.core.conf import settings
+from app.core.storage.base import BlobInfo, StorageBackend
+from app.db.models import PlantFile
+from app.schemas import FileStatusEnum
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def read_upload_file(
+    file: UploadFile, chunk_size: int = 1024 * 1024
+) -> AsyncIterator[bytes]:
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+def block_id(index: int) -> str:
+    # fixed width: Azure requires equal-length ids within a blob
+    return f"{index:06d}"
+
+
+async def upload_stream(
+    storage: StorageBackend,
+    name: str,
+    chunks: AsyncIterator[bytes],
+    max_bytes: Optional[int] = None,
+) -> BlobInfo:
+    """
+    Write a blob from an async byte stream without blocking the event loop.
+    A stream that fits in one UPLOAD_BLOCK_SIZE block is written with one
+    put; larger ones are staged block by block by up to UPLOAD_CONCURRENCY
+    threads while reading continues, then committed, so at most that many
+    blocks are held in memory. Raises UploadTooLargeError as soon as more
+    than `max_bytes` have been read; nothing is committed then.
+    """
+    block_size = settings.UPLOAD_BLOCK_SIZE
+    slots = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+    tasks, block_ids = [], []
+    buffer, total = bytearray(), 0
+
+    async def stage(block: str, data: bytes):
+        try:
+            await run_in_threadpool(storage.stage_block, name, block, data)
+        finally:
+            slots.release()
+
+    async def flush(data: bytes):
+        await slots.acquire()
+        for task in tasks:  # fail fast on an earlier block
+            if task.done() and task.exception():
+                slots.release()
+                raise task.exception()
+        block_ids.append(block_id(len(block_ids)))
+        tasks.append(asyncio.create_task(stage(block_ids[-1], data)))
+
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if max_bytes is not None and total > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+            buffer += chunk
+            while len(buffer) > block_size:
+                await flush(bytes(buffer[:block_size]))
+                del buffer[:block_size]
+
+        if not block_ids:
+            return await run_in_threadpool(storage.put, name, bytes(buffer))
+        await flush(bytes(buffer))
+        await asyncio.gather(*tasks)
+        info = await run_in_threadpool(storage.commit_blocks, name, block_ids)
+        return BlobInfo(name, total, info.etag, info.last_modified)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if block_ids:
+            await run_in_threadpool(storage.discard_blocks, name)
+        raise
+
+
+# ---- content-addressed blobs ----
+# Uploads received by the API are named after their content, so identical
+# uploads (rig retries, placeholder images) share one blob. Blobs written
+# by clients (SAS, resumable sessions) keep uuid names.
+#
+# A blob is deleted once no plant_files row references it, so references
+# are made before a blob is checked: hash_upload() names the content, the
+# caller commits the name on its row (crud locks the path meanwhile), then
+# store_content_addressed() writes the blob unless it exists. release_blobs()
+# holds the same lock while it counts references and deletes, so it either
+# sees the new reference or deletes first, and the blob is written again.
+def content_path(digest: str, extension: str) -> str:
+    return f"{digest}.{extension}"
+
+
+def find_blob(storage: StorageBackend, name: str) -> Optional[BlobInfo]:
+    return next((blob for blob in storage.list(name) if blob.name == name), None)
+
+
+def _hash_spool(spool: BinaryIO, max_bytes: Optional[int]) -> str:
+    digest, total = hashlib.sha256(), 0
+    spool.seek(0)
+    while chunk := spool.read(settings.UPLOAD_BLOCK_SIZE):
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        digest.update(chunk)
+    spool.seek(0)
+    return digest.hexdigest()
+
+
+async def hash_upload(
+    file: UploadFile, extension: str, max_bytes: Optional[int] = None
+) -> str:
+    """
+    Blob name of an upload, "<sha256>.<extension>". The file, already
+    spooled by the multipart parser, is hashed in one threadpool call and
+    rewound. Raises UploadTooLargeError once more than `max_bytes` were read.
+    """
+    digest = await run_in_threadpool(_hash_spool, file.file, max_bytes)
+    return content_path(digest, extension)
+
+
+async def store_content_addressed(
+    storage: StorageBackend, name: str, file: UploadFile
+) -> BlobInfo:
+    """
+    Write `file` as blob `name` (from hash_upload, already referenced by its
+    row) unless that blob exists; returns the blob.
+    """
+    existing = await run_in_threadpool(find_blob, storage, name)
+    if existing is not None:
+        return existing
+    return await upload_stream(storage, name, read_upload_file(file))
+
+
+def file_blobs(files: Iterable[PlantFile]) -> Dict[str, List[str]]:
+    """Blobs of files about to be deleted: original -> its variants' blobs."""
+    blobs = {}
+    for f in files:
+        if f.file_path:
+            blobs.setdefault(f.file_path, []).extend(v.file_path for v in f.variants)
+    return blobs
+
+
+def release_blobs(
+    db: Session, storage: StorageBackend, blobs: Dict[str, List[str]]
+) -> int:
+    """
+    After their rows are deleted, delete the blobs (from file_blobs) that no
+    plant file references any more, with their variants, each under its
+    path lock. Returns how many originals were deleted.
+    """
+    deleted = 0
+    for name in sorted(blobs):
+        crud.lock_file_paths(db, [name])
+        if not crud.get_referenced_file_paths(db, [name]):
+            for variant in blobs[name]:
+                storage.delete(variant)
+            storage.delete(name)
+            deleted += 1
+        db.commit()  # releases the lock
+    return deleted
+
+
+# ---- resumable upload sessions ----
+def expire_upload_sessions(
+    db: Session, storage: StorageBackend, now: Optional[datetime] = None
+) -> int:
+    """
+    Drop sessions idle for UPLOAD_SESSION_TTL_HOURS: discard their staged
+    blocks and mark their files FAILED. Returns how many were dropped.
+    """
+    ttl = timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    stale = crud.get_stale_upload_sessions(db, (now or datetime.utcnow()) - ttl)
+    for upload in stale:
+        storage.discard_blocks(upload.file.file_path)
+        crud.finish_upload_session(db, upload, FileStatusEnum.FAILED)
+    return len(stale)
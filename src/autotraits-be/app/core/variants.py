@@ -0,0 +1,198 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+from sqlalchemy.orm import Session
+
+import app.crud as crud
+from app.core import pointcloud
+from app.core.conf import settings
+from app.core.storage import StorageBackend
+from app.db.models import FileTypeEnum, FileVariantEnum, PlantFileVariant
+
+logger = logging.getLogger(__name__)
+
+
+def variant_path(file_path: str, variant: FileVariantEnum) -> str:
+    """Blob of a variant, next to the original: "<uuid>.png" -> "<uuid>.thumb.webp"."""
+    stem, _ = os.path.splitext(file_path)
+    return f"{stem}.{variant.value}.webp"
+
+
+def lod_path(file_path: str, level: int) -> str:
+    """Blob of a point cloud level: "<uuid>.ply" -> "<uuid>.lod0.pcl"."""
+    stem, _ = os.path.splitext(file_path)
+    return f"{stem}.lod{level}.pcl"
+
+
+def render_variants(data: bytes) -> Dict[FileVariantEnum, Tuple[bytes, int, int]]:
+    """WebP thumbnail and preview of an image: variant -> (content, width, height)."""
+    with Image.open(BytesIO(data)) as image:
+        if image.width * image.height > settings.IMAGE_MAX_PIXELS:
+            raise ValueError(f"Image too large ({image.width}x{image.height})")
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    preview_size = settings.IMAGE_PREVIEW_SIZE
+    image.thumbnail((preview_size, preview_size), Image.Resampling.LANCZOS)
+    thumb_size = settings.IMAGE_THUMB_SIZE
+    # the thumbnail is cut from the preview: cheaper, and as sharp
+    thumb = ImageOps.fit(image, (thumb_size, thumb_size), Image.Resampling.LANCZOS)
+
+    rendered = {}
+    for variant, variant_image in (
+        (FileVariantEnum.THUMB, thumb),
+        (FileVariantEnum.PREVIEW, image),
+    ):
+        out = BytesIO()
+        variant_image.save(out, "WEBP", quality=settings.IMAGE_WEBP_QUALITY)
+        rendered[variant] = (out.getvalue(), *variant_image.size)
+    return rendered
+
+
+def process_file(
+    storage: StorageBackend, file_id: int, file_path: str, file_type: FileTypeEnum
+) -> List[dict]:
+    """
+    Worker-process job: read one original, write its variants next to it and
+    return their plant_file_variants rows. Only paths and rows cross the
+    process boundary, never file data.
+    """
+    if file_type == FileTypeEnum.THREE_D:
+        return _point_cloud_variants(storage, file_id, file_path)
+    rows = []
+    for variant, (content, width, height) in render_variants(
+        storage.get(file_path)
+    ).items():
+        path = variant_path(file_path, variant)
+        storage.put(path, content)
+        rows.append(
+            {
+                "file_id": file_id,
+                "variant": variant,
+                "level": 0,
+                "file_path": path,
+                "width": width,
+                "height": height,
+                "point_count": None,
+                "size": len(content),
+            }
+        )
+    return rows
+
+
+def _point_cloud_variants(
+    storage: StorageBackend, file_id: int, file_path: str
+) -> List[dict]:
+    # spooled to disk so the PLY can be memory-mapped
+    with tempfile.NamedTemporaryFile(suffix=".ply") as f:
+        for chunk in storage.stream(file_path):
+            f.write(chunk)
+        f.flush()
+        xyz, rgb = pointcloud.read_ply(f.name)
+
+    rows = []
+    levels = pointcloud.lod_levels(xyz, rgb, settings.POINT_CLOUD_LOD_FRACTIONS)
+    for level, (level_xyz, level_rgb) in enumerate(levels):
+        content = pointcloud.encode_lod(level_xyz, level_rgb)
+        path = lod_path(file_path, level)
+        storage.put(path, content)
+        rows.append(
+            {
+                "file_id": file_id,
+                "variant": FileVariantEnum.LOD,
+                "level": level,
+                "file_path": path,
+                "width": None,
+                "height": None,
+                "point_count": len(level_xyz),
+                "size": len(content),
+            }
+        )
+    return rows
+
+
+def variant_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers or settings.IMAGE_VARIANT_WORKERS,
+        # spawn: never fork a process that already runs threads
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def generate_variants(
+    session_factory: Callable[[], Session],
+    storage: StorageBackend,
+    executor: Executor,
+    batch_size: int = 100,
+    skip: Optional[Set[int]] = None,
+) -> Tuple[int, List[int]]:
+    """
+    Render variants for every completed file that has none (2D: thumbnail
+    and preview, 3D: levels of detail), a batch at a time; each batch's rows
+    are inserted together. Files sharing a blob share its variants: they are
+    rendered once and their rows copied. Files in `skip` are left alone.
+    Returns (files done, ids of files that failed).
+    """
+    done, failed, last_id = 0, [], 0
+    skip = skip or set()
+    while True:
+        with session_factory() as db:
+            files = crud.get_files_missing_variants(db, last_id, batch_size)
+            rendered = {
+                path: [_variant_row(v) for v in variants]
+                for path, variants in crud.get_variants_by_file_path(
+                    db, {f.file_path for f in files}
+                ).items()
+            }
+        if not files:
+            return done, failed
+        last_id = files[-1].id
+
+        rows, futures, sharing = [], {}, {}
+        for f in files:
+            if f.id in skip:
+                continue
+            if f.file_path in rendered:
+                rows += [dict(row, file_id=f.id) for row in rendered[f.file_path]]
+                done += 1
+            elif f.file_path in sharing:
+                sharing[f.file_path].append(f.id)
+            else:
+                sharing[f.file_path] = [f.id]
+                future = executor.submit(
+                    process_file, storage, f.id, f.file_path, f.file_type
+                )
+                futures[future] = f.file_path
+        for future in as_completed(futures):
+            file_ids = sharing[futures[future]]
+            try:
+                result = future.result()
+            except Exception:
+                logger.exception("Could not render variants of file %d", file_ids[0])
+                failed += file_ids
+                continue
+            for file_id in file_ids:
+                rows += [dict(row, file_id=file_id) for row in result]
+            done += len(file_ids)
+        if rows:
+            with session_factory() as db:
+                crud.add_file_variants(db, rows)
+
+
+def _variant_row(variant: PlantFileVariant) -> dict:
+    return {
+        column: getattr(variant, column)
+        for column in (
+            "variant",
+            "level",
+            "file_path",
+            "width",
+            "height",
+            "point_count",
+            "size",
+        )
+    }
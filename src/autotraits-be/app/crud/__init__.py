@@ -1,3 +1,4 @@
 from .plant import *
 from .plant_measurement import *
-from .plant_image import *
\ No newline at end of file
+from .plant_image import *
+from .user import *
\ No newline at end of file
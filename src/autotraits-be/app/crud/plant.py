@@ -1,10 +1,32 @@
 from typing import Optional
 from fastapi import HTTPException
 
-from sqlalchemy.orm import Session
-from app.db.models import Plant
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, aliased
+
+from app.core.coalesce import data_versions
+from app.db.models import (
+    FileStatusEnum,
+    FileTypeEnum,
+    Plant,
+    PlantFile,
+    PlantMeasurement,
+)
+from app.db.session import replica_read
 from app.schemas import PlantCreate, PlantUpdate
 
+# Numeric traits of the latest measurement embedded in plant listings
+LATEST_TRAIT_FIELDS = [
+    "ripe",
+    "biomass",
+    "canopy_density",
+    "yield_per_plant",
+    "cum_yield_per_plant",
+    "crop_composition",
+    "plant_height",
+    "exg",
+]
+
 
 # ========= PLANT =========
 def create_plant(db: Session, plant: PlantCreate, breeder_id: int):
@@ -18,6 +40,7 @@ def create_plant(db: Session, plant: PlantCreate, breeder_id: int):
     db_plant = Plant(**plant.dict(), breeder_id=breeder_id)
     db.add(db_plant)
     db.commit()
+    data_versions.bump(breeder_id)
     db.refresh(db_plant)
     return db_plant
 
@@ -34,6 +57,7 @@ def get_plant(db: Session, plant_id: str, breeder_id: Optional[int] = None):
 #     return query.first()
 
 
+@replica_read
 def get_all_plants(
     db: Session, breeder_id: Optional[int] = None, offset: int = 0, limit: int = 10
 ):
@@ -42,7 +66,103 @@ def get_all_plants(
         query = query.filter(Plant.breeder_id == breeder_id)
 
     total = query.count()
-    items = query.offset(offset).limit(limit).all()
+    items = query.order_by(Plant.id).offset(offset).limit(limit).all()
+    return total, items
+
+
+@replica_read
+def get_all_plants_with_stats(
+    db: Session, breeder_id: Optional[int] = None, offset: int = 0, limit: int = 10
+):
+    """
+    Same page as get_all_plants, with per-plant rollups (measurement count,
+    latest measurement date + traits, image counts) computed in one query.
+    Aggregates are restricted to the plant ids of the requested page.
+    """
+    query = db.query(Plant)
+    if breeder_id:
+        query = query.filter(Plant.breeder_id == breeder_id)
+    total = query.count()
+
+    page = (
+        query.with_entities(Plant.id)
+        .order_by(Plant.id)
+        .offset(offset)
+        .limit(limit)
+        .subquery("page")
+    )
+    page_ids = db.query(page.c.id)
+
+    measurement_stats = (
+        db.query(
+            PlantMeasurement.plant_id.label("plant_id"),
+            func.count(PlantMeasurement.id).label("measurement_count"),
+            func.max(PlantMeasurement.date).label("latest_date"),
+        )
+        .filter(PlantMeasurement.plant_id.in_(page_ids))
+        .group_by(PlantMeasurement.plant_id)
+        .subquery("measurement_stats")
+    )
+    file_stats = (
+        db.query(
+            PlantFile.plant_id.label("plant_id"),
+            func.count(PlantFile.id)
+            .filter(PlantFile.file_type == FileTypeEnum.TWO_D)
+            .label("two_d_count"),
+            func.count(PlantFile.id)
+            .filter(PlantFile.file_type == FileTypeEnum.THREE_D)
+            .label("three_d_count"),
+        )
+        .filter(
+            PlantFile.plant_id.in_(page_ids),
+            # pending and failed upload attempts are not images
+            PlantFile.status == FileStatusEnum.COMPLETED,
+        )
+        .group_by(PlantFile.plant_id)
+        .subquery("file_stats")
+    )
+    latest = aliased(PlantMeasurement)
+
+    rows = (
+        db.query(
+            Plant,
+            measurement_stats.c.measurement_count,
+            measurement_stats.c.latest_date,
+            file_stats.c.two_d_count,
+            file_stats.c.three_d_count,
+            *[getattr(latest, f) for f in LATEST_TRAIT_FIELDS],
+        )
+        .join(page, page.c.id == Plant.id)
+        .outerjoin(measurement_stats, measurement_stats.c.plant_id == Plant.id)
+        .outerjoin(file_stats, file_stats.c.plant_id == Plant.id)
+        .outerjoin(
+            latest,
+            and_(
+                latest.plant_id == Plant.id,
+                latest.date == measurement_stats.c.latest_date,
+            ),
+        )
+        .order_by(Plant.id)
+        .all()
+    )
+
+    items = []
+    for plant, m_count, latest_date, two_d, three_d, *traits in rows:
+        items.append(
+            {
+                "id": plant.id,
+                "plant_code": plant.plant_code,
+                "stats": {
+                    "measurement_count": m_count or 0,
+                    "latest_measurement_date": latest_date,
+                    "two_d_image_count": two_d or 0,
+                    "three_d_image_count": three_d or 0,
+                    "latest_traits": (
+                        dict(zip(LATEST_TRAIT_FIELDS, traits)) if latest_date else {}
+                    ),
+                },
+            }
+        )
     return total, items
 
 
@@ -66,6 +186,7 @@ def update_plant(db: Session, plant_id: int, plant: PlantUpdate, breeder_id: int
     for k, v in update_data.items():
         setattr(db_plant, k, v)
     db.commit()
+    data_versions.bump(breeder_id)
     db.refresh(db_plant)
     return db_plant
 
@@ -78,4 +199,5 @@ def delete_plant(db: Session, plant_id: int, breeder_id: int):
 
     db.delete(plant)
     db.commit()
+    data_versions.bump(breeder_id)
     return plant
@@ -1,8 +1,19 @@
-from datetime import date
-from typing import Optional
-from sqlalchemy.orm import Session
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import exists, insert, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.db.models import Plant, PlantFile
+from app.core.coalesce import data_versions
+from app.db.models import (
+    Plant,
+    PlantFile,
+    PlantFileVariant,
+    UploadChunk,
+    UploadSession,
+)
+from app.db.session import replica_read
 from app.schemas import FileCreate, FileTypeEnum, FileStatusEnum
 
 
@@ -22,7 +33,7 @@ def get_file(db: Session, file_id: int):
 def get_files(
     db: Session, plant_id: Optional[str] = None, file_type: Optional[str] = None
 ):
-    query = db.query(PlantFile)
+    query = db.query(PlantFile).options(selectinload(PlantFile.variants))
     if plant_id:
         query = query.filter(PlantFile.plant_id == plant_id)
     if file_type:
@@ -33,28 +44,71 @@ def get_files(
 def delete_file(db: Session, file_id: int):
     file = get_file(db, file_id)
     if file:
+        breeder_id = file.plant.breeder_id
         db.delete(file)
         db.commit()
+        data_versions.bump(breeder_id)
     return file
 
 
-def get_plant_files(
-    db: Session,
+def lock_file_paths(db: Session, paths: Iterable[str]):
+    """
+    PostgreSQL: lock blob paths until the transaction ends, to reference a
+    content-addressed blob or delete it (app.core.storage.upload). Keys are
+    taken in order, so concurrent callers do not deadlock.
+    """
+    paths = [path for path in paths if path]
+    if not paths or db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(key) FROM (SELECT DISTINCT hashtext(path)"
+            " AS key FROM unnest(CAST(:paths AS text[])) AS path ORDER BY key) keys"
+        ),
+        {"paths": paths},
+    )
+
+
+def get_referenced_file_paths(db: Session, paths: Iterable[str]) -> Set[str]:
+    """Those of `paths` that some plant file still stores its content in."""
+    stmt = select(PlantFile.file_path).where(PlantFile.file_path.in_(list(paths)))
+    return set(db.scalars(stmt.distinct()))
+
+
+def _plant_files_statement(
     plant_code: str,
     file_type: FileTypeEnum,
     date: Optional[date] = None,
     breeder_id: Optional[int] = None,
+    with_variants: bool = False,
 ):
-    query = (
-        db.query(PlantFile)
+    stmt = (
+        select(PlantFile)
         .join(Plant)
-        .filter(Plant.plant_code == plant_code, PlantFile.file_type == file_type)
+        .where(Plant.plant_code == plant_code, PlantFile.file_type == file_type)
     )
     if breeder_id:
-        query = query.filter(Plant.breeder_id == breeder_id)
+        stmt = stmt.where(Plant.breeder_id == breeder_id)
     if date:
-        query = query.filter(PlantFile.date == date)
-    return query.all()
+        stmt = stmt.where(PlantFile.date == date)
+    if with_variants:
+        stmt = stmt.options(selectinload(PlantFile.variants))
+    return stmt
+
+
+@replica_read
+async def get_plant_files_async(
+    db: AsyncSession,
+    plant_code: str,
+    file_type: FileTypeEnum,
+    date: Optional[date] = None,
+    breeder_id: Optional[int] = None,
+    with_variants: bool = False,
+):
+    stmt = _plant_files_statement(
+        plant_code, file_type, date, breeder_id, with_variants
+    )
+    return (await db.scalars(stmt)).all()
 
 
 def create_plant_file(
@@ -85,17 +139,244 @@ def create_plant_file(
     )
     db.add(file_obj)
     db.commit()
+    # breeder_id is None for admin uploads: bump the plant owner's version
+    data_versions.bump(file_obj.plant.breeder_id)
     db.refresh(file_obj)
     return file_obj
 
 
+def create_plant_files(db: Session, files: List[dict]) -> List[int]:
+    """
+    Insert many plant_files rows (plant_id, date, file_path, file_type,
+    status, size, etag) in one statement, their paths locked
+    (lock_file_paths); returns their ids, in order.
+    Plant ownership is the caller's to check.
+    """
+    if not files:
+        return []
+    lock_file_paths(db, [f["file_path"] for f in files])
+    ids = db.scalars(
+        insert(PlantFile).returning(PlantFile.id, sort_by_parameter_order=True), files
+    ).all()
+    db.commit()
+    plant_ids = {f["plant_id"] for f in files}
+    for (breeder_id,) in db.query(Plant.breeder_id).filter(Plant.id.in_(plant_ids)):
+        data_versions.bump(breeder_id)
+    return ids
+
+
 def update_file_status(
-    db: Session, file_id: int, new_status: FileStatusEnum
+    db: Session,
+    file_id: int,
+    new_status: FileStatusEnum,
+    size: Optional[int] = None,
+    etag: Optional[str] = None,
+    file_path: Optional[str] = None,
 ) -> PlantFile:
     file_record = db.query(PlantFile).filter(PlantFile.id == file_id).first()
     if not file_record:
         return None
     file_record.status = new_status
+    if file_path is not None:
+        lock_file_paths(db, [file_path])
+        file_record.file_path = file_path
+    if size is not None:
+        file_record.size = size
+    if etag is not None:
+        file_record.etag = etag
+    db.commit()
+    data_versions.bump(file_record.plant.breeder_id)
+    db.refresh(file_record)
+    return file_record
+
+
+# ========= RECONCILER =========
+def get_files_to_reconcile(
+    db: Session, after_id: int, limit: int, failed_since: datetime
+) -> List[PlantFile]:
+    """
+    Files whose blob may have arrived without the row being updated: PENDING
+    ones, and FAILED ones created since `failed_since`. Files of an open
+    resumable upload are left to it. Uploads through the API get their path
+    once stored: PENDING ones without one can only expire, FAILED ones are
+    final. By id, after `after_id`.
+    """
+    has_session = exists().where(UploadSession.file_id == PlantFile.id)
+    stmt = (
+        select(PlantFile)
+        .where(
+            PlantFile.status != FileStatusEnum.COMPLETED,
+            or_(
+                PlantFile.status == FileStatusEnum.PENDING,
+                PlantFile.created_at >= failed_since,
+            ),
+            PlantFile.id > after_id,
+            or_(
+                PlantFile.file_path.isnot(None),
+                PlantFile.status == FileStatusEnum.PENDING,
+            ),
+            ~has_session,
+        )
+        .order_by(PlantFile.id)
+        .limit(limit)
+    )
+    return db.scalars(stmt).all()
+
+
+def update_files(db: Session, changes: List[dict]):
+    """
+    Bulk update by primary key, one executemany statement: each dict has
+    "id" and the same set of columns to set.
+    """
+    if not changes:
+        return
+    db.execute(update(PlantFile), changes)
+    db.commit()
+    ids = [change["id"] for change in changes]
+    breeder_ids = db.scalars(
+        select(Plant.breeder_id).join(PlantFile).where(PlantFile.id.in_(ids)).distinct()
+    )
+    for breeder_id in breeder_ids:
+        data_versions.bump(breeder_id)
+
+
+# ========= VARIANTS =========
+def get_files_missing_variants(
+    db: Session, after_id: int = 0, limit: int = 100
+) -> List[PlantFile]:
+    """Completed files without variants, by id, after `after_id`."""
+    has_variants = exists().where(PlantFileVariant.file_id == PlantFile.id)
+    stmt = (
+        select(PlantFile)
+        .where(
+            PlantFile.status == FileStatusEnum.COMPLETED,
+            PlantFile.id > after_id,
+            ~has_variants,
+        )
+        .order_by(PlantFile.id)
+        .limit(limit)
+    )
+    return db.scalars(stmt).all()
+
+
+def get_variants_by_file_path(
+    db: Session, paths: Iterable[str]
+) -> Dict[str, List[PlantFileVariant]]:
+    """
+    Variants already rendered for any file stored in one of `paths`, by
+    path: files sharing a content-addressed blob share its variants.
+    """
+    stmt = (
+        select(PlantFile.file_path, PlantFileVariant)
+        .join(PlantFileVariant.file)
+        .where(PlantFile.file_path.in_(list(paths)))
+        .order_by(PlantFileVariant.file_id, PlantFileVariant.id)
+    )
+    variants, owners = {}, {}
+    for path, variant in db.execute(stmt):
+        # one file's set per path
+        if owners.setdefault(path, variant.file_id) == variant.file_id:
+            variants.setdefault(path, []).append(variant)
+    return variants
+
+
+def add_file_variants(db: Session, rows: List[dict]):
+    db.execute(insert(PlantFileVariant), rows)
+    db.commit()
+
+
+# ========= RESUMABLE UPLOADS =========
+def create_upload_session(
+    db: Session,
+    plant_id: str,
+    date: date,
+    file_path: str,
+    file_type: str,
+    size: int,
+    chunk_size: int,
+    breeder_id: Optional[int] = None,
+) -> UploadSession:
+    # PENDING file record first, so the attempt is recorded like any upload
+    file_obj = create_plant_file(
+        db,
+        plant_id=plant_id,
+        date=date,
+        file_path=file_path,
+        file_type=file_type,
+        status=FileStatusEnum.PENDING,
+        breeder_id=breeder_id,
+    )
+    upload = UploadSession(
+        id=str(uuid.uuid4()), file_id=file_obj.id, size=size, chunk_size=chunk_size
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def get_upload_session(
+    db: Session, upload_id: str, breeder_id: Optional[int] = None
+) -> Optional[UploadSession]:
+    stmt = (
+        select(UploadSession)
+        .options(joinedload(UploadSession.file))
+        .where(UploadSession.id == upload_id)
+    )
+    if breeder_id:
+        stmt = stmt.join(PlantFile).join(Plant).where(Plant.breeder_id == breeder_id)
+    return db.scalars(stmt).first()
+
+
+def get_upload_chunks(db: Session, upload_id: str) -> Dict[int, int]:
+    """Received chunks of a session: index -> size."""
+    rows = db.execute(
+        select(UploadChunk.index, UploadChunk.size).where(
+            UploadChunk.session_id == upload_id
+        )
+    )
+    return dict(rows.all())
+
+
+def record_upload_chunk(db: Session, upload_id: str, index: int, size: int):
+    # a chunk sent again (retry) replaces the earlier block and row
+    db.merge(
+        UploadChunk(
+            session_id=upload_id,
+            index=index,
+            size=size,
+            received_at=datetime.utcnow(),
+        )
+    )
     db.commit()
+
+
+def finish_upload_session(
+    db: Session,
+    upload: UploadSession,
+    status: FileStatusEnum,
+    etag: Optional[str] = None,
+) -> PlantFile:
+    """Set the file's final status and drop the session (and its chunk rows)."""
+    file_record = upload.file
+    file_record.status = status
+    if status == FileStatusEnum.COMPLETED:
+        file_record.size, file_record.etag = upload.size, etag
+    db.delete(upload)
+    db.commit()
+    data_versions.bump(file_record.plant.breeder_id)
     db.refresh(file_record)
     return file_record
+
+
+def get_stale_upload_sessions(db: Session, cutoff: datetime) -> List[UploadSession]:
+    """Sessions created, and last sent a chunk, before `cutoff`."""
+    recent_chunk = exists().where(
+        UploadChunk.session_id == UploadSession.id, UploadChunk.received_at >= cutoff
+    )
+    stmt = (
+        select(UploadSession)
+        .options(joinedload(UploadSession.file))
+        .where(UploadSession.created_at < cutoff, ~recent_chunk)
+    )
+    return db.scalars(stmt).all()
@@ -1,14 +1,21 @@
 import json
 import math
-from typing import Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException
 from datetime import date, datetime
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, func, insert, literal, literal_column, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, noload
 
 import app.crud as crud
 
+from app.core.coalesce import coalesce, data_versions
+from app.core.conf import settings
+from app.core.fruits import FRUIT_STAT_FIELDS, fruit_stats, pack_fruits, unpack_fruits
 from app.db.models import Plant, PlantFruit, PlantMeasurement
+from app.db.session import replica_read
 
 from app.schemas import PlantCreate, FruitCreate, MeasurementCreate, MeasurementUpdate
 
@@ -52,53 +59,169 @@ def validate_measurement(measurement_dict: dict, fruits_data: list):
                 )
 
 
-def create_measurement(db: Session, data: MeasurementCreate, breeder_id: int):
-    # 1. Ensure plant exists
-    plant = (
-        db.query(Plant)
-        .filter(Plant.id == data.plant_id, Plant.breeder_id == breeder_id)
-        .first()
+def _packed_fruits() -> bool:
+    return settings.FRUIT_STORAGE_MODE == "packed"
+
+
+def _fruits_option():
+    """Packed mode reads fruits from the measurement row: skip plant_fruits."""
+    if _packed_fruits():
+        return noload(PlantMeasurement.fruits)
+    return joinedload(PlantMeasurement.fruits)
+
+
+def _measurement_row(data: MeasurementCreate) -> dict:
+    """plant_measurements column values for `data` (plant_id included)."""
+    row = data.dict(exclude={"fruits"})
+    row["ripe"] = len(data.fruits)
+    # always written, so a row never holds stale packed fruits
+    row["fruits_packed"] = pack_fruits(data.fruits) if _packed_fruits() else None
+    row.update(fruit_stats(data.fruits))
+    return row
+
+
+def _dialect_insert(db: Session):
+    """`insert` with ON CONFLICT support for the session's database."""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def _insert_measurement_statement(
+    db: Session, data: MeasurementCreate, breeder_id: int, upsert: bool
+):
+    """
+    INSERT .. SELECT FROM plants .. ON CONFLICT (plant_id, date) .. RETURNING.
+    Selecting from plants makes the breeder ownership check part of the
+    insert: no row comes back when the plant is missing or not owned, or
+    (without `upsert`) when the (plant_id, date) key is taken.
+    """
+    table = PlantMeasurement.__table__
+    values = _measurement_row(data)
+    del values["plant_id"]
+
+    source = select(
+        Plant.id, *(literal(v, table.c[k].type) for k, v in values.items())
+    ).where(Plant.id == data.plant_id, Plant.breeder_id == breeder_id)
+    stmt = _dialect_insert(db)(table).from_select(["plant_id", *values], source)
+    if upsert:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["plant_id", "date"],
+            set_={k: stmt.excluded[k] for k in values if k != "date"},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["plant_id", "date"])
+
+    # RETURNING is compiled outside any SELECT, so correlate by name
+    inserted_plant_id = literal_column(f"{table.name}.plant_id")
+    plant_code = (
+        select(Plant.plant_code)
+        .where(Plant.id == inserted_plant_id)
+        .scalar_subquery()
+        .label("plant_code")
     )
-    if not plant:
+    return stmt.returning(table.c.id, plant_code)
+
+
+def _insert_fruits(
+    db: Session, measurement_id: int, measurement_date: date, fruits: List[FruitCreate]
+) -> List[dict]:
+    """
+    Store fruits as plant_fruits rows (table mode) and return them as
+    FruitInDB dicts. In packed mode they were written with the measurement.
+    """
+    if _packed_fruits():
+        return unpack_fruits(pack_fruits(fruits))
+    if not fruits:
+        return []
+    fruit_ids = db.scalars(
+        insert(PlantFruit.__table__).returning(
+            PlantFruit.__table__.c.id, sort_by_parameter_order=True
+        ),
+        [
+            {
+                **fruit.dict(),
+                "measurement_id": measurement_id,
+                "measurement_date": measurement_date,
+            }
+            for fruit in fruits
+        ],
+    ).all()
+    return [
+        {**fruit.dict(), "id": fruit_id} for fruit_id, fruit in zip(fruit_ids, fruits)
+    ]
+
+
+def _written_measurement(data: MeasurementCreate, row, fruits: List[dict]) -> dict:
+    """MeasurementInDB-shaped result built from the request and RETURNING values."""
+    return {
+        **data.dict(exclude={"fruits"}),
+        "id": row.id,
+        **fruit_stats(data.fruits),
+        "ripe": len(data.fruits),
+        "plant": {"id": data.plant_id, "plant_code": row.plant_code},
+        "fruits": fruits,
+    }
+
+
+def _raise_for_integrity_error(e: IntegrityError, data: MeasurementCreate):
+    # Constraint names / wording differ between PostgreSQL and SQLite
+    message = str(e.orig).lower()
+    if "foreign key" in message:
         raise HTTPException(
             status_code=404, detail="Plant not found or does not belong to breeder"
         )
-
-    # 2. Check uniqueness constraint (plant_id, date)
-    existing = (
-        db.query(PlantMeasurement)
-        .filter(
-            PlantMeasurement.plant_id == plant.id,
-            PlantMeasurement.date == data.date,
-        )
-        .first()
-    )
-    if existing:
+    if "uix_plant_date" in message or "unique" in message:
         raise HTTPException(
             status_code=400,
             detail=f"Measurement for plant {data.plant_id} on date {data.date} already exists",
         )
+    raise e
 
-    # 3. Prepare measurement data (exclude fruits)
-    measurement_data = data.dict(exclude={"fruits"})
 
-    # Validate before inserting
-    validate_measurement(measurement_data, data.fruits)
+def _plant_not_found_or_duplicate(
+    db: Session, data: MeasurementCreate, breeder_id: int
+):
+    """Explain an insert that returned no row (error path only)."""
+    owned = db.scalar(
+        select(Plant.id).where(
+            Plant.id == data.plant_id, Plant.breeder_id == breeder_id
+        )
+    )
+    db.rollback()
+    if not owned:
+        raise HTTPException(
+            status_code=404, detail="Plant not found or does not belong to breeder"
+        )
+    raise HTTPException(
+        status_code=400,
+        detail=f"Measurement for plant {data.plant_id} on date {data.date} already exists",
+    )
 
-    # Set ripe to match number of fruits
-    measurement_data["ripe"] = len(data.fruits)
 
-    db_measurement = PlantMeasurement(**measurement_data)
-    db.add(db_measurement)
-    db.flush()  # ensures db_measurement.id is available
+def create_measurement(db: Session, data: MeasurementCreate, breeder_id: int):
+    """
+    Insert a measurement and its fruits in one or two statements.
+    Plant ownership and (plant_id, date) uniqueness are enforced by the
+    INSERT itself (see _insert_measurement_statement), so concurrent
+    submissions of the same key cannot both succeed.
+    """
+    validate_measurement(data.dict(exclude={"fruits"}), data.fruits)
 
-    # 4. Add fruits (if any)
-    for fruit in data.fruits:
-        db.add(PlantFruit(**fruit.dict(), measurement_id=db_measurement.id))
+    try:
+        row = db.execute(
+            _insert_measurement_statement(db, data, breeder_id, upsert=False)
+        ).first()
+        if row is None:
+            _plant_not_found_or_duplicate(db, data, breeder_id)
+        fruits = _insert_fruits(db, row.id, data.date, data.fruits)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        _raise_for_integrity_error(e, data)
 
-    db.commit()
-    db.refresh(db_measurement)
-    return db_measurement
+    data_versions.bump(breeder_id)
+    return _written_measurement(data, row, fruits)
 
 
 def update_measurement(
@@ -134,87 +257,227 @@ def update_measurement(
                 detail=f"Measurement for plant {measurement.plant_id} on date {data.date} already exists",
             )
 
-    # 3. Update scalar fields (exclude fruits + ripe)
+    # 3. Update scalar fields (exclude fruits + ripe); the old fruits are
+    # still stored under the old date until the commit cascades it
+    old_date = measurement.date
     update_data = data.dict(exclude_unset=True, exclude={"fruits", "ripe"})
     for k, v in update_data.items():
         setattr(measurement, k, v)
 
     # Validate before updating
-    fruits_data = (
-        data.fruits
-        if data.fruits is not None
-        else [
+    if data.fruits is not None:
+        fruits_data = data.fruits
+    elif measurement.fruits_packed is not None:
+        fruits_data = [
+            FruitCreate(**fruit) for fruit in unpack_fruits(measurement.fruits_packed)
+        ]
+    else:
+        fruits_data = [
             FruitCreate(width=f.width, height=f.height, mass=f.mass)
             for f in measurement.fruits
         ]
-    )
     validate_measurement({**measurement.__dict__, **update_data}, fruits_data)
 
     # 4. Replace fruits if provided
     if data.fruits is not None:
-        # delete all old fruits at once
-        db.query(PlantFruit).filter_by(measurement_id=measurement.id).delete(
-            synchronize_session=False
-        )
-
+        # delete all old fruits at once (rows left from table mode, too)
+        db.query(PlantFruit).filter_by(
+            measurement_id=measurement.id, measurement_date=old_date
+        ).delete(synchronize_session=False)
+    if data.fruits is not None and _packed_fruits():
+        measurement.fruits_packed = pack_fruits(data.fruits)
+        measurement.ripe = len(data.fruits)
+    elif data.fruits is not None:
         # add new fruits
         for fruit in data.fruits:
-            db.add(PlantFruit(**fruit.dict(), measurement_id=measurement.id))
+            db.add(
+                PlantFruit(
+                    **fruit.dict(),
+                    measurement_id=measurement.id,
+                    measurement_date=measurement.date,
+                )
+            )
 
         # update ripe count
         measurement.ripe = len(data.fruits)
+        measurement.fruits_packed = None
+
+    if data.fruits is not None:
+        for k, v in fruit_stats(data.fruits).items():
+            setattr(measurement, k, v)
 
     db.commit()
+    data_versions.bump(breeder_id)
     db.refresh(measurement)
     return measurement
 
 
 def upsert_measurement(db: Session, data: MeasurementCreate, breeder_id: int):
-    plant = (
-        db.query(Plant)
-        .filter(Plant.id == data.plant_id, Plant.breeder_id == breeder_id)
-        .first()
-    )
-    if not plant:
-        raise HTTPException(
-            status_code=404, detail="Plant not found or does not belong to breeder"
+    """
+    Insert or replace the measurement keyed by (plant_id, date), fruits
+    included: one INSERT .. ON CONFLICT DO UPDATE, then the fruit swap.
+    """
+    measurement_data = data.dict(exclude={"fruits"})
+    validate_measurement(measurement_data, data.fruits)
+
+    try:
+        row = db.execute(
+            _insert_measurement_statement(db, data, breeder_id, upsert=True)
+        ).first()
+        if row is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=404, detail="Plant not found or does not belong to breeder"
+            )
+        db.execute(
+            delete(PlantFruit.__table__).where(
+                PlantFruit.__table__.c.measurement_id == row.id,
+                PlantFruit.__table__.c.measurement_date == data.date,
+            )
         )
+        fruits = _insert_fruits(db, row.id, data.date, data.fruits)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        _raise_for_integrity_error(e, data)
 
-    db_measurement = (
-        db.query(PlantMeasurement)
-        .filter(
-            PlantMeasurement.plant_id == data.plant_id,
-            PlantMeasurement.date == data.date,
+    data_versions.bump(breeder_id)
+    return _written_measurement(data, row, fruits)
+
+
+def create_measurements_batch(
+    db: Session,
+    items: List[MeasurementCreate],
+    breeder_id: int,
+    upsert: bool = False,
+):
+    """
+    Write many measurements in one transaction with set-based statements:
+    one plant ownership query, one existence query, one INSERT .. RETURNING
+    for new rows, one executemany UPDATE for upserted rows and one
+    executemany INSERT for all fruits.
+    Every item is validated before anything is written; invalid items are
+    reported and skipped. With `upsert`, items whose (plant_id, date)
+    already exists replace that measurement and its fruits.
+    Returns per-item status in request order.
+    """
+    results = [{"index": i, "status": "error"} for i in range(len(items))]
+
+    # 1. Validate everything up front, in two queries
+    plant_ids = {item.plant_id for item in items}
+    owned = set(
+        db.scalars(
+            select(Plant.id).where(
+                Plant.id.in_(plant_ids), Plant.breeder_id == breeder_id
+            )
         )
-        .first()
     )
+    existing = {
+        (plant_id, day): measurement_id
+        for measurement_id, plant_id, day in db.execute(
+            select(
+                PlantMeasurement.id, PlantMeasurement.plant_id, PlantMeasurement.date
+            ).where(
+                PlantMeasurement.plant_id.in_(owned),
+                PlantMeasurement.date.in_({item.date for item in items}),
+            )
+        )
+    }
 
-    measurement_data = data.dict(exclude={"fruits"})
-    measurement_data["ripe"] = len(data.fruits)
+    inserts, updates, seen = [], [], {}
+    for i, item in enumerate(items):
+        key = (item.plant_id, item.date)
+        row = _measurement_row(item)
+        try:
+            if item.plant_id not in owned:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Plant not found or does not belong to breeder",
+                )
+            validate_measurement(row, item.fruits)
+            if key in seen:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Duplicate of item {seen[key]} (same plant_id and date)",
+                )
+            if key in existing and not upsert:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Measurement for plant {item.plant_id} on date {item.date} already exists",
+                )
+        except HTTPException as e:
+            results[i]["detail"] = e.detail
+            continue
+
+        seen[key] = i
+        if key in existing:
+            updates.append((i, item, {"id": existing[key], **row}))
+        else:
+            inserts.append((i, item, row))
+
+    if not inserts and not updates:
+        return _batch_summary(results)
+
+    # 2. Write in one transaction
+    try:
+        if inserts:
+            ids = db.scalars(
+                insert(PlantMeasurement).returning(
+                    PlantMeasurement.id, sort_by_parameter_order=True
+                ),
+                [row for _, _, row in inserts],
+            ).all()
+            for (i, _, _), measurement_id in zip(inserts, ids):
+                results[i].update(status="created", id=measurement_id)
+        if updates:
+            db.execute(update(PlantMeasurement), [row for _, _, row in updates])
+            updated_ids = [row["id"] for _, _, row in updates]
+            db.execute(
+                delete(PlantFruit)
+                .where(
+                    PlantFruit.measurement_id.in_(updated_ids),
+                    PlantFruit.measurement_date.in_(
+                        {item.date for _, item, _ in updates}
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            for i, _, row in updates:
+                results[i].update(status="updated", id=row["id"])
+
+        # packed mode wrote the fruits with their measurement rows
+        fruits = [
+            {
+                **fruit.dict(),
+                "measurement_id": results[i]["id"],
+                "measurement_date": item.date,
+            }
+            for i, item, _ in inserts + updates
+            for fruit in item.fruits
+            if not _packed_fruits()
+        ]
+        if fruits:
+            db.execute(insert(PlantFruit), fruits)
+        db.commit()
+    except IntegrityError:
+        # a concurrent writer took one of the (plant_id, date) keys
+        db.rollback()
+        raise HTTPException(
+            status_code=409, detail="Measurements changed concurrently, retry the batch"
+        )
 
-    # Validate before insert/update
-    validate_measurement(measurement_data, data.fruits)
+    data_versions.bump(breeder_id)
+    return _batch_summary(results)
 
-    if db_measurement:
-        # Update
-        for k, v in measurement_data.items():
-            setattr(db_measurement, k, v)
-        db.query(PlantFruit).filter(
-            PlantFruit.measurement_id == db_measurement.id
-        ).delete()
-        for fruit in data.fruits:
-            db.add(PlantFruit(**fruit.dict(), measurement_id=db_measurement.id))
-    else:
-        # Insert
-        db_measurement = PlantMeasurement(**measurement_data)
-        db.add(db_measurement)
-        db.flush()
-        for fruit in data.fruits:
-            db.add(PlantFruit(**fruit.dict(), measurement_id=db_measurement.id))
 
-    db.commit()
-    db.refresh(db_measurement)
-    return db_measurement
+def _batch_summary(results: list) -> dict:
+    statuses = [r["status"] for r in results]
+    return {
+        "created": statuses.count("created"),
+        "updated": statuses.count("updated"),
+        "failed": statuses.count("error"),
+        "items": results,
+    }
 
 
 def bulk_import_measurements(db: Session, df, breeder_id: int):
@@ -331,28 +594,28 @@ def get_measurement(db: Session, measurement_id: int, breeder_id: int):
     query = (
         db.query(PlantMeasurement)
         .join(Plant)
-        .options(
-            joinedload(PlantMeasurement.fruits), joinedload(PlantMeasurement.plant)
-        )
+        .options(_fruits_option(), joinedload(PlantMeasurement.plant))
         .filter(PlantMeasurement.id == measurement_id, Plant.breeder_id == breeder_id)
     )
 
     return query.first()
 
 
-def get_measurements(
-    db: Session,
+# Columns measurement listings can be sorted and range-filtered on
+MEASUREMENT_SORT_FIELDS = ("date", "ripe", *FRUIT_STAT_FIELDS)
+
+
+def _measurements_statement(
     plant_code: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     variety: Optional[str] = None,
     field: Optional[str] = None,
-    offset: int = 0,
-    limit: int = 10,
     breeder_id: Optional[int] = None,
+    ranges: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = (),
 ):
     # Base query with join
-    query = db.query(
+    stmt = select(
         PlantMeasurement,
         func.sum(PlantMeasurement.ripe)
         .over(partition_by=PlantMeasurement.plant_id, order_by=PlantMeasurement.date)
@@ -361,41 +624,77 @@ def get_measurements(
 
     # Filters
     if breeder_id:
-        query = query.filter(Plant.breeder_id == breeder_id)
+        stmt = stmt.where(Plant.breeder_id == breeder_id)
     if plant_code:
-        query = query.filter(Plant.plant_code == plant_code)
+        stmt = stmt.where(Plant.plant_code == plant_code)
     if start_date:
-        query = query.filter(PlantMeasurement.date >= start_date)
+        stmt = stmt.where(PlantMeasurement.date >= start_date)
     if end_date:
-        query = query.filter(PlantMeasurement.date <= end_date)
+        stmt = stmt.where(PlantMeasurement.date <= end_date)
     if variety:
-        query = query.filter(PlantMeasurement.variety == variety)
+        stmt = stmt.where(PlantMeasurement.variety == variety)
     if field:
-        query = query.filter(PlantMeasurement.field == field)
-
-    # Count total (need to count from subquery or base model)
-    total = query.count()
-
+        stmt = stmt.where(PlantMeasurement.field == field)
+    # (column, min, max) on stored columns, e.g. ("fruit_mass_mean", 10, None)
+    for name, low, high in ranges:
+        column = getattr(PlantMeasurement, name)
+        if low is not None:
+            stmt = stmt.where(column >= low)
+        if high is not None:
+            stmt = stmt.where(column <= high)
+    return stmt
+
+
+def _measurements_page(
+    stmt, offset: int, limit: int, sort_by: str = "date", descending: bool = False
+):
     # Pagination + loading relationships
-    items = (
-        query.options(
+    order = getattr(PlantMeasurement, sort_by)
+    order = order.desc() if descending else order.asc()
+    return (
+        stmt.options(
             joinedload(PlantMeasurement.plant),
-            joinedload(PlantMeasurement.fruits),
+            _fruits_option(),
         )
-        .order_by(PlantMeasurement.date)
+        .order_by(order.nulls_last(), PlantMeasurement.date, PlantMeasurement.id)
         .offset(offset)
         .limit(limit)
-        .all()
     )
 
+
+def _measurement_dicts(rows):
     # Convert to list of dicts with cumulative value added
     results = []
-    for measurement, cumulative_ripe in items:
+    for measurement, cumulative_ripe in rows:
         m_dict = measurement.__dict__.copy()
         m_dict["cumulative_ripe"] = cumulative_ripe
         results.append(m_dict)
+    return results
 
-    return total, results
+
+@coalesce
+@replica_read
+async def get_measurements_async(
+    db: AsyncSession,
+    plant_code: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    variety: Optional[str] = None,
+    field: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 10,
+    breeder_id: Optional[int] = None,
+    ranges: Tuple[Tuple[str, Optional[float], Optional[float]], ...] = (),
+    sort_by: str = "date",
+    descending: bool = False,
+):
+    stmt = _measurements_statement(
+        plant_code, start_date, end_date, variety, field, breeder_id, ranges
+    )
+    total = await db.scalar(select(func.count()).select_from(stmt.subquery()))
+    page = _measurements_page(stmt, offset, limit, sort_by, descending)
+    result = await db.execute(page)
+    return total, _measurement_dicts(result.unique().all())
 
 
 def delete_measurement(db: Session, measurement_id: int, breeder_id: int):
@@ -405,81 +704,150 @@ def delete_measurement(db: Session, measurement_id: int, breeder_id: int):
 
     db.delete(measurement)
     db.commit()
+    data_versions.bump(breeder_id)
     return measurement
 
 
-def get_summary(
+def delete_measurements(
     db: Session,
     breeder_id: int,
+    plant_code: Optional[str] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-):
-    # Get plant IDs for this breeder
-    plant_ids = db.query(Plant.id).filter(Plant.breeder_id == breeder_id).subquery()
+    variety: Optional[str] = None,
+    field: Optional[str] = None,
+) -> int:
+    """
+    Delete every measurement of the breeder matching the filters in one
+    DELETE statement; their fruits go with them through ON DELETE CASCADE.
+    Returns the number of measurements deleted.
+    """
+    plant_ids = select(Plant.id).where(Plant.breeder_id == breeder_id)
+    if plant_code:
+        plant_ids = plant_ids.where(Plant.plant_code == plant_code)
 
-    # Base measurement query
-    query = db.query(PlantMeasurement).filter(PlantMeasurement.plant_id.in_(plant_ids))
+    stmt = delete(PlantMeasurement).where(PlantMeasurement.plant_id.in_(plant_ids))
     if start_date:
-        query = query.filter(PlantMeasurement.date >= start_date)
+        stmt = stmt.where(PlantMeasurement.date >= start_date)
     if end_date:
-        query = query.filter(PlantMeasurement.date <= end_date)
+        stmt = stmt.where(PlantMeasurement.date <= end_date)
+    if variety:
+        stmt = stmt.where(PlantMeasurement.variety == variety)
+    if field:
+        stmt = stmt.where(PlantMeasurement.field == field)
 
-    # ---- Total plants ----
-    total_plants = (
-        db.query(func.count(Plant.id)).filter(Plant.breeder_id == breeder_id).scalar()
-    )
+    result = db.execute(stmt.execution_options(synchronize_session=False))
+    db.commit()
+    data_versions.bump(breeder_id)
+    return result.rowcount
 
-    # ---- Unique varieties ----
-    unique_varieties = (
-        db.query(PlantMeasurement.variety)
-        .filter(PlantMeasurement.plant_id.in_(plant_ids))
-        .filter(PlantMeasurement.variety.isnot(None))
-        .distinct()
-        .all()
-    )
-    unique_varieties = [v[0] for v in unique_varieties]
-
-    # ---- Unique fields ----
-    unique_fields = (
-        db.query(PlantMeasurement.field)
-        .filter(PlantMeasurement.plant_id.in_(plant_ids))
-        .filter(PlantMeasurement.field.isnot(None))
-        .distinct()
-        .all()
-    )
-    unique_fields = [f[0] for f in unique_fields]
-
-    # ---- Samples per variety ----
-    samples_per_variety = dict(
-        db.query(PlantMeasurement.variety, func.count(PlantMeasurement.id))
-        .filter(PlantMeasurement.plant_id.in_(plant_ids))
-        .group_by(PlantMeasurement.variety)
-        .all()
+
+def _summary_statements(
+    breeder_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> dict:
+    # Get plant IDs for this breeder
+    plant_ids = select(Plant.id).where(Plant.breeder_id == breeder_id)
+
+    # ---- Last measured date (the only date-filtered figure) ----
+    last_measured = select(func.max(PlantMeasurement.date)).where(
+        PlantMeasurement.plant_id.in_(plant_ids)
     )
+    if start_date:
+        last_measured = last_measured.where(PlantMeasurement.date >= start_date)
+    if end_date:
+        last_measured = last_measured.where(PlantMeasurement.date <= end_date)
+
+    return {
+        # ---- Total plants ----
+        "total_plants": select(func.count(Plant.id)).where(
+            Plant.breeder_id == breeder_id
+        ),
+        # ---- Unique varieties ----
+        "unique_varieties": select(PlantMeasurement.variety)
+        .where(PlantMeasurement.plant_id.in_(plant_ids))
+        .where(PlantMeasurement.variety.isnot(None))
+        .distinct(),
+        # ---- Unique fields ----
+        "unique_fields": select(PlantMeasurement.field)
+        .where(PlantMeasurement.plant_id.in_(plant_ids))
+        .where(PlantMeasurement.field.isnot(None))
+        .distinct(),
+        # ---- Samples per variety ----
+        "samples_per_variety": select(
+            PlantMeasurement.variety, func.count(PlantMeasurement.id)
+        )
+        .where(PlantMeasurement.plant_id.in_(plant_ids))
+        .group_by(PlantMeasurement.variety),
+        "last_measured_date": last_measured,
+        # ---- Fruits per variety, from the stored per-measurement stats ----
+        "fruits_per_variety": select(
+            PlantMeasurement.variety,
+            func.sum(PlantMeasurement.ripe),
+            func.sum(PlantMeasurement.fruit_mass_total),
+            func.sum(PlantMeasurement.fruit_count_small),
+            func.sum(PlantMeasurement.fruit_count_medium),
+            func.sum(PlantMeasurement.fruit_count_large),
+        )
+        .where(PlantMeasurement.plant_id.in_(plant_ids))
+        .group_by(PlantMeasurement.variety),
+    }
 
-    # ---- Last measured date ----
-    last_measured_date = query.with_entities(func.max(PlantMeasurement.date)).scalar()
 
+def _summary_result(rows: dict) -> dict:
+    last_measured_date = rows["last_measured_date"][0][0]
     return {
-        "total_plants": total_plants,
-        "unique_varieties": list(unique_varieties),
-        "unique_fields": list(unique_fields),
-        "samples_per_variety": dict(samples_per_variety),
+        "total_plants": rows["total_plants"][0][0],
+        "unique_varieties": [v[0] for v in rows["unique_varieties"]],
+        "unique_fields": [f[0] for f in rows["unique_fields"]],
+        "samples_per_variety": dict(rows["samples_per_variety"]),
         "last_measured_date": (
             last_measured_date.isoformat() if last_measured_date else None
         ),
+        "fruits_per_variety": {
+            variety: {
+                "fruit_count": count or 0,
+                "fruit_mass_total": mass_total,
+                "size_classes": {
+                    "small": small or 0,
+                    "medium": medium or 0,
+                    "large": large or 0,
+                },
+            }
+            for variety, count, mass_total, small, medium, large in rows[
+                "fruits_per_variety"
+            ]
+        },
     }
 
 
-def get_unique_measurement_dates(
-    db: Session, plant_code: str, breeder_id: Optional[int] = None
+@coalesce
+@replica_read
+async def get_summary_async(
+    db: AsyncSession,
+    breeder_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ):
-    query = (
-        db.query(PlantMeasurement.date)
-        .join(Plant)
-        .filter(Plant.plant_code == plant_code)
+    statements = _summary_statements(breeder_id, start_date, end_date)
+    rows = {name: (await db.execute(stmt)).all() for name, stmt in statements.items()}
+    return _summary_result(rows)
+
+
+def _unique_dates_statement(plant_code: str, breeder_id: Optional[int] = None):
+    stmt = (
+        select(PlantMeasurement.date).join(Plant).where(Plant.plant_code == plant_code)
     )
     if breeder_id:
-        query = query.filter(Plant.breeder_id == breeder_id)
-    dates = query.distinct().order_by(PlantMeasurement.date).all()
-    return [d[0] for d in dates]  # Unpack tuples
+        stmt = stmt.where(Plant.breeder_id == breeder_id)
+    return stmt.distinct().order_by(PlantMeasurement.date)
+
+
+@coalesce
+@replica_read
+async def get_unique_measurement_dates_async(
+    db: AsyncSession, plant_code: str, breeder_id: Optional[int] = None
+):
+    result = await db.scalars(_unique_dates_statement(plant_code, breeder_id))
+    return result.all()
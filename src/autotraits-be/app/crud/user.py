@@ -0,0 +1,47 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.security import invalidate_cached_user
+from app.db.models import Breeder, User
+from app.schemas import UserUpdate
+
+
+# ========= USER =========
+def revoke_user_tokens(db: Session, user_id: int):
+    """
+    Invalidate every access/refresh token issued to the user so far.
+    Call after changing a user's role or breeder, or before deleting them.
+    Other workers pick the change up once their user cache entry expires.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        {User.token_version: User.token_version + 1}, synchronize_session=False
+    )
+    db.commit()
+    invalidate_cached_user(user_id)
+
+
+def update_user(db: Session, user_id: int, user: UserUpdate) -> User:
+    """Change a user's role and/or breeder, revoking their tokens."""
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    update_data = user.model_dump(exclude_unset=True)
+    breeder_id = update_data.get("breeder_id")
+    if breeder_id is not None and not db.get(Breeder, breeder_id):
+        raise HTTPException(status_code=404, detail="Breeder not found")
+    for key, value in update_data.items():
+        setattr(db_user, key, value)
+    db.commit()
+    revoke_user_tokens(db, user_id)
+    db.refresh(db_user)
+    return db_user
+
+
+def delete_user(db: Session, user_id: int) -> User:
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    db.delete(db_user)
+    db.commit()
+    invalidate_cached_user(user_id)
+    return db_user
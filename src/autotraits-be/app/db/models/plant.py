@@ -15,10 +15,16 @@ class Plant(Base):
     plant_code = Column(String, nullable=False)
 
     breeder = relationship("Breeder", back_populates="plants")
+    # Rows are removed by ON DELETE CASCADE; the ORM does not load them first
     measurements = relationship(
-        "PlantMeasurement", back_populates="plant", cascade="all, delete"
+        "PlantMeasurement",
+        back_populates="plant",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
+    files = relationship(
+        "PlantFile", back_populates="plant", cascade="all, delete", passive_deletes=True
     )
-    files = relationship("PlantFile", back_populates="plant", cascade="all, delete")
 
     __table_args__ = (
         UniqueConstraint("breeder_id", "plant_code", name="uix_breeder_plant"),
@@ -1,9 +1,11 @@
+from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, Date, DateTime
+from sqlalchemy import BigInteger, Column, Date, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Float, ForeignKey, Integer, String, UniqueConstraint, func, text
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import Index
 
 from app.db.base import Base
 
@@ -19,12 +21,102 @@ class FileStatusEnum(str, Enum):
     FAILED = "FAILED"
 
 
+class FileVariantEnum(str, Enum):
+    THUMB = "thumb"
+    PREVIEW = "preview"
+    # point cloud level of detail, see PlantFileVariant.level
+    LOD = "lod"
+
+
 class PlantFile(Base):
     __tablename__ = "plant_files"
+    __table_args__ = (
+        # the reconciler's candidates (app.core.reconcile)
+        Index(
+            "ix_plant_files_unsettled",
+            "id",
+            postgresql_where=text("status <> 'COMPLETED'"),
+        ),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
-    plant_id = Column(Integer, ForeignKey("plants.id"))
+    plant_id = Column(Integer, ForeignKey("plants.id", ondelete="CASCADE"))
     date = Column(Date)
-    file_path = Column(String)
+    # "<sha256>.<ext>" for uploads through the API, shared by identical
+    # files (app.core.storage.upload); "<uuid>.<ext>" for client-side ones
+    file_path = Column(String, index=True)
     file_type = Column(SqlEnum(FileTypeEnum), nullable=False)
     status = Column(SqlEnum(FileStatusEnum), default=FileStatusEnum.PENDING)
+    # of the stored blob, once known
+    size = Column(BigInteger)
+    etag = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     plant = relationship("Plant", back_populates="files")
+    variants = relationship(
+        "PlantFileVariant",
+        back_populates="file",
+        cascade="all, delete",
+        passive_deletes=True,
+    )
+
+
+class PlantFileVariant(Base):
+    """Derived rendition of a PlantFile (see app.core.variants)."""
+
+    __tablename__ = "plant_file_variants"
+    __table_args__ = (
+        UniqueConstraint("file_id", "variant", "level", name="uix_file_variant"),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    file_id = Column(
+        Integer, ForeignKey("plant_files.id", ondelete="CASCADE"), nullable=False
+    )
+    variant = Column(SqlEnum(FileVariantEnum), nullable=False)
+    # LOD: 0 is the coarsest (POINT_CLOUD_LOD_FRACTIONS); 0 for other variants
+    level = Column(Integer, default=0, server_default="0", nullable=False)
+    file_path = Column(String, nullable=False)
+    width = Column(Integer)
+    height = Column(Integer)
+    point_count = Column(BigInteger)
+    size = Column(Integer)
+    file = relationship("PlantFile", back_populates="variants")
+
+
+class UploadSession(Base):
+    """
+    Resumable upload of one PlantFile: chunk i of `chunk_size` bytes is
+    staged as block i of the blob and recorded in upload_chunks; the blob
+    is committed (and the file COMPLETED) once every chunk is received.
+    """
+
+    __tablename__ = "upload_sessions"
+    id = Column(String(36), primary_key=True)  # uuid4, also the client's handle
+    file_id = Column(
+        Integer,
+        ForeignKey("plant_files.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    file = relationship("PlantFile")
+
+    @property
+    def chunk_count(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        """Expected size of chunk `index` (the last one may be short)."""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+
+class UploadChunk(Base):
+    __tablename__ = "upload_chunks"
+    session_id = Column(
+        String(36),
+        ForeignKey("upload_sessions.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    index = Column(Integer, primary_key=True)
+    size = Column(Integer, nullable=False)
+    received_at = Column(DateTime, default=datetime.utcnow, nullable=False)
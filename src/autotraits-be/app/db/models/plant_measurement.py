@@ -2,8 +2,9 @@ from enum import Enum
 
 from sqlalchemy import Column, Date, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import Float, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.schema import ForeignKeyConstraint, Index
 
 from app.db.base import Base
 
@@ -11,8 +12,8 @@ from app.db.base import Base
 class PlantMeasurement(Base):
     __tablename__ = "plant_measurements"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    plant_id = Column(Integer, ForeignKey("plants.id"))
-    date = Column(Date)
+    plant_id = Column(Integer, ForeignKey("plants.id", ondelete="CASCADE"))
+    date = Column(Date, nullable=False)  # partition key on PostgreSQL
     variety = Column(String, nullable=True)
     biomass = Column(Float, nullable=True)
     canopy_density = Column(Float, nullable=True)
@@ -36,21 +37,54 @@ class PlantMeasurement(Base):
     crop_composition = Column(Float, nullable=True)
     plant_height = Column(Float, nullable=True)
     exg = Column(Float, nullable=True)
+    # Fruits as packed float32 triplets (app.core.fruits); when set it takes
+    # precedence over plant_fruits rows
+    fruits_packed = Column(LargeBinary, nullable=True)
+    # Derived from the fruits on every write (app.core.fruits.fruit_stats)
+    fruit_width_mean = Column(Float, nullable=True)
+    fruit_width_median = Column(Float, nullable=True)
+    fruit_height_mean = Column(Float, nullable=True)
+    fruit_height_median = Column(Float, nullable=True)
+    fruit_mass_total = Column(Float, nullable=True)
+    fruit_mass_mean = Column(Float, nullable=True)
+    fruit_count_small = Column(Integer, nullable=True)
+    fruit_count_medium = Column(Integer, nullable=True)
+    fruit_count_large = Column(Integer, nullable=True)
+    # Rows are removed by ON DELETE CASCADE; the ORM does not load them first
     fruits = relationship(
-        "PlantFruit", back_populates="measurement", cascade="all, delete"
+        "PlantFruit",
+        back_populates="measurement",
+        cascade="all, delete",
+        passive_deletes=True,
     )
     plant = relationship("Plant", back_populates="measurements")
-    __table_args__ = (UniqueConstraint("plant_id", "date", name="uix_plant_date"),)
+    __table_args__ = (
+        UniqueConstraint("plant_id", "date", name="uix_plant_date"),
+        # Target of the fruits' composite foreign key. On PostgreSQL the
+        # table is range-partitioned by date and (id, date) is its primary key
+        # (migration 9c4d1a7e3f62, app.db.partitions)
+        UniqueConstraint("id", "date", name="uix_measurement_id_date"),
+    )
 
 
 class PlantFruit(Base):
     __tablename__ = "plant_fruits"
     id = Column(Integer, primary_key=True, autoincrement=True)
-    measurement_id = Column(
-        Integer, ForeignKey("plant_measurements.id"), nullable=False
-    )
+    measurement_id = Column(Integer, nullable=False)
+    # Copy of the measurement's date: plant_fruits is partitioned on it
+    # alongside plant_measurements
+    measurement_date = Column(Date, nullable=False)
     width = Column(Float, nullable=True)
     height = Column(Float, nullable=True)
     mass = Column(Float, nullable=True)
 
     measurement = relationship("PlantMeasurement", back_populates="fruits")
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["measurement_id", "measurement_date"],
+            ["plant_measurements.id", "plant_measurements.date"],
+            ondelete="CASCADE",
+            onupdate="CASCADE",
+        ),
+        Index("ix_plant_fruits_measurement", "measurement_id", "measurement_date"),
+    )
@@ -20,5 +20,7 @@ class User(Base):
     full_name = Column(String, nullable=True)
     role = Column(Enum(Role), default=Role.USER, nullable=False)
     breeder_id = Column(Integer, ForeignKey("breeders.id"), nullable=True)
+    # bumped to revoke every token issued before (role change, deletion, ...)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     breeder = relationship("Breeder", back_populates="users")
@@ -0,0 +1,159 @@
+"""
+Monthly range partitions of plant_measurements (by `date`) and plant_fruits
+(by `measurement_date`) on PostgreSQL; the tables are converted by migration
+9c4d1a7e3f62. Rows outside every monthly partition land in the tables'
+DEFAULT partition, so a missing month never fails a write, but it is not
+pruned either: ensure_partitions() runs at startup and periodically to stay
+ahead, and moves such rows into their month's partition when creating it.
+"""
+
+import logging
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "plant_measurements": "date",
+    "plant_fruits": "measurement_date",
+}
+# rows of the key table whose delete cascades to the value table
+CASCADES_TO = {"plant_measurements": "plant_fruits"}
+# pg_advisory_xact_lock key: workers starting together create partitions once
+_ADVISORY_LOCK_KEY = 0x70617274
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return bool(
+        conn.scalar(
+            text(
+                "SELECT relkind = 'p' FROM pg_class"
+                " WHERE oid = to_regclass('plant_measurements')"
+            )
+        )
+    )
+
+
+def _in_month(key: str, month: date) -> str:
+    return f"{key} >= '{month}' AND {key} < '{next_month(month)}'"
+
+
+def create_month_partitions(conn: Connection, month: date) -> List[str]:
+    """
+    Create the missing partitions of `month` in both tables; returns their
+    names. Rows of that month already in a DEFAULT partition (written before
+    the partition existed) are moved into the new one before it is attached.
+    Deleting measurements from DEFAULT cascades to their fruits, so the
+    month's fruits are set aside first and inserted again at the end.
+    """
+    created, set_aside = [], None
+    for table, key in PARTITIONED_TABLES.items():
+        name = partition_name(table, month)
+        if conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}):
+            continue
+        bounds = f"FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+        stranded = conn.scalar(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {table}_default"
+                f" WHERE {_in_month(key, month)})"
+            )
+        )
+        if not stranded:
+            conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+            created.append(name)
+            continue
+
+        referencing = CASCADES_TO.get(table)
+        if referencing:
+            set_aside = (referencing, f"{referencing}_{month:%Y_%m}_moving")
+            condition = _in_month(PARTITIONED_TABLES[referencing], month)
+            conn.execute(
+                text(
+                    f"CREATE TEMPORARY TABLE {set_aside[1]} ON COMMIT DROP AS"
+                    f" SELECT * FROM {referencing} WHERE {condition}"
+                )
+            )
+            conn.execute(text(f"DELETE FROM {referencing} WHERE {condition}"))
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        conn.execute(
+            text(
+                f"INSERT INTO {name} SELECT * FROM {table}_default"
+                f" WHERE {_in_month(key, month)}"
+            )
+        )
+        conn.execute(text(f"DELETE FROM {table}_default WHERE {_in_month(key, month)}"))
+        conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+        created.append(name)
+        logger.warning("Moved %s rows of %s out of its DEFAULT partition", month, table)
+
+    if set_aside:
+        referencing, temporary = set_aside
+        conn.execute(text(f"INSERT INTO {referencing} SELECT * FROM {temporary}"))
+    return created
+
+
+def create_partitions(conn: Connection, first: date, last: date) -> List[str]:
+    """
+    create_month_partitions() for every month from `first` to `last`
+    (inclusive), in one transaction. Returns the names of the created tables.
+    """
+    created = []
+    month = month_start(first)
+    while month <= last:
+        created += create_month_partitions(conn, month)
+        month = next_month(month)
+    return created
+
+
+def ensure_partitions(
+    engine: Engine, months_ahead: Optional[int] = None, today: Optional[date] = None
+) -> List[str]:
+    """
+    Create this month's and the next `months_ahead` months' partitions if
+    missing, each month in its own transaction, so one failing month does
+    not hold back the others. No-op unless the database is PostgreSQL with
+    partitioned tables; errors are logged, not raised, so they never block
+    startup or the periodic run.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+    month = month_start(today or date.today())
+
+    created = []
+    for _ in range(months_ahead + 1):
+        try:
+            with engine.begin() as conn:
+                if not is_partitioned(conn):
+                    return []
+                conn.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"),
+                    {"key": _ADVISORY_LOCK_KEY},
+                )
+                created += create_month_partitions(conn, month)
+        except DBAPIError:
+            logger.exception("Could not create measurement partitions of %s", month)
+        month = next_month(month)
+    if created:
+        logger.info("Created partitions: %s", ", ".join(created))
+    return created
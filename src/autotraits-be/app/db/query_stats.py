@@ -0,0 +1,108 @@
+import heapq
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Literals and bind placeholders that vary between otherwise identical queries
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|:\w+")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalized form of a SQL statement: literals and bind parameters become
+    `?` and expanded IN lists collapse, so `WHERE id = 1` and `WHERE id = 2`
+    (or IN lists of any length) share a shape.
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self, slowest: int = 3):
+        self._lock = threading.Lock()
+        self._slowest_size = slowest
+        self._slowest: list[tuple[float, str]] = []
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: dict[str, int] = {}
+
+    def record(self, statement: str, duration: float):
+        shape = statement_shape(statement)
+        # sync routes and coalesced reads may record from other threads
+        with self._lock:
+            self.count += 1
+            self.total_time += duration
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+            if self._slowest_size:
+                item = (duration, shape)
+                if len(self._slowest) < self._slowest_size:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heappushpop(self._slowest, item)
+
+    def slowest(self) -> list[dict]:
+        with self._lock:
+            items = sorted(self._slowest, reverse=True)
+        return [{"ms": round(d * 1000, 2), "statement": s} for d, s in items]
+
+    def repeated(self, threshold: int) -> list[dict]:
+        """Statement shapes run more than `threshold` times (likely N+1)."""
+        if threshold <= 0:
+            return []
+        with self._lock:
+            shapes = sorted(self.shapes.items(), key=lambda item: -item[1])
+        return [
+            {"count": count, "statement": shape}
+            for shape, count in shapes
+            if count > threshold
+        ]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start(slowest: int = 3) -> tuple[QueryStats, object]:
+    """Collect statements run in the current context until `stop(token)`."""
+    stats = QueryStats(slowest)
+    return stats, _current.set(stats)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None and context is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_stats_start", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install():
+    """
+    Time every cursor execution on every Engine (async engines included,
+    through their sync_engine). Statements outside a start()/stop() window
+    cost one ContextVar lookup.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
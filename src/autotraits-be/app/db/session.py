@@ -1,7 +1,409 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import functools
+import inspect
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
 
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.coalesce import data_versions
 from app.core.conf import settings
 
-engine = create_engine(settings.DATABASE_URL, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class PoolStatsMixin:
+    """
+    Pool mixin that also records checkout count, time spent waiting for a
+    connection (queueing, connecting and pre-ping) and checkout timeouts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._timeouts += timed_out
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": max(self.overflow(), 0),
+                "max_overflow": self._max_overflow,
+                "checkouts": self._checkouts,
+                "checkout_timeouts": self._timeouts,
+                "wait_avg_ms": (
+                    self._wait_total / self._checkouts * 1000 if self._checkouts else 0
+                ),
+                "wait_max_ms": self._wait_max * 1000,
+            }
+
+
+class InstrumentedQueuePool(PoolStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(PoolStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def async_database_url(url: str) -> URL:
+    """Same database as `url`, through asyncpg / aiosqlite."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        query = dict(url.query)
+        # asyncpg takes `ssl` where libpq/psycopg2 take `sslmode`
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return url.set(drivername="postgresql+asyncpg", query=query)
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def engine_options(url: str | URL, is_async: bool = False) -> dict:
+    """
+    Pool settings for server databases. Every gunicorn worker owns one sync
+    and one async pool, so the DB sees up to
+    workers * 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    SQLite keeps SQLAlchemy's default pool.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": (
+            InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+        ),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        # managed PostgreSQL / load balancers silently drop idle connections:
+        # recycle before that happens and ping before handing one out
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # LIFO keeps a few hot connections busy and lets the rest go idle
+        "pool_use_lifo": True,
+    }
+
+
+def enable_sqlite_foreign_keys(engine: Engine):
+    """
+    SQLite only enforces foreign keys (and so ON DELETE CASCADE) when each
+    connection turns them on. No-op for other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def replica_lag(engine: Engine) -> float:
+    """Seconds the replica is behind its primary (0 for non-PostgreSQL)."""
+    with engine.connect() as connection:
+        if connection.dialect.name != "postgresql":
+            connection.execute(text("SELECT 1"))
+            return 0.0
+        # Time since the last replayed transaction: over-reports on an idle
+        # primary, which only costs a fallback to the primary
+        lag = connection.scalar(
+            text(
+                "SELECT CASE WHEN pg_is_in_recovery() THEN coalesce("
+                "extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0"
+                ") ELSE 0 END"
+            )
+        )
+        return float(lag)
+
+
+class ReplicaMonitor:
+    """
+    Whether the read replica may serve reads right now.
+    Lag is re-measured at most every `interval` seconds in a background
+    thread, so routing never waits on it. Until the first check succeeds the
+    replica is considered unavailable. Connection errors on a watched engine
+    mark it down immediately.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        max_lag: float,
+        interval: float,
+        clock=time.monotonic,
+    ):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._healthy = False
+        self._checking = False
+        self._checked_at = float("-inf")
+        self._lag: Optional[float] = None
+        self._error: Optional[str] = None
+        self.watch(engine)
+
+    def watch(self, engine: Engine):
+        @event.listens_for(engine, "handle_error")
+        def _on_error(context):
+            # connection is None when the connect itself failed
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(str(context.original_exception))
+
+    def available(self) -> bool:
+        with self._lock:
+            healthy = self._healthy
+            start = (
+                not self._checking and self.clock() - self._checked_at >= self.interval
+            )
+            if start:
+                self._checking = True
+        if start:
+            threading.Thread(target=self.check, daemon=True).start()
+        return healthy
+
+    def check(self):
+        lag, error = None, None
+        try:
+            lag = replica_lag(self.engine)
+        except Exception as e:
+            error = str(e)
+        with self._lock:
+            self._lag = lag
+            self._error = error
+            self._healthy = lag is not None and lag <= self.max_lag
+            self._checked_at = self.clock()
+            self._checking = False
+
+    def mark_down(self, error: str):
+        with self._lock:
+            self._healthy = False
+            self._error = error
+            # give it a full interval before probing again
+            self._checked_at = self.clock()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "healthy": self._healthy,
+                "lag_seconds": self._lag,
+                "last_error": self._error,
+            }
+
+
+class _ReplicaScope:
+    def __init__(self, breeder_id: Optional[int]):
+        self.breeder_id = breeder_id
+        self.used = False
+
+
+_replica_scope: ContextVar[Optional[_ReplicaScope]] = ContextVar(
+    "replica_scope", default=None
+)
+
+# Wall-clock time (time.time) of the current client's last write, carried by
+# the client (app.middleware.ReadYourWritesMiddleware): data_versions only
+# sees the writes made in this process, not in the other gunicorn workers.
+client_last_write: ContextVar[float] = ContextVar(
+    "client_last_write", default=float("-inf")
+)
+
+
+class RoutingSession(Session):
+    """
+    Session bound to the primary that sends SELECTs issued inside
+    @replica_read functions to `replica`, unless the breeder (in this
+    process) or the client (in any process, see client_last_write) wrote
+    within `sticky_seconds` (read-your-writes) or the monitor reports the
+    replica unavailable or lagging. Flushes and any other statement go to the primary.
+    Also used as the sync_session_class of AsyncSessionLocal, with the
+    replica's `sync_engine`.
+    """
+
+    def __init__(
+        self,
+        *args,
+        replica: Optional[Engine] = None,
+        monitor: Optional[ReplicaMonitor] = None,
+        sticky_seconds: float = 0.0,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.monitor = monitor
+        self.sticky_seconds = sticky_seconds
+
+    def _use_replica(self, clause) -> bool:
+        scope = _replica_scope.get()
+        if scope is None or self.replica is None or self._flushing:
+            return False
+        if not getattr(clause, "is_select", False):
+            return False
+        last_write = data_versions.last_write(scope.breeder_id)
+        if time.monotonic() - last_write < self.sticky_seconds:
+            return False
+        if time.time() - client_last_write.get() < self.sticky_seconds:
+            return False
+        if self.monitor is not None and not self.monitor.available():
+            return False
+        scope.used = True
+        return True
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._use_replica(clause):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def replica_read(fn):
+    """
+    Decorator for read-only CRUD functions taking `db` first and optionally
+    `breeder_id`: lets RoutingSession serve them from the replica.
+    If the replica fails mid-call, the call is retried once on the primary.
+    """
+    signature = inspect.signature(fn)
+
+    def make_scope(args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        return _ReplicaScope(bound.arguments.get("breeder_id"))
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(db, *args, **kwargs):
+            scope = make_scope((db, *args), kwargs)
+            token = _replica_scope.set(scope)
+            try:
+                return await fn(db, *args, **kwargs)
+            except exc.OperationalError:
+                if not scope.used:
+                    raise
+                await db.rollback()
+            finally:
+                _replica_scope.reset(token)
+            return await fn(db, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(db, *args, **kwargs):
+        scope = make_scope((db, *args), kwargs)
+        token = _replica_scope.set(scope)
+        try:
+            return fn(db, *args, **kwargs)
+        except exc.OperationalError:
+            if not scope.used:
+                raise
+            db.rollback()
+        finally:
+            _replica_scope.reset(token)
+        return fn(db, *args, **kwargs)
+
+    return wrapper
+
+
+engine = create_engine(
+    settings.DATABASE_URL, future=True, **engine_options(settings.DATABASE_URL)
+)
+
+# Async engine for the read endpoints (asyncpg in production, aiosqlite in tests)
+ASYNC_DATABASE_URL = settings.DATABASE_ASYNC_URL or async_database_url(
+    settings.DATABASE_URL
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+enable_sqlite_foreign_keys(engine)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+read_engine = async_read_engine = replica_monitor = None
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL, **engine_options(settings.DATABASE_READ_URL)
+    )
+    ASYNC_READ_URL = async_database_url(settings.DATABASE_READ_URL)
+    async_read_engine = create_async_engine(
+        ASYNC_READ_URL, **engine_options(ASYNC_READ_URL, is_async=True)
+    )
+    replica_monitor = ReplicaMonitor(
+        read_engine,
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    )
+    replica_monitor.watch(async_read_engine.sync_engine)
+    enable_sqlite_foreign_keys(read_engine)
+    enable_sqlite_foreign_keys(async_read_engine.sync_engine)
+
+routing_options = {
+    "monitor": replica_monitor,
+    "sticky_seconds": settings.READ_YOUR_WRITES_SECONDS,
+}
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=RoutingSession,
+    replica=read_engine,
+    **routing_options,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=RoutingSession,
+    replica=async_read_engine.sync_engine if async_read_engine else None,
+    **routing_options,
+)
+
+
+def _pool_metrics(pool) -> dict:
+    metrics = {"pool_class": type(pool).__name__}
+    if isinstance(pool, PoolStatsMixin):
+        metrics.update(pool.metrics())
+    else:
+        metrics["status"] = pool.status()
+    return metrics
+
+
+def pool_metrics() -> dict:
+    metrics = {
+        "pid": os.getpid(),
+        "sync": _pool_metrics(engine.pool),
+        "async": _pool_metrics(async_engine.pool),
+    }
+    if replica_monitor is not None:
+        metrics["replica"] = {
+            **replica_monitor.metrics(),
+            "sync": _pool_metrics(read_engine.pool),
+            "async": _pool_metrics(async_read_engine.pool),
+        }
+    return metrics
@@ -1,9 +1,12 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, Request
 
-from app.core.security import decode_token
+from app.core.security import decode_token, user_cache
 from app.db.models import User
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas import Principal, TokenData
 
 
 def get_db():
@@ -14,14 +17,65 @@ def get_db():
         db.close()
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_access_token_data(request: Request) -> TokenData:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     data = decode_token(token)
     if not data or data.type != "access":
         raise HTTPException(status_code=401, detail="Invalid token")
+    return data
+
+
+def check_token_version(data: TokenData, token_version: int):
+    # tokens issued before the `ver` claim existed count as version 0
+    if (data.ver or 0) != token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
+
+
+async def get_current_principal(
+    data: TokenData = Depends(get_access_token_data),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Fast path for routes that only need id/role/breeder_id.
+    The users row is read at most once per USER_CACHE_TTL_SECONDS per user,
+    so role changes and revocations (token_version bumps) apply within the TTL.
+    Async, so resolving the caller never takes a threadpool slot; the session
+    only checks out a connection on a cache miss.
+    """
+    cached = user_cache.get(data.user_id)
+    if cached is None:
+        result = await db.execute(
+            select(User.token_version, User.role, User.breeder_id).where(
+                User.id == data.user_id
+            )
+        )
+        row = result.first()
+        # Hand the connection back right away: the route may wait on a
+        # coalesced read (app.core.coalesce) and must not hold one meanwhile
+        await db.rollback()
+        if not row:
+            raise HTTPException(status_code=401, detail="User not found")
+        principal = Principal(id=data.user_id, breeder_id=row.breeder_id, role=row.role)
+        cached = (row.token_version, principal)
+        user_cache.set(data.user_id, cached)
+
+    token_version, principal = cached
+    check_token_version(data, token_version)
+    return principal
+
+
+def get_current_user(
+    data: TokenData = Depends(get_access_token_data), db: Session = Depends(get_db)
+) -> User:
     user = db.query(User).filter(User.id == data.user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    check_token_version(data, user.token_version)
     return user
@@ -1,14 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routes import auth, plants, root, user, plant_measurements, plant_images
+from app.core.conf import settings
+from app.core.periodic import JOBS_LOCK_KEY, LeaderLock, run_periodically
+from app.core.reconcile import FileReconciler
+from app.core.storage import get_storage
+from app.core.storage.upload import expire_upload_sessions
+from app.db.partitions import ensure_partitions
+from app.db.session import SessionLocal, engine
+from app.middleware import (
+    BodySizeLimitMiddleware,
+    QueryStatsMiddleware,
+    ReadYourWritesMiddleware,
+)
+from app.api.routes import (
+    auth,
+    metrics,
+    plants,
+    root,
+    user,
+    plant_measurements,
+    plant_images,
+    storage,
+)
 
 origins = [
     "http://localhost:5173",
     "https://autotraits-frontend.onrender.com",  # prod frontend here
 ]
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # PostgreSQL only: keep monthly measurement partitions ahead of the data
+    await run_in_threadpool(ensure_partitions, engine)
+    storage = get_storage()
+    # one process of all workers runs the jobs (app.core.periodic)
+    leader = LeaderLock(engine, JOBS_LOCK_KEY)
+    jobs = [
+        # months keep coming: stay PARTITION_MONTHS_AHEAD ahead
+        run_periodically(
+            lambda: len(ensure_partitions(engine)),
+            None,
+            settings.PARTITION_CHECK_INTERVAL_SECONDS,
+            "measurement partitions created",
+            leader,
+        ),
+        # drop abandoned resumable uploads
+        run_periodically(
+            lambda db: expire_upload_sessions(db, storage),
+            SessionLocal,
+            settings.UPLOAD_SESSION_GC_INTERVAL_SECONDS,
+            "upload sessions expired",
+            leader,
+        ),
+        # settle files uploaded with SAS URLs
+        run_periodically(
+            FileReconciler(storage).run,
+            SessionLocal,
+            settings.FILE_RECONCILE_INTERVAL_SECONDS,
+            "plant files reconciled",
+            leader,
+        ),
+    ]
+    tasks = [asyncio.create_task(job) for job in jobs]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    leader.release()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,9 +85,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={
+        r"/upload-file-v2$": plant_images.MAX_UPLOAD_BODY_SIZE,
+        r"/upload-files$": settings.MAX_MULTI_UPLOAD_SIZE,
+        r"/uploads/[^/]+/chunks/\d+$": settings.MAX_UPLOAD_CHUNK_SIZE,
+    },
+)
+
+if settings.DATABASE_READ_URL:
+    app.add_middleware(
+        ReadYourWritesMiddleware, sticky_seconds=settings.READ_YOUR_WRITES_SECONDS
+    )
+
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 app.include_router(root.router, tags=["Root"])
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(user.router, prefix="/api/user", tags=["User API"])
 app.include_router(plants.router, prefix="/api", tags=["Plant API"])
 app.include_router(plant_measurements.router, prefix="/api", tags=["Plant Measurements API"])
 app.include_router(plant_images.router, prefix="/api", tags=["Plant Images API"])
+app.include_router(metrics.router, prefix="/api", tags=["Metrics API"])
+app.include_router(storage.router, prefix="/api", tags=["Storage API"])
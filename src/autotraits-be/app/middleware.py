@@ -0,0 +1,209 @@
+import json
+import logging
+import math
+import re
+import time
+
+from starlette.requests import Request
+
+from app.core.conf import settings
+from app.db import query_stats
+from app.db.session import client_last_write
+
+logger = logging.getLogger("app.sql")
+if not logger.handlers:
+    # gunicorn/uvicorn only configure their own loggers
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class QueryStatsMiddleware:
+    """
+    Per-request SQL instrumentation (see app.db.query_stats).
+    Adds a `Server-Timing` header with the query count, DB time and total
+    time, and logs one JSON line per request with the slowest statements.
+    Statement shapes run more than N_PLUS_ONE_THRESHOLD times are reported
+    under `n_plus_one` and logged as a warning.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        query_stats.install()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        stats, token = query_stats.start(settings.SQL_SLOWEST_STATEMENTS)
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;desc="{stats.count} queries";'
+                    f"dur={stats.total_time * 1000:.2f}, app;dur={total_ms:.2f}"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", timing.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.stop(token)
+            self.log(scope, status, stats, started)
+
+    def log(self, scope, status, stats, started):
+        repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+        level = logging.WARNING if repeated else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        line = {
+            "event": "request_sql",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "queries": stats.count,
+            "db_ms": round(stats.total_time * 1000, 2),
+            "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            "slowest": stats.slowest(),
+        }
+        if repeated:
+            line["n_plus_one"] = repeated
+        logger.log(level, json.dumps(line))
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies over a per-path limit with 413 before the route
+    (or the multipart parser) reads them: up front from Content-Length, and
+    while receiving for bodies without one. `limits` maps path regexes to
+    byte limits.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = [
+            (re.compile(pattern), limit) for pattern, limit in limits.items()
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit = next(
+            (limit for pattern, limit in self.limits if pattern.search(scope["path"])),
+            None,
+        )
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                return await self.respond(send, 400, "Invalid Content-Length")
+            if content_length > limit:
+                return await self.reject(send, limit)
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except Exception:
+            if not exceeded or started:
+                raise
+        if exceeded and not started:
+            await self.reject(send, limit)
+
+    @classmethod
+    async def reject(cls, send, limit: int):
+        await cls.respond(send, 413, f"Request body too large (max {limit} bytes)")
+
+    @staticmethod
+    async def respond(send, status: int, detail: str):
+        body = json.dumps({"detail": detail})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body.encode()})
+
+
+class ReadYourWritesMiddleware:
+    """
+    Carries read-your-writes across gunicorn workers: successful writes
+    (any method but GET, HEAD and OPTIONS) set a `last_write` cookie with
+    the time of the write, expiring after `sticky_seconds`, and the cookie
+    of each request is exposed to RoutingSession as client_last_write.
+    """
+
+    cookie = "last_write"
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.max_age = math.ceil(sticky_seconds)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        try:
+            last_write = float(Request(scope).cookies[self.cookie])
+        except (KeyError, ValueError):
+            last_write = float("-inf")
+        writes = scope["method"] not in self.safe_methods
+
+        async def send_with_cookie(message):
+            if (
+                writes
+                and message["type"] == "http.response.start"
+                and message["status"] < 400
+            ):
+                cookie = (
+                    f"{self.cookie}={time.time():.3f}; Max-Age={self.max_age}; "
+                    "Path=/; HttpOnly; SameSite=none; Secure"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(message)
+
+        token = client_last_write.set(last_write)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            client_last_write.reset(token)
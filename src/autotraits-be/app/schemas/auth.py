@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import EmailStr
 from app.schemas.base import BaseSanitizedModel
 
@@ -14,6 +14,13 @@ class UserCreate(UserBase):
     role: Optional[str] = "user"
 
 
+class UserUpdate(BaseSanitizedModel):
+    """Admin changes to a user; unset fields are left as they are."""
+
+    role: Optional[Literal["admin", "user"]] = None
+    breeder_id: Optional[int] = None
+
+
 class UserInDB(UserBase):
     id: int
     role: str
@@ -36,3 +43,12 @@ class TokenData(BaseSanitizedModel):
     breeder_id: Optional[int] = None
     role: Optional[str] = None
     type: Optional[str] = None
+    ver: Optional[int] = None  # users.token_version at issue time
+
+
+class Principal(BaseSanitizedModel):
+    """Authenticated caller built from token claims, without a users row."""
+
+    id: int
+    breeder_id: Optional[int] = None
+    role: str
@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Dict, Optional
+
 from app.schemas.base import BaseSanitizedModel
 
 
@@ -19,3 +22,15 @@ class PlantInDB(PlantBase):
     model_config = {
         "from_attributes": True,
     }
+
+
+class PlantStats(BaseSanitizedModel):
+    measurement_count: int = 0
+    latest_measurement_date: Optional[date] = None
+    two_d_image_count: int = 0
+    three_d_image_count: int = 0
+    latest_traits: Dict[str, Optional[float]] = {}
+
+
+class PlantWithStatsInDB(PlantInDB):
+    stats: Optional[PlantStats] = None  # only filled with ?include=stats
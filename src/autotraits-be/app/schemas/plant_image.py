@@ -1,6 +1,7 @@
 from datetime import date
 from enum import Enum
 from typing import List, Optional
+from pydantic import Field
 from app.schemas.base import BaseSanitizedModel
 
 
@@ -16,6 +17,12 @@ class FileStatusEnum(str, Enum):
     FAILED = "FAILED"
 
 
+class ImageVariantEnum(str, Enum):
+    ORIGINAL = "original"
+    THUMB = "thumb"
+    PREVIEW = "preview"
+
+
 class FileIn(BaseSanitizedModel):
     date: Optional[str]
     file_type: str
@@ -26,6 +33,21 @@ class BulkUploadRequest(BaseSanitizedModel):
     files: List[FileIn]
 
 
+class UploadManifestItem(BaseSanitizedModel):
+    filename: str
+    date: date
+    file_type: FileTypeEnum
+
+
+class UploadSessionCreate(BaseSanitizedModel):
+    date: date
+    file_type: FileTypeEnum
+    extension: str
+    size: int = Field(gt=0)
+    # defaults to UPLOAD_CHUNK_SIZE
+    chunk_size: Optional[int] = Field(default=None, gt=0)
+
+
 class StatusUpdateRequest(BaseSanitizedModel):
     ids: List[int]
     status: FileStatusEnum
@@ -2,6 +2,9 @@ from datetime import date
 import math
 from typing import List, Optional
 
+from pydantic import model_validator
+
+from app.core.fruits import unpack_fruits
 from app.schemas import PlantInDB
 from app.schemas.base import BaseSanitizedModel
 
@@ -66,9 +69,55 @@ class MeasurementInDB(MeasurementBase):
     id: int
     ripe: Optional[int] = None
     cumulative_ripe: Optional[int] = None # calculated field on the fly
+    # derived from the fruits on write
+    fruit_width_mean: Optional[float] = None
+    fruit_width_median: Optional[float] = None
+    fruit_height_mean: Optional[float] = None
+    fruit_height_median: Optional[float] = None
+    fruit_mass_total: Optional[float] = None
+    fruit_mass_mean: Optional[float] = None
+    fruit_count_small: Optional[int] = None
+    fruit_count_medium: Optional[int] = None
+    fruit_count_large: Optional[int] = None
     plant: PlantInDB
     fruits: List[FruitInDB] = []
 
     model_config = {
         "from_attributes": True,
     }
+
+    @model_validator(mode="before")
+    @classmethod
+    def fruits_from_packed(cls, data):
+        """Serve `fruits` from fruits_packed when set (FRUIT_STORAGE_MODE=packed)."""
+        if isinstance(data, dict):
+            packed = data.get("fruits_packed")
+            if packed is None:
+                return data
+            return {**data, "fruits": unpack_fruits(packed)}
+        packed = getattr(data, "fruits_packed", None)
+        if packed is None:
+            return data
+        # ORM row: copy the fields without touching the fruits relationship
+        values = {
+            name: getattr(data, name, None)
+            for name in cls.model_fields
+            if name != "fruits"
+        }
+        values["fruits"] = unpack_fruits(packed)
+        return values
+
+
+# ======== BATCH ========
+class MeasurementBatchItemResult(BaseSanitizedModel):
+    index: int  # position in the request array
+    status: str  # "created", "updated" or "error"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class MeasurementBatchResult(BaseSanitizedModel):
+    created: int
+    updated: int
+    failed: int
+    items: List[MeasurementBatchItemResult]
@@ -0,0 +1,91 @@
+"""
+Fill the derived fruit statistics on plant_measurements (migration
+5e9b2d7f4c18) from each measurement's fruits, packed or plant_fruits rows.
+
+By default only rows never computed (fruit_count_small IS NULL) are
+processed; pass --all to recompute everything, e.g. after changing
+FRUIT_SIZE_CLASS_WIDTHS. One transaction per batch, safe to re-run.
+
+Usage:
+    python -m scripts.backfill_fruit_stats [--batch-size 1000] [--all]
+"""
+
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.fruits import fruit_stats, unpack_fruits
+from app.db.models import PlantFruit, PlantMeasurement
+from app.db.session import SessionLocal
+
+measurements = PlantMeasurement.__table__
+fruits = PlantFruit.__table__
+
+
+def backfill(batch_size: int = 1000, recompute_all: bool = False):
+    total, last_id = 0, 0
+    with SessionLocal() as session:
+        while True:
+            stmt = (
+                select(measurements.c.id, measurements.c.fruits_packed)
+                .where(measurements.c.id > last_id)
+                .order_by(measurements.c.id)
+                .limit(batch_size)
+            )
+            if not recompute_all:
+                stmt = stmt.where(measurements.c.fruit_count_small.is_(None))
+            batch = session.execute(stmt).all()
+            if not batch:
+                break
+
+            by_measurement = defaultdict(list)
+            for row in session.execute(
+                select(
+                    fruits.c.measurement_id,
+                    fruits.c.width,
+                    fruits.c.height,
+                    fruits.c.mass,
+                ).where(
+                    fruits.c.measurement_id.in_(
+                        [m.id for m in batch if m.fruits_packed is None]
+                    )
+                )
+            ):
+                by_measurement[row.measurement_id].append(row)
+
+            session.execute(
+                update(measurements)
+                .where(measurements.c.id == bindparam("measurement_id"))
+                .values({name: bindparam(name) for name in fruit_stats([])}),
+                [
+                    {
+                        "measurement_id": m.id,
+                        **fruit_stats(
+                            unpack_fruits(m.fruits_packed)
+                            if m.fruits_packed is not None
+                            else by_measurement[m.id]
+                        ),
+                    }
+                    for m in batch
+                ],
+            )
+            session.commit()
+
+            total += len(batch)
+            last_id = batch[-1].id
+            print(f"Computed fruit stats of {total} measurements (up to id {last_id})")
+
+    print(f"Done: {total} measurements updated")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="recompute measurements that already have stats",
+    )
+    args = parser.parse_args()
+    backfill(args.batch_size, args.all)
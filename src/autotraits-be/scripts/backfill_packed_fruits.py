@@ -0,0 +1,84 @@
+"""
+Backfill plant_measurements.fruits_packed from plant_fruits rows.
+
+Run after migration a3f5c8d2e1b4 and before setting FRUIT_STORAGE_MODE=packed.
+Measurements are processed in id order, one transaction per batch, so the
+script can be stopped and re-run. Measurements without fruits get an empty
+value, which marks them as backfilled. With --delete-rows the plant_fruits
+rows of each packed batch are deleted in the same transaction.
+
+Usage:
+    python -m scripts.backfill_packed_fruits [--batch-size 1000] [--delete-rows]
+"""
+
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import bindparam, delete, select, update
+
+from app.core.fruits import pack_fruits
+from app.db.models import PlantFruit, PlantMeasurement
+from app.db.session import SessionLocal
+
+measurements = PlantMeasurement.__table__
+fruits = PlantFruit.__table__
+
+
+def backfill(batch_size: int = 1000, delete_rows: bool = False):
+    total, last_id = 0, 0
+    with SessionLocal() as session:
+        while True:
+            ids = session.scalars(
+                select(measurements.c.id)
+                .where(
+                    measurements.c.id > last_id, measurements.c.fruits_packed.is_(None)
+                )
+                .order_by(measurements.c.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            by_measurement = defaultdict(list)
+            for row in session.execute(
+                select(
+                    fruits.c.measurement_id,
+                    fruits.c.width,
+                    fruits.c.height,
+                    fruits.c.mass,
+                )
+                .where(fruits.c.measurement_id.in_(ids))
+                .order_by(fruits.c.measurement_id, fruits.c.id)
+            ):
+                by_measurement[row.measurement_id].append(row)
+
+            session.execute(
+                update(measurements)
+                .where(measurements.c.id == bindparam("measurement_id"))
+                .values(fruits_packed=bindparam("packed")),
+                [
+                    {"measurement_id": i, "packed": pack_fruits(by_measurement[i])}
+                    for i in ids
+                ],
+            )
+            if delete_rows:
+                session.execute(delete(fruits).where(fruits.c.measurement_id.in_(ids)))
+            session.commit()
+
+            total += len(ids)
+            last_id = ids[-1]
+            print(f"Packed fruits of {total} measurements (up to id {last_id})")
+
+    print(f"Done: {total} measurements backfilled")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--delete-rows",
+        action="store_true",
+        help="delete plant_fruits rows once packed",
+    )
+    args = parser.parse_args()
+    backfill(args.batch_size, args.delete_rows)
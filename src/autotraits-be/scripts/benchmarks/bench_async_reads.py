@@ -0,0 +1,78 @@
+"""
+Throughput of read endpoints under many concurrent readers.
+
+Logs in once, then `--concurrency` clients hit each `--path` back to back
+for `--duration` seconds. Run it against the server before and after a
+change (same DB, same worker count) to compare.
+
+Usage:
+    python -m scripts.benchmarks.bench_async_reads \\
+        --base-url http://localhost:8000 --email a@b.c --password secret \\
+        --concurrency 500 --path /api/measurements --path /api/summary
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def reader(client, path, stop_at, latencies, errors):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def bench_path(client, path, args):
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + args.duration
+    await asyncio.gather(
+        *[
+            reader(client, path, stop_at, latencies, errors)
+            for _ in range(args.concurrency)
+        ]
+    )
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("nan")
+    print(
+        f"{path}: {len(latencies) / args.duration:.1f} req/s, "
+        f"p50={statistics.median(latencies) * 1000:.0f}ms "
+        f"p99={p99 * 1000:.0f}ms, errors={len(errors)}"
+    )
+
+
+async def main(args):
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=120,
+        limits=httpx.Limits(max_connections=args.concurrency),
+    ) as client:
+        response = await client.post(
+            "/api/auth/login", data={"username": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        # the auth cookies are `secure`; carry them over plain http too
+        client.cookies.set("access_token", response.cookies["access_token"])
+        for path in args.path:
+            await bench_path(client, path, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--path", action="append", default=[])
+    args = parser.parse_args()
+    args.path = args.path or ["/api/measurements", "/api/summary"]
+    asyncio.run(main(args))
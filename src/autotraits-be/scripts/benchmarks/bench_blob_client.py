@@ -0,0 +1,102 @@
+"""
+Benchmark: SAS URL generation and blob upload latency with a new
+BlobServiceClient per call (the previous behaviour) versus the pooled
+process-wide client of app.core.adls, and signing the URLs of an image
+listing (`--listing` files) one by one versus generate_read_sas_urls, cold
+and cached.
+
+Uses ADLS_CONNECTION_STRING / ADLS_CONTAINER_NAME from the environment.
+SAS generation is offline and works with any connection string holding an
+account key; `--uploads` also uploads that many `--size` byte blobs (needs a
+reachable account or Azurite) and deletes them afterwards.
+
+Usage:
+    python -m scripts.benchmarks.bench_blob_client --sas 2000 --listing 500 \\
+        --uploads 50
+"""
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+
+from app.core import adls
+from app.core.conf import settings
+
+
+def sas_per_call(blob_path: str) -> str:
+    client = BlobServiceClient.from_connection_string(settings.ADLS_CONNECTION_STRING)
+    return generate_blob_sas(
+        account_name=client.account_name,
+        container_name=settings.ADLS_CONTAINER_NAME,
+        blob_name=blob_path,
+        account_key=client.credential.account_key,
+        permission=BlobSasPermissions(read=True),
+        expiry=datetime.utcnow() + timedelta(minutes=60),
+    )
+
+
+def upload_per_call(blob_name: str, data: bytes):
+    client = BlobServiceClient.from_connection_string(settings.ADLS_CONNECTION_STRING)
+    container = client.get_container_client(settings.ADLS_CONTAINER_NAME)
+    container.get_blob_client(blob_name).upload_blob(data, overwrite=True)
+
+
+def timed(fn, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:>16}: p50 {statistics.median(latencies):.3f} ms,"
+        f" p99 {p99:.3f} ms, total {sum(latencies) / 1000:.2f} s"
+    )
+
+
+def main(args):
+    paths = [(f"{uuid.uuid4()}.png",) for _ in range(args.sas)]
+    report("sas per-call", timed(sas_per_call, paths))
+    report("sas pooled", timed(adls.generate_sas_url, paths))
+
+    listing = [path for (path,) in paths[: args.listing]]
+    listings = [(listing,)] * args.repeat
+    report(
+        "listing per-file",
+        timed(lambda files: [sas_per_call(f) for f in files], listings),
+    )
+    report(
+        "listing pooled",
+        timed(lambda files: [adls.generate_sas_url(f) for f in files], listings),
+    )
+    report("listing cold", timed(adls.generate_read_sas_urls, [(listing,)]))
+    report("listing cached", timed(adls.generate_read_sas_urls, listings))
+
+    if args.uploads:
+        data = os.urandom(args.size)
+        names = [f"bench/{uuid.uuid4()}.bin" for _ in range(args.uploads)]
+        report("upload per-call", timed(upload_per_call, [(n, data) for n in names]))
+        report("upload pooled", timed(adls.upload_to_blob, [(n, data) for n in names]))
+        container = adls.get_container_client()
+        for name in names:
+            container.delete_blob(name)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sas", type=int, default=2000)
+    parser.add_argument("--listing", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--uploads", type=int, default=0)
+    parser.add_argument("--size", type=int, default=256 * 1024)
+    main(parser.parse_args())
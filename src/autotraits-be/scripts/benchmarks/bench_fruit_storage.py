@@ -0,0 +1,132 @@
+"""
+Benchmark: FRUIT_STORAGE_MODE=table versus packed.
+
+For each mode, creates the schema in an empty database, imports `--count`
+measurements with `--fruits` fruits each through
+crud.create_measurements_batch, then reports the on-disk size of the
+measurement and fruit tables and the latency of listing 100 measurements
+(crud.get_measurements_async, as used by GET /measurements).
+
+`--database-url` must point to an empty, disposable database; tables are
+dropped between modes. Defaults to a temporary SQLite file.
+
+Usage:
+    python -m scripts.benchmarks.bench_fruit_storage --count 5000 --fruits 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud
+from app.core.conf import settings
+from app.db.base import Base
+from app.db.models import Breeder, Plant
+from app.db.session import async_database_url, enable_sqlite_foreign_keys
+from app.schemas import MeasurementCreate
+
+
+def items(plant_id: int, count: int, fruits: int):
+    start = date(2000, 1, 1)
+    return [
+        MeasurementCreate(
+            plant_id=plant_id,
+            date=start + timedelta(days=i),
+            field="A",
+            variety="Falco",
+            fruits=[
+                {"width": 20 + j * 0.1, "height": 30 + j * 0.1, "mass": 12.5}
+                for j in range(fruits)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def table_size(engine, path):
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return conn.scalar(
+                text(
+                    "SELECT pg_total_relation_size('plant_measurements')"
+                    " + pg_total_relation_size('plant_fruits')"
+                )
+            )
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(path)
+
+
+async def list_latencies(url, breeder_id, args):
+    engine = create_async_engine(async_database_url(url))
+    latencies = []
+    async with AsyncSession(engine) as db:
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            await crud.get_measurements_async(
+                db, offset=(i * 100) % args.count, limit=100, breeder_id=breeder_id
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+    await engine.dispose()
+    return latencies
+
+
+def run(url, path, mode, args):
+    settings.FRUIT_STORAGE_MODE = mode
+    engine = create_engine(url)
+    enable_sqlite_foreign_keys(engine)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        breeder = Breeder(name="bench")
+        db.add(breeder)
+        db.flush()
+        plant = Plant(breeder_id=breeder.id, plant_code="bench")
+        db.add(plant)
+        db.commit()
+        batch = items(plant.id, args.count, args.fruits)
+
+        start = time.perf_counter()
+        for i in range(0, len(batch), 500):
+            crud.create_measurements_batch(db, batch[i : i + 500], breeder.id)
+        import_s = time.perf_counter() - start
+
+        latencies = asyncio.run(list_latencies(url, breeder.id, args))
+
+    size = table_size(engine, path)
+    engine.dispose()
+    print(
+        f"{mode:>6}: import {args.count / import_s:,.0f} measurements/s, "
+        f"size {size / 1024 / 1024:.1f} MiB, "
+        f"list 100 p50 {statistics.median(latencies):.1f} ms"
+    )
+
+
+def main(args):
+    path = None
+    url = args.database_url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench_fruit_storage.db")
+        url = f"sqlite:///{path}"
+    for mode in ("table", "packed"):
+        if path and os.path.exists(path):
+            os.remove(path)
+        run(url, path, mode, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--fruits", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
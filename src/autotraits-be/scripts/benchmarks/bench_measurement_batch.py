@@ -0,0 +1,92 @@
+"""
+Benchmark: measurements written per second through POST /measurements
+(one per request) versus POST /measurements/batch at several batch sizes.
+
+Creates a fresh plant per run and writes `--count` measurements with
+`--fruits` fruits each, on consecutive dates.
+
+Usage:
+    python -m scripts.benchmarks.bench_measurement_batch \\
+        --base-url http://localhost:8000 --email a@b.c --password secret
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date, timedelta
+
+import httpx
+
+
+def measurements(plant_id: int, count: int, fruits: int):
+    start = date(2000, 1, 1)
+    fruit = {"width": 21.5, "height": 30.1, "mass": 12.7}
+    return [
+        {
+            "plant_id": plant_id,
+            "date": (start + timedelta(days=i)).isoformat(),
+            "field": "A",
+            "variety": "Falco",
+            "fruits": [fruit] * fruits,
+        }
+        for i in range(count)
+    ]
+
+
+def new_plant(client: httpx.Client) -> int:
+    response = client.post(
+        "/api/plants", json={"plant_code": f"bench-{uuid.uuid4().hex[:8]}"}
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def run(client, args, batch_size):
+    items = measurements(new_plant(client), args.count, args.fruits)
+    start = time.perf_counter()
+    if batch_size == 1:
+        for item in items:
+            client.post("/api/measurements", json=item).raise_for_status()
+        requests = len(items)
+    else:
+        requests = 0
+        for i in range(0, len(items), batch_size):
+            response = client.post(
+                "/api/measurements/batch", json=items[i : i + batch_size]
+            )
+            response.raise_for_status()
+            assert response.json()["failed"] == 0, response.json()
+            requests += 1
+    elapsed = time.perf_counter() - start
+    name = "single" if batch_size == 1 else f"batch={batch_size}"
+    print(
+        f"{name:>10}: {len(items)} measurements in {requests} requests, "
+        f"{elapsed:.2f}s, {len(items) / elapsed:.0f} measurements/s"
+    )
+
+
+def main(args):
+    with httpx.Client(base_url=args.base_url, timeout=120) as client:
+        response = client.post(
+            "/api/auth/login", data={"username": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        # the auth cookies are `secure`; carry them over plain http too
+        for name in ("access_token", "refresh_token"):
+            client.cookies.set(name, response.cookies[name])
+
+        for batch_size in args.batch_sizes:
+            run(client, args, batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--fruits", type=int, default=10)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 10, 50, 200, 500]
+    )
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Benchmark: a rig's daily batch as one upload-file-v2 request per file
+(`--clients` at a time) versus one /upload-files request, against a live
+server.
+
+Usage:
+    python -m scripts.benchmarks.bench_multi_upload \\
+        --base-url http://localhost:8000 --email a@b.c --password secret \\
+        --plant-id 1 [--files 200] [--file-kb 300]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from scripts.benchmarks.load_test_login import login
+
+
+async def one_per_file(client, args, payloads):
+    slots = asyncio.Semaphore(args.clients)
+
+    async def upload(name, payload):
+        async with slots:
+            response = await client.post(
+                f"/api/plant/{args.plant_id}/upload-file-v2",
+                data={"date": "2025-05-06", "file_type": "TWO_D"},
+                files={"file": (name, payload, "image/png")},
+            )
+            response.raise_for_status()
+
+    await asyncio.gather(*(upload(name, payload) for name, payload in payloads))
+
+
+async def one_request(client, args, payloads):
+    manifest = [
+        {"filename": name, "date": "2025-05-06", "file_type": "TWO_D"}
+        for name, _ in payloads
+    ]
+    response = await client.post(
+        f"/api/plant/{args.plant_id}/upload-files",
+        data={"manifest": json.dumps(manifest)},
+        files=[("files", (name, payload, "image/png")) for name, payload in payloads],
+    )
+    response.raise_for_status()
+    assert {r["status"] for r in response.json()} == {"COMPLETED"}
+
+
+async def main(args):
+    payloads = [
+        (f"capture-{i:04d}.png", os.urandom(args.file_kb * 1024))
+        for i in range(args.files)
+    ]
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=600) as client:
+        response = await login(client, args.email, args.password)
+        response.raise_for_status()
+        # the auth cookies are `secure`; carry them over plain http too
+        for name in ("access_token", "refresh_token"):
+            client.cookies.set(name, response.cookies[name])
+
+        for label, run, requests in (
+            (f"upload-file-v2 x{args.clients}", one_per_file, args.files),
+            ("upload-files", one_request, 1),
+        ):
+            start = time.perf_counter()
+            await run(client, args, payloads)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label:>18}: {args.files} files in {requests} requests, "
+                f"{elapsed:.2f}s ({args.files / elapsed:.0f} files/s)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--plant-id", type=int, required=True)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=300)
+    parser.add_argument("--clients", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
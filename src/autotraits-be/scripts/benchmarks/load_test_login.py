@@ -0,0 +1,93 @@
+"""
+Load test: latency of GET /api/measurements while a login burst runs.
+
+Runs two phases against a live server, first readers only, then readers
+plus `--login-concurrency` clients logging in back to back, and prints
+p50/p99 reader latency for each phase.
+
+Usage:
+    python -m scripts.benchmarks.load_test_login \\
+        --base-url http://localhost:8000 --email a@b.c --password secret
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str):
+    return await client.post(
+        "/api/auth/login", data={"username": email, "password": password}
+    )
+
+
+async def reader(client, stop_at, latencies):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get("/api/measurements", params={"limit": 10})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def login_storm(args, stop_at, statuses):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        while time.perf_counter() < stop_at:
+            response = await login(client, args.email, args.password)
+            statuses.append(response.status_code)
+
+
+async def run_phase(args, reader_client, with_logins: bool):
+    stop_at = time.perf_counter() + args.duration
+    latencies, statuses = [], []
+    tasks = [reader(reader_client, stop_at, latencies) for _ in range(args.readers)]
+    if with_logins:
+        tasks += [
+            login_storm(args, stop_at, statuses) for _ in range(args.login_concurrency)
+        ]
+    await asyncio.gather(*tasks)
+
+    name = "with login burst" if with_logins else "readers only"
+    print(
+        f"{name:>17}: {len(latencies)} reads, "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+    )
+    if statuses:
+        counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+        print(f"{'':>17}  login responses: {counts}")
+
+
+async def main(args):
+    # readers share one cookie jar so they hit the authenticated fast path
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=60,
+        limits=httpx.Limits(max_connections=args.readers),
+    ) as reader_client:
+        response = await login(reader_client, args.email, args.password)
+        response.raise_for_status()
+        # the auth cookies are `secure`; carry them over plain http too
+        for name in ("access_token", "refresh_token"):
+            reader_client.cookies.set(name, response.cookies[name])
+
+        await run_phase(args, reader_client, with_logins=False)
+        await run_phase(args, reader_client, with_logins=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Load test: latency of GET /api/measurements while large files are uploaded.
+
+Runs two phases against a live server, first readers only, then readers
+plus `--uploaders` clients posting `--file-mb` MB files to
+/api/plant/{plant_id}/upload-file-v2 back to back, and prints p50/p99
+reader latency and upload throughput for each phase.
+
+Usage:
+    python -m scripts.benchmarks.load_test_upload \\
+        --base-url http://localhost:8000 --email a@b.c --password secret \\
+        --plant-id 1
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from scripts.benchmarks.load_test_login import login, percentile, reader
+
+
+async def uploader(client, args, payload, stop_at, statuses):
+    while time.perf_counter() < stop_at:
+        response = await client.post(
+            f"/api/plant/{args.plant_id}/upload-file-v2",
+            data={"date": "2025-05-06", "file_type": "THREE_D"},
+            files={"file": ("cloud.ply", payload, "application/octet-stream")},
+        )
+        statuses.append(response.status_code)
+
+
+async def run_phase(args, client, payload, with_uploads: bool):
+    stop_at = time.perf_counter() + args.duration
+    latencies, statuses = [], []
+    tasks = [reader(client, stop_at, latencies) for _ in range(args.readers)]
+    if with_uploads:
+        tasks += [
+            uploader(client, args, payload, stop_at, statuses)
+            for _ in range(args.uploaders)
+        ]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    name = "with uploads" if with_uploads else "readers only"
+    print(
+        f"{name:>13}: {len(latencies)} reads, "
+        f"p50={statistics.median(latencies) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+    )
+    if statuses:
+        counts = {code: statuses.count(code) for code in sorted(set(statuses))}
+        uploaded = statuses.count(200) * len(payload) / 1024 / 1024
+        print(
+            f"{'':>13}  upload responses: {counts}, "
+            f"{uploaded / elapsed:.1f} MB/s uploaded"
+        )
+
+
+async def main(args):
+    payload = os.urandom(int(args.file_mb * 1024 * 1024))
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        timeout=120,
+        limits=httpx.Limits(max_connections=args.readers + args.uploaders),
+    ) as client:
+        response = await login(client, args.email, args.password)
+        response.raise_for_status()
+        # the auth cookies are `secure`; carry them over plain http too
+        for name in ("access_token", "refresh_token"):
+            client.cookies.set(name, response.cookies[name])
+
+        await run_phase(args, client, payload, with_uploads=False)
+        await run_phase(args, client, payload, with_uploads=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--plant-id", type=int, required=True)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--uploaders", type=int, default=8)
+    parser.add_argument("--file-mb", type=float, default=9.0)
+    parser.add_argument("--duration", type=float, default=15.0)
+    asyncio.run(main(parser.parse_args()))
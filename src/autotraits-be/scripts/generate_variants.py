@@ -0,0 +1,51 @@
+"""
+Render variants (app.core.variants) for completed plant files that have
+none, in a process pool of --workers processes: WebP thumbnails and
+previews of 2D images, levels of detail of 3D point clouds.
+
+Runs once by default; with --watch it keeps polling for newly completed
+files every --interval seconds, as a background worker next to the API.
+Files that fail (e.g. corrupt PNG or PLY files) are logged and not
+retried within a --watch run. Run a single instance at a time.
+
+Usage:
+    python -m scripts.generate_variants [--workers 2] [--batch-size 100]
+        [--watch] [--interval 30]
+"""
+
+import argparse
+import logging
+import time
+
+from app.core.storage import get_storage
+from app.core.variants import generate_variants, variant_pool
+from app.db.session import SessionLocal
+
+
+def main(args):
+    failed = set()
+    with variant_pool(args.workers) as pool:
+        while True:
+            start = time.perf_counter()
+            done, new_failures = generate_variants(
+                SessionLocal, get_storage(), pool, args.batch_size, skip=failed
+            )
+            failed.update(new_failures)
+            if done or new_failures:
+                print(
+                    f"Rendered variants of {done} files, {len(new_failures)} failed "
+                    f"in {time.perf_counter() - start:.1f}s"
+                )
+            if not args.watch:
+                return
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--watch", action="store_true")
+    parser.add_argument("--interval", type=float, default=30.0)
+    main(parser.parse_args())
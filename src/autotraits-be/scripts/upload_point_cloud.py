@@ -0,0 +1,104 @@
+"""
+Upload a large file (e.g. a dbscan_cleaned.ply point cloud) through the
+resumable upload API: chunks are sent in parallel and retried, and an
+interrupted upload is resumed by passing the printed upload id back with
+--resume, which sends only the chunks the server has not received.
+
+Usage:
+    python -m scripts.upload_point_cloud path/to/dbscan_cleaned.ply \\
+        --plant-id 1 --date 2025-05-06 --email a@b.c --password secret \\
+        [--base-url http://localhost:8000] [--workers 4] [--resume <upload id>]
+"""
+
+import argparse
+import concurrent.futures
+import os
+import time
+
+import requests
+
+
+def login(session: requests.Session, base_url: str, email: str, password: str):
+    response = session.post(
+        f"{base_url}/api/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    # the auth cookies are `secure`; carry them over plain http too
+    for name in ("access_token", "refresh_token"):
+        session.cookies.set(name, response.cookies[name])
+
+
+def put_chunk(session, base_url, upload, path, index, retries=5):
+    chunk_size = upload["chunk_size"]
+    with open(path, "rb") as f:
+        f.seek(index * chunk_size)
+        data = f.read(chunk_size)
+    url = f"{base_url}/api/uploads/{upload['upload_id']}/chunks/{index}"
+    for attempt in range(retries):
+        try:
+            response = session.put(url, data=data, timeout=300)
+            if response.status_code == 200:
+                return index
+            if response.status_code < 500:
+                raise RuntimeError(f"chunk {index}: {response.text}")
+        except requests.ConnectionError:
+            pass
+        time.sleep(2**attempt)
+    raise RuntimeError(f"chunk {index}: giving up after {retries} attempts")
+
+
+def main(args):
+    base_url = args.base_url.rstrip("/")
+    session = requests.Session()
+    login(session, base_url, args.email, args.password)
+
+    if args.resume:
+        response = session.get(f"{base_url}/api/uploads/{args.resume}")
+    else:
+        extension = os.path.splitext(args.path)[1].lstrip(".").lower()
+        response = session.post(
+            f"{base_url}/api/plant/{args.plant_id}/uploads",
+            json={
+                "date": args.date,
+                "file_type": args.file_type,
+                "extension": extension,
+                "size": os.path.getsize(args.path),
+            },
+        )
+    response.raise_for_status()
+    upload = response.json()
+    print(f"Upload id: {upload['upload_id']} (pass --resume to continue it)")
+
+    received = set(upload["received"])
+    pending = [i for i in range(upload["chunk_count"]) if i not in received]
+    print(f"Sending {len(pending)} of {upload['chunk_count']} chunks")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [
+            executor.submit(put_chunk, session, base_url, upload, args.path, index)
+            for index in pending
+        ]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            future.result()
+            print(f"\r{done}/{len(pending)} chunks", end="", flush=True)
+    print()
+
+    response = session.post(f"{base_url}/api/uploads/{upload['upload_id']}/commit")
+    response.raise_for_status()
+    print("Committed:", response.json())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--plant-id", type=int)
+    parser.add_argument("--date")
+    parser.add_argument("--file-type", default="THREE_D")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--resume", metavar="UPLOAD_ID")
+    args = parser.parse_args()
+    if not args.resume and (args.plant_id is None or args.date is None):
+        parser.error("--plant-id and --date are required for a new upload")
+    main(args)
@@ -1,20 +1,37 @@
 # tests/conftest.py
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.db.base import Base
-from app.db.session import SessionLocal
+from app.db.session import enable_sqlite_foreign_keys
+from app.dependencies import get_async_db, get_db
 from app.main import app
 
-# Use SQLite in-memory DB for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Use a throwaway SQLite file so the sync and async (aiosqlite) engines
+# see the same data
+DB_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, future=True
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: aiosqlite connections must not outlive the TestClient event loop
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+# ON DELETE CASCADE needs foreign keys on
+enable_sqlite_foreign_keys(engine)
+enable_sqlite_foreign_keys(async_engine.sync_engine)
+
 
 # Dependency override
 def override_get_db():
@@ -25,7 +42,13 @@ def override_get_db():
         db.close()
 
 
-app.dependency_overrides[SessionLocal] = override_get_db
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 # Create a clean DB before each test session
@@ -39,7 +62,8 @@ def setup_db():
 # Fixture: FastAPI test client
 @pytest.fixture()
 def client():
-    yield TestClient(app)
+    # https: auth cookies are set with secure=True
+    yield TestClient(app, base_url="https://testserver")
 
 
 # Fixture: test DB session
@@ -50,3 +74,20 @@ def db_session():
         yield db
     finally:
         db.close()
+
+
+# Fixture: sign up (if needed) and log the client in
+@pytest.fixture()
+def login(client):
+    def _login(email, breeder_name, password="secret"):
+        client.post(
+            "/api/auth/signup",
+            json={"email": email, "password": password, "breeder_name": breeder_name},
+        )
+        response = client.post(
+            "/api/auth/login", data={"username": email, "password": password}
+        )
+        assert response.status_code == 200
+        return response
+
+    return _login
@@ -0,0 +1,53 @@
+# tests/test_adls.py
+import pytest
+
+from app.core import adls
+from app.core.cache import TTLCache
+from app.core.conf import settings
+
+CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=https;AccountName=testacct;"
+    "AccountKey=dGVzdC1rZXktdGVzdC1rZXktdGVzdC1rZXk=;"
+    "EndpointSuffix=core.windows.net"
+)
+
+
+@pytest.fixture()
+def blob_settings(monkeypatch):
+    monkeypatch.setattr(settings, "ADLS_CONNECTION_STRING", CONNECTION_STRING)
+    monkeypatch.setattr(settings, "ADLS_CONTAINER_NAME", "images")
+    monkeypatch.setattr(adls, "_client", None)
+    monkeypatch.setattr(adls, "_read_sas_cache", TTLCache())
+
+
+def test_blob_client_is_shared_per_process(blob_settings, monkeypatch):
+    client = adls.get_blob_service_client()
+    assert adls.get_blob_service_client() is client
+    assert adls.get_account_credentials()[0] == "testacct"
+
+    # a forked worker builds its own client
+    monkeypatch.setattr(adls, "_client_pid", -1)
+    assert adls.get_blob_service_client() is not client
+
+
+def test_generate_sas_url(blob_settings):
+    url = adls.generate_sas_url("a/b.png")
+    assert url.startswith("https://testacct.blob.core.windows.net/images/a/b.png?")
+    assert "sp=r" in url
+    assert "sp=cw" in adls.generate_sas_url("a/b.png", isUpload=True)
+
+
+def test_read_sas_urls_are_stable_within_a_bucket(blob_settings, monkeypatch):
+    monkeypatch.setattr(adls.time, "time", lambda: 10_000.0)
+    first = adls.generate_read_sas_urls(["a.png", "b.ply"])
+    assert first == adls.generate_read_sas_urls(["b.ply", "a.png"])
+    assert first["a.png"].split("?")[0].endswith("/images/a.png")
+    assert "rscc=max-age%3D2700" in first["a.png"]
+
+    # same 15-minute bucket (9900..10800s): same URL, even signed afresh
+    monkeypatch.setattr(adls, "_read_sas_cache", TTLCache())
+    monkeypatch.setattr(adls.time, "time", lambda: 10_700.0)
+    assert adls.generate_read_sas_urls(["a.png"]) == {"a.png": first["a.png"]}
+
+    monkeypatch.setattr(adls.time, "time", lambda: 10_900.0)
+    assert adls.generate_read_sas_urls(["a.png"])["a.png"] != first["a.png"]
@@ -0,0 +1,106 @@
+# tests/test_auth.py
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+import app.crud as crud
+from app.core.conf import settings
+from app.core.security import user_cache
+from app.db.models import User
+from app.main import app
+
+
+def test_principal_is_served_from_user_cache(client, db_session, login):
+    login("cache@example.com", "cache-breeder")
+    user_cache.clear()
+
+    assert client.get("/api/plants").status_code == 200
+    # Promote the user behind the cache's back: the cached role still applies
+    user = db_session.query(User).filter(User.email == "cache@example.com").one()
+    user.role = "admin"
+    db_session.commit()
+    assert client.get("/api/plants").status_code == 200
+    assert client.get("/api/metrics/coalescing").status_code == 403
+
+
+def test_revoked_tokens_are_rejected(client, db_session, login):
+    login("revoke@example.com", "revoke-breeder")
+    user = db_session.query(User).filter(User.email == "revoke@example.com").one()
+    assert client.get("/api/plants").status_code == 200
+
+    crud.revoke_user_tokens(db_session, user.id)
+
+    response = client.get("/api/plants")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revoked"
+
+
+def test_login_rehashes_password_with_outdated_cost(client, db_session, login):
+    login("rehash@example.com", "rehash-breeder")
+    user = db_session.query(User).filter(User.email == "rehash@example.com").one()
+    user.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(
+        "secret"
+    )
+    db_session.commit()
+
+    login("rehash@example.com", "rehash-breeder")
+
+    db_session.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+
+def test_login_returns_503_when_password_pool_is_saturated(client, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    response = client.post(
+        "/api/auth/login", data={"username": "any@example.com", "password": "x"}
+    )
+    # unknown users are rejected before any hashing work is admitted
+    assert response.status_code == 401
+
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "busy@example.com", "password": "x", "breeder_name": "busy"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_admin_role_changes_and_deletions_revoke_access(client, db_session, login):
+    member = TestClient(app, base_url="https://testserver")
+    for email in ("member@example.com", "other-member@example.com"):
+        member.post(
+            "/api/auth/signup",
+            json={"email": email, "password": "secret", "breeder_name": "member"},
+        )
+    login("useradmin@example.com", "useradmin-breeder")
+    admin = db_session.query(User).filter(User.email == "useradmin@example.com").one()
+    admin.role = "admin"
+    db_session.commit()
+    user_cache.clear()
+
+    def sign_in(email):
+        response = member.post(
+            "/api/auth/login", data={"username": email, "password": "secret"}
+        )
+        assert response.status_code == 200
+        assert member.get("/api/plants").status_code == 200
+        return db_session.query(User).filter(User.email == email).one().id
+
+    user_id = sign_in("member@example.com")
+    response = client.patch(f"/api/user/{user_id}", json={"role": "admin"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "admin"
+    assert member.get("/api/plants").json()["detail"] == "Token revoked"
+
+    user_id = sign_in("other-member@example.com")
+    assert client.delete(f"/api/user/{user_id}").status_code == 200
+    assert member.get("/api/plants").json()["detail"] == "User not found"
+    assert client.delete(f"/api/user/{user_id}").status_code == 404
+    assert (
+        client.patch(f"/api/user/{admin.id}", json={"breeder_id": 0}).status_code == 404
+    )
+
+    # only admins manage users
+    assert member.patch(f"/api/user/{admin.id}", json={}).status_code == 401
+    login("plain-member@example.com", "member")
+    assert client.delete(f"/api/user/{admin.id}").status_code == 403
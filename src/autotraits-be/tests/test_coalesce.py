@@ -0,0 +1,85 @@
+# tests/test_coalesce.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.coalesce import DataVersions, SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    def slow_read():
+        executions.append(1)
+        time.sleep(0.2)
+        return {"total_plants": 3}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("f", "k", slow_read)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(executions) == 1
+    assert results == [{"total_plants": 3}] * 5
+    assert flight.metrics()["functions"]["f"] == {
+        "calls": 5,
+        "executions": 1,
+        "coalesced": 4,
+    }
+
+
+def test_cancelled_leader_leaves_the_call_to_its_followers():
+    flight = SingleFlight()
+    executions = []
+
+    async def slow_read():
+        executions.append(1)
+        await asyncio.sleep(0.1)
+        return {"total_plants": 3}
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("f", "k", slow_read))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do_async("f", "k", slow_read))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == {"total_plants": 3}
+    assert len(executions) == 1
+    assert flight.metrics()["in_flight"] == 0
+
+
+def test_async_failure_reaches_every_caller_and_is_not_cached():
+    flight = SingleFlight()
+
+    async def failing_read():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("replica gone")
+
+    async def main():
+        calls = [flight.do_async("f", "k", failing_read) for _ in range(3)]
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [RuntimeError] * 3
+    assert flight.metrics()["functions"]["f"]["executions"] == 1
+    assert flight.metrics()["in_flight"] == 0
+
+
+def test_data_version_bump_is_scoped_to_breeder():
+    versions = DataVersions()
+    versions.bump(1)
+    assert versions.get(1) == 1
+    assert versions.get(2) == 0
+    assert versions.get(None) == 1
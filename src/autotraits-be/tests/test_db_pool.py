@@ -0,0 +1,48 @@
+# tests/test_db_pool.py
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.core.security import user_cache
+from app.db.models import User
+from app.db.session import InstrumentedQueuePool
+
+
+def test_instrumented_pool_counts_checkouts_overflow_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    first, second = engine.connect(), engine.connect()
+    metrics = engine.pool.metrics()
+    assert (metrics["checked_out"], metrics["overflow"]) == (2, 1)
+    assert metrics["checkouts"] == 2
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    metrics = engine.pool.metrics()
+    assert metrics["checkout_timeouts"] == 1
+    assert metrics["wait_max_ms"] >= 50
+
+    first.close()
+    second.close()
+    metrics = engine.pool.metrics()
+    assert (metrics["checked_out"], metrics["checked_in"]) == (0, 1)
+    assert metrics["checkouts"] == 3
+    engine.dispose()
+
+
+def test_db_pool_metrics_are_admin_only(client, db_session, login):
+    login("pool-admin@example.com", "pool-breeder")
+    user_cache.clear()
+    assert client.get("/api/metrics/db-pool").status_code == 403
+
+    user = db_session.query(User).filter(User.email == "pool-admin@example.com").one()
+    user.role = "admin"
+    db_session.commit()
+    user_cache.clear()
+    metrics = client.get("/api/metrics/db-pool").json()
+    assert {"pid", "sync", "async"} <= metrics.keys()
+    assert metrics["sync"]["pool_class"]
@@ -0,0 +1,403 @@
+# tests/test_measurements.py
+from datetime import date
+
+import pytest
+
+from app.core.conf import settings
+from app.db.models import Plant, PlantFruit, PlantMeasurement, User
+
+
+@pytest.fixture()
+def breeder_plant(client, db_session, login):
+    """Logged-in user with one plant and two measurements."""
+    login("measure@example.com", "measure-breeder")
+    user = db_session.query(User).filter(User.email == "measure@example.com").one()
+    plant = (
+        db_session.query(Plant)
+        .filter(Plant.breeder_id == user.breeder_id, Plant.plant_code == "MS01")
+        .first()
+    )
+    if not plant:
+        plant = Plant(plant_code="MS01", breeder_id=user.breeder_id)
+        db_session.add(plant)
+        db_session.flush()
+        db_session.add_all(
+            [
+                PlantMeasurement(
+                    plant_id=plant.id,
+                    date=date(2025, 5, 6),
+                    variety="Falco",
+                    field="A",
+                    ripe=1,
+                ),
+                PlantMeasurement(
+                    plant_id=plant.id,
+                    date=date(2025, 5, 8),
+                    variety="Falco",
+                    field="A",
+                    ripe=2,
+                ),
+            ]
+        )
+        db_session.commit()
+    return plant
+
+
+def test_list_measurements_async(client, breeder_plant):
+    response = client.get("/api/measurements", params={"plant_code": "MS01"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert [m["cumulative_ripe"] for m in body["items"]] == [1, 3]
+    assert body["items"][0]["plant"]["plant_code"] == "MS01"
+
+
+def test_summary_and_unique_dates_async(client, breeder_plant):
+    summary = client.get("/api/summary").json()
+    assert summary["total_plants"] == 1
+    assert summary["samples_per_variety"] == {"Falco": 2}
+    assert summary["last_measured_date"] == "2025-05-08"
+
+    dates = client.get("/api/plant/MS01/unique-measurement-dates").json()
+    assert dates == ["2025-05-06", "2025-05-08"]
+
+
+def test_batch_create_reports_per_item_status(client, breeder_plant, db_session):
+    items = [
+        {
+            "plant_id": breeder_plant.id,
+            "date": "2025-06-01",
+            "field": "A",
+            "fruits": [{"width": 1.0, "height": 2.0, "mass": 3.0}] * 2,
+        },
+        {"plant_id": breeder_plant.id, "date": "2025-06-02", "field": "A"},
+        # already exists (fixture)
+        {"plant_id": breeder_plant.id, "date": "2025-05-06", "field": "A"},
+        # same key as item 0
+        {"plant_id": breeder_plant.id, "date": "2025-06-01", "field": "B"},
+        {
+            "plant_id": breeder_plant.id,
+            "date": "2025-06-03",
+            "field": "A",
+            "flower": -1,
+        },
+        {"plant_id": 999999, "date": "2025-06-01", "field": "A"},
+    ]
+    response = client.post("/api/measurements/batch", json=items)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (2, 0, 4)
+    statuses = [item["status"] for item in body["items"]]
+    assert statuses == ["created", "created", "error", "error", "error", "error"]
+    assert "already exists" in body["items"][2]["detail"]
+    assert "Duplicate of item 0" in body["items"][3]["detail"]
+
+    created = db_session.get(PlantMeasurement, body["items"][0]["id"])
+    assert created.ripe == 2
+    assert len(created.fruits) == 2
+
+
+def test_batch_upsert_replaces_existing_measurement(client, breeder_plant, db_session):
+    item = {
+        "plant_id": breeder_plant.id,
+        "date": "2025-07-01",
+        "field": "A",
+        "fruits": [{"width": 1.0, "height": 1.0, "mass": 1.0}] * 3,
+    }
+    first = client.post("/api/measurements/batch", json=[item]).json()
+    assert first["items"][0]["status"] == "created"
+
+    item.update(field="B", fruits=[{"width": 2.0, "height": 2.0, "mass": 2.0}])
+    second = client.post(
+        "/api/measurements/batch", params={"upsert": True}, json=[item]
+    ).json()
+
+    assert second["items"][0] == {
+        "index": 0,
+        "status": "updated",
+        "id": first["items"][0]["id"],
+        "detail": None,
+    }
+    updated = db_session.get(PlantMeasurement, first["items"][0]["id"])
+    assert (updated.field, updated.ripe) == ("B", 1)
+    assert [f.mass for f in updated.fruits] == [2.0]
+
+
+def test_create_relies_on_constraints(client, breeder_plant):
+    item = {
+        "plant_id": breeder_plant.id,
+        "date": "2025-08-01",
+        "field": "A",
+        "fruits": [{"width": 1.0, "height": 2.0, "mass": 3.0}],
+    }
+    response = client.post("/api/measurements", json=item)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["plant"] == {"id": breeder_plant.id, "plant_code": "MS01"}
+    assert body["ripe"] == 1
+    assert body["fruits"][0]["id"] and body["fruits"][0]["mass"] == 3.0
+
+    duplicate = client.post("/api/measurements", json=item)
+    assert duplicate.status_code == 400
+    assert "already exists" in duplicate.json()["detail"]
+
+    unknown = client.post("/api/measurements", json={**item, "plant_id": 999999})
+    assert unknown.status_code == 404
+
+
+def test_put_by_key_upserts(client, breeder_plant, db_session):
+    item = {"plant_id": breeder_plant.id, "date": "2025-08-02", "field": "A"}
+    created = client.put("/api/measurements/by-key", json=item)
+    assert created.status_code == 200
+
+    item["fruits"] = [{"width": 4.0, "height": 4.0, "mass": 4.0}] * 2
+    replaced = client.put("/api/measurements/by-key", json={**item, "field": "C"})
+    assert replaced.status_code == 200
+    assert replaced.json()["id"] == created.json()["id"]
+
+    measurement = db_session.get(PlantMeasurement, created.json()["id"])
+    assert (measurement.field, measurement.ripe, len(measurement.fruits)) == (
+        "C",
+        2,
+        2,
+    )
+
+    unknown = client.put("/api/measurements/by-key", json={**item, "plant_id": 999999})
+    assert unknown.status_code == 404
+
+
+def test_bulk_delete_measurements_by_filters(client, breeder_plant, db_session):
+    fruit = {"width": 1.0, "height": 1.0, "mass": 1.0}
+    items = [
+        {"plant_id": breeder_plant.id, "date": f"2024-09-0{day}", "field": field}
+        | {"fruits": [fruit]}
+        for day, field in [(1, "X"), (2, "X"), (3, "Y")]
+    ]
+    created = client.post("/api/measurements/batch", json=items).json()
+    ids = [item["id"] for item in created["items"]]
+
+    assert client.delete("/api/measurements").status_code == 400
+
+    response = client.delete(
+        "/api/measurements",
+        params={"start_date": "2024-09-01", "end_date": "2024-09-30", "field": "X"},
+    )
+    assert response.json() == {"deleted": 2}
+
+    db_session.expire_all()
+    remaining = db_session.query(PlantMeasurement.id).filter(
+        PlantMeasurement.id.in_(ids)
+    )
+    assert [m.id for m in remaining] == [ids[2]]
+    # fruits went with their measurements (ON DELETE CASCADE)
+    assert (
+        db_session.query(PlantFruit)
+        .filter(PlantFruit.measurement_id.in_(ids[:2]))
+        .count()
+        == 0
+    )
+
+
+def test_delete_plant_cascades_in_the_database(client, login, db_session):
+    login("cascade@example.com", "cascade-breeder")
+    plant = client.post("/api/plants", json={"plant_code": "CASCADE"}).json()
+    client.post(
+        "/api/measurements/batch",
+        json=[
+            {
+                "plant_id": plant["id"],
+                "date": "2024-10-01",
+                "field": "A",
+                "fruits": [{"width": 1.0, "height": 1.0, "mass": 1.0}],
+            }
+        ],
+    )
+
+    assert client.delete(f"/api/plants/{plant['id']}").status_code == 200
+
+    assert (
+        db_session.query(PlantMeasurement)
+        .filter(PlantMeasurement.plant_id == plant["id"])
+        .count()
+        == 0
+    )
+    assert db_session.query(PlantFruit).count() == (
+        db_session.query(PlantFruit).join(PlantMeasurement).count()
+    )
+
+
+def test_packed_fruit_storage_keeps_api_shape(
+    client, breeder_plant, db_session, monkeypatch
+):
+    monkeypatch.setattr(settings, "FRUIT_STORAGE_MODE", "packed")
+    fruits = [
+        {"width": 21.5, "height": 30.1, "mass": 12.7},
+        {"width": 18.0, "height": None, "mass": 9.25},
+    ]
+    created = client.post(
+        "/api/measurements",
+        json={
+            "plant_id": breeder_plant.id,
+            "date": "2024-11-01",
+            "field": "A",
+            "fruits": fruits,
+        },
+    ).json()
+    expected = [{"id": i, **fruit} for i, fruit in enumerate(fruits, start=1)]
+    assert created["fruits"] == expected
+    assert created["ripe"] == 2
+
+    measurement = db_session.get(PlantMeasurement, created["id"])
+    assert len(measurement.fruits_packed) == 2 * 12
+    assert measurement.fruits == []  # no plant_fruits rows
+
+    fetched = client.get(f"/api/measurements/{created['id']}").json()
+    assert fetched["fruits"] == expected
+    listed = client.get(
+        "/api/measurements", params={"plant_code": "MS01", "start_date": "2024-11-01"}
+    ).json()
+    assert listed["items"][0]["fruits"] == expected
+
+    updated = client.put(
+        f"/api/measurements/{created['id']}", json={**created, "fruits": fruits[:1]}
+    ).json()
+    assert updated["fruits"] == expected[:1]
+    assert updated["ripe"] == 1
+
+
+def test_packed_update_drops_table_fruits(
+    client, breeder_plant, db_session, monkeypatch
+):
+    created = client.post(
+        "/api/measurements",
+        json={
+            "plant_id": breeder_plant.id,
+            "date": "2024-11-02",
+            "field": "A",
+            "fruits": [{"width": 21.0}, {"width": 22.0}],
+        },
+    ).json()
+
+    monkeypatch.setattr(settings, "FRUIT_STORAGE_MODE", "packed")
+    updated = client.put(
+        f"/api/measurements/{created['id']}",
+        json={"date": "2024-11-02", "field": "A", "fruits": [{"width": 30.0}]},
+    ).json()
+    assert [f["width"] for f in updated["fruits"]] == [30.0]
+
+    db_session.expire_all()
+    assert (
+        not db_session.query(PlantFruit).filter_by(measurement_id=created["id"]).count()
+    )
+
+
+def test_fruit_stats_are_stored_and_queryable(client, breeder_plant):
+    def create(day, fruits):
+        return client.post(
+            "/api/measurements",
+            json={
+                "plant_id": breeder_plant.id,
+                "date": day,
+                "field": "A",
+                "variety": "Stats",
+                "fruits": fruits,
+            },
+        ).json()
+
+    light = create(
+        "2024-10-01",
+        [
+            {"width": 20.0, "height": 30.0, "mass": 10.0},
+            {"width": 30.0, "height": None, "mass": 14.0},
+            {"width": 40.0, "height": 34.0, "mass": None},
+        ],
+    )
+    assert light["fruit_width_mean"] == 30.0
+    assert light["fruit_height_median"] == 32.0
+    assert light["fruit_mass_total"] == 24.0
+    assert light["fruit_mass_mean"] == 12.0
+    assert [light[f"fruit_count_{c}"] for c in ("small", "medium", "large")] == [
+        1,
+        1,
+        1,
+    ]
+    heavy = create("2024-10-02", [{"width": 36.0, "height": 40.0, "mass": 30.0}])
+    create("2024-10-03", [])
+
+    params = {"start_date": "2024-10-01", "end_date": "2024-10-03"}
+    listed = client.get(
+        "/api/measurements",
+        params={**params, "sort_by": "fruit_mass_mean", "descending": True},
+    ).json()
+    assert [m["fruit_mass_mean"] for m in listed["items"]] == [30.0, 12.0, None]
+    filtered = client.get(
+        "/api/measurements", params={**params, "min_fruit_mass_mean": 20}
+    ).json()
+    assert [m["id"] for m in filtered["items"]] == [heavy["id"]]
+    assert (
+        client.get("/api/measurements", params={"sort_by": "plant_id"}).status_code
+        == 400
+    )
+
+    updated = client.put(
+        f"/api/measurements/{heavy['id']}",
+        json={**heavy, "fruits": [{"width": 10.0, "mass": 2.0}]},
+    ).json()
+    assert updated["fruit_mass_mean"] == 2.0
+    assert updated["fruit_count_small"] == 1
+    assert updated["fruit_count_large"] == 0
+
+    summary = client.get("/api/summary").json()
+    assert summary["fruits_per_variety"]["Stats"] == {
+        "fruit_count": 4,
+        "fruit_mass_total": 26.0,
+        "size_classes": {"small": 2, "medium": 1, "large": 1},
+    }
+
+
+def test_fruits_follow_their_measurement_date(client, breeder_plant, db_session):
+    created = client.post(
+        "/api/measurements",
+        json={
+            "plant_id": breeder_plant.id,
+            "date": "2024-09-01",
+            "field": "A",
+            "fruits": [{"width": 21.0}, {"width": 22.0}],
+        },
+    ).json()
+
+    moved = client.put(
+        f"/api/measurements/{created['id']}", json={"date": "2024-09-02", "field": "A"}
+    )
+    assert moved.status_code == 200
+    assert len(moved.json()["fruits"]) == 2
+
+    db_session.expire_all()
+    fruits = db_session.query(PlantFruit).filter_by(measurement_id=created["id"]).all()
+    assert {fruit.measurement_date for fruit in fruits} == {date(2024, 9, 2)}
+
+
+def test_put_replaces_fruits_and_date_together(client, breeder_plant, db_session):
+    created = client.post(
+        "/api/measurements",
+        json={
+            "plant_id": breeder_plant.id,
+            "date": "2024-09-01",
+            "field": "A",
+            "fruits": [{"width": 21.0}, {"width": 22.0}],
+        },
+    ).json()
+
+    moved = client.put(
+        f"/api/measurements/{created['id']}",
+        json={"date": "2024-09-05", "field": "A", "fruits": [{"width": 30.0}]},
+    )
+    assert moved.status_code == 200
+    assert [f["width"] for f in moved.json()["fruits"]] == [30.0]
+    assert moved.json()["ripe"] == 1
+
+    db_session.expire_all()
+    fruits = db_session.query(PlantFruit).filter_by(measurement_id=created["id"]).all()
+    assert [(f.measurement_date, f.width) for f in fruits] == [(date(2024, 9, 5), 30.0)]
@@ -0,0 +1,95 @@
+# tests/test_partitions.py
+from contextlib import contextmanager
+from datetime import date
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+
+from app.db.partitions import (
+    create_month_partitions,
+    ensure_partitions,
+    next_month,
+    partition_name,
+)
+
+
+def test_monthly_partition_names_and_bounds():
+    assert next_month(date(2025, 1, 1)) == date(2025, 2, 1)
+    assert next_month(date(2025, 12, 1)) == date(2026, 1, 1)
+    assert partition_name("plant_fruits", date(2025, 3, 1)) == "plant_fruits_p2025_03"
+
+
+def test_ensure_partitions_is_a_no_op_outside_postgresql():
+    assert ensure_partitions(create_engine("sqlite://")) == []
+
+
+class FakeConnection:
+    """Records statements; the month in `stranded` has rows in DEFAULT."""
+
+    def __init__(self, stranded=None, failing=None):
+        self.stranded, self.failing = stranded, failing
+        self.statements = []
+
+    def scalar(self, statement, params=None):
+        sql = str(statement)
+        if "relkind" in sql:
+            return True
+        if "to_regclass" in sql:
+            return None
+        if self.failing and f">= '{self.failing}'" in sql:
+            raise DBAPIError(sql, params, Exception("partition would overlap"))
+        # rows are stranded in plant_measurements_default only
+        return (
+            self.stranded is not None
+            and "plant_measurements_default" in sql
+            and f">= '{self.stranded}'" in sql
+        )
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement).split(" WHERE ")[0])
+
+
+class FakeEngine:
+    def __init__(self, conn):
+        self.dialect = SimpleNamespace(name="postgresql")
+        self.conn = conn
+
+    @contextmanager
+    def begin(self):
+        yield self.conn
+
+
+def test_rows_in_default_are_moved_into_the_new_partition():
+    conn = FakeConnection(stranded=date(2025, 3, 1))
+    created = create_month_partitions(conn, date(2025, 3, 1))
+    assert created == ["plant_measurements_p2025_03", "plant_fruits_p2025_03"]
+    assert conn.statements == [
+        # the cascade from measurements would delete their fruits
+        "CREATE TEMPORARY TABLE plant_fruits_2025_03_moving ON COMMIT DROP AS"
+        " SELECT * FROM plant_fruits",
+        "DELETE FROM plant_fruits",
+        "CREATE TABLE plant_measurements_p2025_03"
+        " (LIKE plant_measurements INCLUDING DEFAULTS)",
+        "INSERT INTO plant_measurements_p2025_03"
+        " SELECT * FROM plant_measurements_default",
+        "DELETE FROM plant_measurements_default",
+        "ALTER TABLE plant_measurements ATTACH PARTITION plant_measurements_p2025_03"
+        " FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')",
+        "CREATE TABLE plant_fruits_p2025_03 PARTITION OF plant_fruits"
+        " FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')",
+        "INSERT INTO plant_fruits SELECT * FROM plant_fruits_2025_03_moving",
+    ]
+
+
+def test_a_failing_month_does_not_hold_back_the_others():
+    conn = FakeConnection(failing=date(2025, 2, 1))
+    created = ensure_partitions(
+        FakeEngine(conn), months_ahead=2, today=date(2025, 1, 15)
+    )
+    assert created == [
+        "plant_measurements_p2025_01",
+        "plant_fruits_p2025_01",
+        "plant_measurements_p2025_03",
+        "plant_fruits_p2025_03",
+    ]
@@ -0,0 +1,74 @@
+# tests/test_plants.py
+from datetime import date
+
+import app.crud as crud
+from app.db.models import (
+    Breeder,
+    FileStatusEnum,
+    FileTypeEnum,
+    Plant,
+    PlantFile,
+    PlantMeasurement,
+)
+
+
+def test_get_all_plants_with_stats(db_session):
+    breeder = Breeder(name="stats-breeder")
+    db_session.add(breeder)
+    db_session.flush()
+    measured = Plant(plant_code="ST01", breeder_id=breeder.id)
+    empty = Plant(plant_code="ST02", breeder_id=breeder.id)
+    db_session.add_all([measured, empty])
+    db_session.flush()
+    db_session.add_all(
+        [
+            PlantMeasurement(
+                plant_id=measured.id, date=date(2025, 5, 6), field="A", exg=30.0
+            ),
+            PlantMeasurement(
+                plant_id=measured.id, date=date(2025, 5, 8), field="A", exg=35.5
+            ),
+            PlantFile(
+                plant_id=measured.id,
+                date=date(2025, 5, 6),
+                file_path="a.png",
+                file_type=FileTypeEnum.TWO_D,
+                status=FileStatusEnum.COMPLETED,
+            ),
+            PlantFile(
+                plant_id=measured.id,
+                date=date(2025, 5, 6),
+                file_path="a.ply",
+                file_type=FileTypeEnum.THREE_D,
+                status=FileStatusEnum.COMPLETED,
+            ),
+            # upload attempts that never completed
+            PlantFile(
+                plant_id=measured.id,
+                date=date(2025, 5, 8),
+                file_type=FileTypeEnum.TWO_D,
+                status=FileStatusEnum.PENDING,
+            ),
+            PlantFile(
+                plant_id=measured.id,
+                date=date(2025, 5, 8),
+                file_path="b.ply",
+                file_type=FileTypeEnum.THREE_D,
+                status=FileStatusEnum.FAILED,
+            ),
+        ]
+    )
+    db_session.commit()
+
+    total, items = crud.get_all_plants_with_stats(db_session, breeder.id)
+
+    assert total == 2
+    assert [i["plant_code"] for i in items] == ["ST01", "ST02"]
+    stats = items[0]["stats"]
+    assert stats["measurement_count"] == 2
+    assert stats["latest_measurement_date"] == date(2025, 5, 8)
+    assert stats["two_d_image_count"] == 1
+    assert stats["three_d_image_count"] == 1
+    assert stats["latest_traits"]["exg"] == 35.5
+    assert items[1]["stats"]["measurement_count"] == 0
+    assert items[1]["stats"]["latest_traits"] == {}
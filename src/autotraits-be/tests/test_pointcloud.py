@@ -0,0 +1,66 @@
+# tests/test_pointcloud.py
+import numpy as np
+import pytest
+
+from app.core.pointcloud import decode_lod, encode_lod, lod_levels, read_ply
+
+HEADER = (
+    "ply\nformat {format} 1.0\ncomment scan\nelement vertex {count}\n"
+    "property float x\nproperty float y\nproperty float z\n"
+    "property uchar red\nproperty uchar green\nproperty uchar blue\n"
+    "element face 0\nproperty list uchar int vertex_indices\nend_header\n"
+)
+
+
+@pytest.fixture()
+def cloud():
+    # points on a sphere of radius 0.3, like a scanned surface
+    rng = np.random.default_rng(0)
+    xyz = rng.normal(size=(20000, 3))
+    xyz = (0.3 * xyz / np.linalg.norm(xyz, axis=1)[:, None]).astype(np.float32)
+    rgb = rng.integers(0, 256, size=(20000, 3), dtype=np.uint8)
+    return xyz, rgb
+
+
+def write_ply(path, xyz, rgb, format):
+    with open(path, "wb") as f:
+        f.write(HEADER.format(format=format, count=len(xyz)).encode())
+        if format == "ascii":
+            for point, color in zip(xyz, rgb):
+                f.write(("%r %r %r %d %d %d\n" % (*point.tolist(), *color)).encode())
+            return
+        order = "<" if format == "binary_little_endian" else ">"
+        vertex = np.empty(
+            len(xyz),
+            [(n, order + "f4") for n in "xyz"] + [(n, "u1") for n in ("r", "g", "b")],
+        )
+        vertex["x"], vertex["y"], vertex["z"] = xyz.T
+        vertex["r"], vertex["g"], vertex["b"] = rgb.T
+        f.write(vertex.tobytes())
+
+
+@pytest.mark.parametrize(
+    "format", ["ascii", "binary_little_endian", "binary_big_endian"]
+)
+def test_read_ply(tmp_path, cloud, format):
+    path = str(tmp_path / "cloud.ply")
+    write_ply(path, *cloud, format)
+    xyz, rgb = read_ply(path)
+    np.testing.assert_allclose(xyz, cloud[0], atol=1e-6)
+    np.testing.assert_array_equal(rgb, cloud[1])
+
+
+def test_lod_levels_and_format(cloud):
+    levels = lod_levels(*cloud, fractions=(0.01, 0.1, 1.0))
+    counts = [len(xyz) for xyz, _ in levels]
+    assert counts[2] == 20000
+    for count, target in zip(counts, (200, 2000)):
+        assert 0.8 * target <= count <= 1.2 * target
+
+    xyz, rgb = levels[0]
+    data = encode_lod(xyz, rgb)
+    assert len(data) == 36 + counts[0] * 9
+    decoded_xyz, decoded_rgb = decode_lod(data)
+    # 16-bit quantization of a 0.6 m box
+    np.testing.assert_allclose(decoded_xyz, xyz, atol=0.6 / 65535)
+    np.testing.assert_array_equal(decoded_rgb, rgb)
@@ -0,0 +1,59 @@
+# tests/test_query_stats.py
+import json
+import logging
+
+from sqlalchemy import create_engine, text
+
+from app.db import query_stats
+from app.db.query_stats import statement_shape
+
+
+def test_statement_shape_ignores_literals_and_in_list_length():
+    assert statement_shape("SELECT * FROM plants WHERE id = 1") == statement_shape(
+        "SELECT *\n  FROM plants WHERE id = 42"
+    )
+    assert statement_shape(
+        "SELECT * FROM plants WHERE plant_code = 'A' AND id IN (?, ?, ?)"
+    ) == ("SELECT * FROM plants WHERE plant_code = ? AND id IN (?)")
+
+
+def test_repeated_statement_shapes_are_flagged():
+    query_stats.install()
+    engine = create_engine("sqlite://")
+    stats, token = query_stats.start(slowest=2)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT count(*) FROM sqlite_master"))
+            for plant_id in range(5):
+                conn.execute(text("SELECT :id"), {"id": plant_id})
+    finally:
+        query_stats.stop(token)
+
+    assert stats.count == 6
+    assert len(stats.slowest()) == 2
+    assert stats.repeated(3) == [{"count": 5, "statement": "SELECT ?"}]
+    assert stats.repeated(0) == []
+
+
+def test_server_timing_header_and_log_line(client, login):
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("app.sql")
+    logger.addHandler(handler)
+    try:
+        login("timing@example.com", "timing-breeder")
+        response = client.get("/api/measurements")
+    finally:
+        logger.removeHandler(handler)
+
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert timing.startswith('db;desc="')
+    assert "app;dur=" in timing
+
+    line = json.loads(records[-1].getMessage())
+    assert line["path"] == "/api/measurements"
+    assert line["status"] == 200
+    assert f'"{line["queries"]} queries"' in timing
+    assert line["queries"] >= 2
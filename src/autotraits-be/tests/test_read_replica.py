@@ -0,0 +1,152 @@
+# tests/test_read_replica.py
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import app.db.session as db_session_module
+from app import crud
+from app.core.coalesce import DataVersions
+from app.db.base import Base
+from app.db.models import Breeder, Plant, PlantMeasurement
+from app.db.session import ReplicaMonitor, RoutingSession
+from app.middleware import ReadYourWritesMiddleware
+from app.schemas import PlantCreate
+
+
+@pytest.fixture(autouse=True)
+def versions(monkeypatch):
+    """Fresh write timestamps, so other tests' writes do not make reads sticky."""
+    versions = DataVersions()
+    monkeypatch.setattr(db_session_module, "data_versions", versions)
+    return versions
+
+
+@pytest.fixture()
+def databases(tmp_path):
+    """Two SQLite files, each holding one plant the other does not have."""
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(Breeder(id=1, name="replica-breeder"))
+            db.add(Plant(id=1, breeder_id=1, plant_code=name.upper()))
+            db.add(PlantMeasurement(plant_id=1, date=date(2025, 5, 6)))
+            db.commit()
+        engines[name] = engine
+    return engines
+
+
+def make_session(databases, healthy=True, **kwargs):
+    monitor = ReplicaMonitor(databases["replica"], max_lag=5, interval=3600)
+    if healthy:
+        monitor.check()
+    else:
+        monitor.mark_down("connection refused")
+    return RoutingSession(
+        bind=databases["primary"],
+        replica=databases["replica"],
+        monitor=monitor,
+        sticky_seconds=kwargs.get("sticky_seconds", 0),
+    )
+
+
+def plant_codes(db, breeder_id=1):
+    _, plants = crud.get_all_plants(db, breeder_id=breeder_id)
+    return [p.plant_code for p in plants]
+
+
+def test_reads_go_to_replica_and_writes_to_primary(databases):
+    with make_session(databases) as db:
+        assert plant_codes(db) == ["REPLICA"]
+        crud.create_plant(db, PlantCreate(plant_code="NEW"), breeder_id=1)
+        # plain session queries (outside @replica_read) stay on the primary
+        assert db.query(Plant).filter_by(plant_code="NEW").count() == 1
+
+    with sessionmaker(bind=databases["replica"])() as replica:
+        assert replica.query(Plant).filter_by(plant_code="NEW").count() == 0
+
+
+def test_reads_stick_to_primary_after_a_write(databases, versions):
+    with make_session(databases, sticky_seconds=60) as db:
+        assert plant_codes(db) == ["REPLICA"]
+        versions.bump(1)
+        assert plant_codes(db) == ["PRIMARY"]
+
+
+def test_reads_stick_to_primary_after_a_write_in_another_worker(databases, monkeypatch):
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=60)
+
+    @app.post("/plants")
+    def write():
+        with make_session(databases) as db:
+            crud.create_plant(db, PlantCreate(plant_code="NEW"), breeder_id=1)
+
+    @app.get("/plants")
+    def read():
+        with make_session(databases, sticky_seconds=60) as db:
+            return plant_codes(db)
+
+    writer = TestClient(app, base_url="https://testserver")
+    assert writer.post("/plants").status_code == 200
+    # the read is served by a worker that has not seen the write
+    monkeypatch.setattr(db_session_module, "data_versions", DataVersions())
+    assert writer.get("/plants").json() == ["PRIMARY", "NEW"]
+    other = TestClient(app, base_url="https://testserver")
+    assert other.get("/plants").json() == ["REPLICA"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(databases):
+    with make_session(databases, healthy=False) as db:
+        assert plant_codes(db) == ["PRIMARY"]
+
+
+def test_lagging_replica_falls_back_to_primary(databases, monkeypatch):
+    monkeypatch.setattr(db_session_module, "replica_lag", lambda engine: 30.0)
+    with make_session(databases) as db:
+        assert plant_codes(db) == ["PRIMARY"]
+        assert db.monitor.metrics()["lag_seconds"] == 30.0
+
+
+def test_replica_failure_retries_on_primary(databases, tmp_path, monkeypatch):
+    databases["replica"] = create_engine(
+        f"sqlite:///file:{tmp_path}/missing/replica.db?mode=ro&uri=true"
+    )
+    # report healthy without connecting, so the failure happens mid-request
+    monkeypatch.setattr(db_session_module, "replica_lag", lambda engine: 0.0)
+    with make_session(databases) as db:
+        assert plant_codes(db) == ["PRIMARY"]
+        assert db.monitor.metrics()["healthy"] is False
+
+
+def test_async_session_routes_reads_to_replica(databases, tmp_path):
+    engines = {
+        name: create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / name}.db", poolclass=NullPool
+        )
+        for name in ("primary", "replica")
+    }
+    monitor = ReplicaMonitor(databases["replica"], max_lag=5, interval=3600)
+    monitor.check()
+    AsyncRoutingSession = async_sessionmaker(
+        engines["primary"],
+        sync_session_class=RoutingSession,
+        replica=engines["replica"].sync_engine,
+        monitor=monitor,
+    )
+
+    async def read():
+        async with AsyncRoutingSession() as db:
+            return await crud.get_unique_measurement_dates_async(
+                db, "REPLICA", breeder_id=1
+            )
+
+    assert asyncio.run(read()) == [date(2025, 5, 6)]
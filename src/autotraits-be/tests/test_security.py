@@ -0,0 +1,44 @@
+# tests/test_security.py
+from datetime import timedelta
+
+from app.core import security
+from app.core.security import create_access_token, decode_token, token_cache
+
+
+def test_decode_token_is_cached_until_exp(monkeypatch):
+    token_cache.clear()
+    token = create_access_token({"user_id": 1}, timedelta(minutes=5))
+    calls = []
+    real_decode = security.jwt.decode
+    monkeypatch.setattr(
+        security.jwt,
+        "decode",
+        lambda *a, **kw: calls.append(1) or real_decode(*a, **kw),
+    )
+
+    first = decode_token(token)
+    assert decode_token(token) is first
+    assert len(calls) == 1
+
+    # Once the cache clock passes `exp` the entry must not be served again
+    claims = real_decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    exp = claims["exp"]
+    monkeypatch.setattr(token_cache, "clock", lambda: exp + 1)
+    decode_token(token)
+    assert len(calls) == 2
+
+
+def test_expired_token_is_rejected_and_not_cached():
+    token_cache.clear()
+    token = create_access_token({"user_id": 1}, timedelta(seconds=-10))
+
+    assert decode_token(token) is None
+    assert len(token_cache) == 0
+
+
+def test_tampered_token_is_rejected():
+    token_cache.clear()
+    token = create_access_token({"user_id": 1})
+    decode_token(token)
+
+    assert decode_token(token[:-2] + "xx") is None
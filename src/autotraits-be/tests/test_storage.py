@@ -0,0 +1,512 @@
+# tests/test_storage.py
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.routes import plant_images
+from app.core.conf import settings
+from app.core.periodic import JOBS_LOCK_KEY, LeaderLock, run_periodically
+from app.core.pointcloud import decode_lod
+from app.core.reconcile import FileReconciler
+from app.core.storage import BlobNotFoundError, get_storage
+from app.core.storage.upload import (
+    UploadTooLargeError,
+    expire_upload_sessions,
+    hash_upload,
+    release_blobs,
+    store_content_addressed,
+    upload_stream,
+)
+from app.core.variants import generate_variants, variant_path, variant_pool
+from app.db.models import FileStatusEnum, FileTypeEnum, FileVariantEnum, PlantFile
+
+
+@pytest.fixture()
+def local_storage(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "local")
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_ROOT", str(tmp_path))
+    monkeypatch.setattr(settings, "LOCAL_STORAGE_BASE_URL", "https://testserver")
+    return get_storage()
+
+
+@pytest.fixture()
+def plant_id(client, login):
+    login("storage@example.com", "storage-breeder")
+    response = client.post("/api/plants", json={"plant_code": "FS01"})
+    if response.status_code != 200:  # created by an earlier test
+        plants = client.get("/api/plants", params={"limit": 100}).json()["items"]
+        return next(p["id"] for p in plants if p["plant_code"] == "FS01")
+    return response.json()["id"]
+
+
+def test_local_storage_blob_lifecycle(local_storage):
+    info = local_storage.put("a/b.png", b"png-bytes")
+    assert (info.name, info.size) == ("a/b.png", 9)
+    local_storage.put("c.ply", iter([b"ply", b"-bytes"]))
+
+    assert local_storage.get("a/b.png") == b"png-bytes"
+    assert b"".join(local_storage.stream("c.ply")) == b"ply-bytes"
+    assert [blob.name for blob in local_storage.list()] == ["a/b.png", "c.ply"]
+    assert [blob.name for blob in local_storage.list("a/")] == ["a/b.png"]
+
+    local_storage.delete("a/b.png")
+    local_storage.delete("a/b.png")
+    with pytest.raises(BlobNotFoundError):
+        local_storage.get("a/b.png")
+    with pytest.raises(ValueError):
+        local_storage.put("../outside.png", b"")
+
+
+def test_upload_and_presigned_urls_with_local_storage(client, local_storage, plant_id):
+    uploaded = client.post(
+        f"/api/plant/{plant_id}/upload-file-v2",
+        data={"date": "2025-05-06", "file_type": "TWO_D"},
+        files={"file": ("leaf.png", b"\x89PNG-data", "image/png")},
+    )
+    assert uploaded.status_code == 200
+    assert uploaded.json()["status"] == "COMPLETED"
+
+    images = client.get(
+        "/api/plant/FS01/images", params={"file_type": "TWO_D", "date": "2025-05-06"}
+    ).json()
+    url = images[0]["url"]
+    assert (
+        client.get("/api/plant/FS01/images", params={"file_type": "TWO_D"}).json()[0][
+            "url"
+        ]
+        == url
+    )
+    blob = client.get(url)
+    assert blob.content == b"\x89PNG-data"
+    assert "immutable" in blob.headers["cache-control"]
+    assert client.get(url.replace("sig=", "sig=x")).status_code == 403
+
+    # presigned write: the client PUTs the content itself
+    registered = client.post(
+        f"/api/plant/{plant_id}/upload-file",
+        params={"date": "2025-05-07", "file_type": "THREE_D", "extension": "ply"},
+    ).json()
+    put = client.put(registered["upload_url"], content=b"ply-data")
+    assert put.status_code == 201
+    assert local_storage.get(registered["blob_path"]) == b"ply-data"
+    # a write URL does not grant reads
+    assert client.get(registered["upload_url"]).status_code == 403
+    # a name outside the storage root is refused, even when signed
+    url = local_storage._url("PUT", "ply/..", int(time.time()) + 60)
+    put = client.put(url.replace("ply/..", "ply/%2E%2E"), content=b"ply-data")
+    assert put.status_code == 400
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_upload_stream_stages_blocks(monkeypatch, local_storage):
+    monkeypatch.setattr(settings, "UPLOAD_BLOCK_SIZE", 1000)
+    data = bytes(range(256)) * 30
+
+    info = asyncio.run(upload_stream(local_storage, "big.ply", _chunks(data, 700)))
+    assert (info.name, info.size) == ("big.ply", len(data))
+    assert local_storage.get("big.ply") == data
+    assert not os.listdir(os.path.join(local_storage.root, ".blocks"))
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(
+            upload_stream(local_storage, "huge.ply", _chunks(data, 700), max_bytes=5000)
+        )
+    assert [blob.name for blob in local_storage.list()] == ["big.ply"]
+    assert not os.listdir(os.path.join(local_storage.root, ".blocks"))
+
+
+def test_oversized_upload_is_rejected_before_parsing(client, plant_id):
+    response = client.post(
+        f"/api/plant/{plant_id}/upload-file-v2",
+        content=b"x" * 100,
+        headers={
+            "content-type": "multipart/form-data; boundary=x",
+            "content-length": str(plant_images.MAX_UPLOAD_BODY_SIZE + 1),
+        },
+    )
+    assert response.status_code == 413
+
+    response = client.post(
+        f"/api/plant/{plant_id}/upload-file-v2",
+        content=b"x" * 100,
+        headers={
+            "content-type": "multipart/form-data; boundary=x",
+            "content-length": "100 bytes",
+        },
+    )
+    assert response.status_code == 400
+
+
+def test_resumable_upload(client, local_storage, plant_id):
+    data = os.urandom(2500)
+    created = client.post(
+        f"/api/plant/{plant_id}/uploads",
+        json={
+            "date": "2025-05-06",
+            "file_type": "THREE_D",
+            "extension": "ply",
+            "size": len(data),
+            "chunk_size": 1000,
+        },
+    ).json()
+    upload_id = created["upload_id"]
+    assert (created["chunk_count"], created["status"]) == (3, "PENDING")
+
+    def put(index, body):
+        return client.put(f"/api/uploads/{upload_id}/chunks/{index}", content=body)
+
+    assert put(2, data[2000:]).status_code == 200
+    assert put(0, data[:1000]).status_code == 200
+    assert put(1, data[1000:1999]).status_code == 400  # short chunk
+    assert put(3, b"x").status_code == 400
+    assert client.get(f"/api/uploads/{upload_id}").json()["received"] == [0, 2]
+
+    commit = client.post(f"/api/uploads/{upload_id}/commit")
+    assert commit.status_code == 409
+    assert commit.json()["detail"]["missing"] == [1]
+
+    assert put(1, data[1000:2000]).status_code == 200
+    commit = client.post(f"/api/uploads/{upload_id}/commit")
+    assert commit.json()["status"] == "COMPLETED"
+    assert local_storage.get(created["blob_path"]) == data
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+
+def test_stale_upload_sessions_expire(client, db_session, local_storage, plant_id):
+    created = client.post(
+        f"/api/plant/{plant_id}/uploads",
+        json={
+            "date": "2025-05-07",
+            "file_type": "THREE_D",
+            "extension": "ply",
+            "size": 10,
+        },
+    ).json()
+    client.put(f"/api/uploads/{created['upload_id']}/chunks/0", content=b"x" * 10)
+
+    assert expire_upload_sessions(db_session, local_storage) == 0
+    later = datetime.utcnow() + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS + 1)
+    assert expire_upload_sessions(db_session, local_storage, now=later) == 1
+
+    assert client.get(f"/api/uploads/{created['upload_id']}").status_code == 404
+    file_record = db_session.get(PlantFile, created["db_id"])
+    db_session.refresh(file_record)
+    assert file_record.status == FileStatusEnum.FAILED
+    assert not os.listdir(os.path.join(local_storage.root, ".blocks"))
+
+
+def test_image_variants(client, db_session, local_storage, plant_id):
+    png = BytesIO()
+    Image.new("RGB", (600, 400), "green").save(png, "PNG")
+    uploaded = client.post(
+        f"/api/plant/{plant_id}/upload-file-v2",
+        data={"date": "2025-05-08", "file_type": "TWO_D"},
+        files={"file": ("leaf.png", png.getvalue(), "image/png")},
+    ).json()
+
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    with variant_pool(1) as pool:
+        done, failed = generate_variants(session_factory, local_storage, pool)
+        assert uploaded["db_id"] not in failed
+        # files of earlier tests have no blob here and fail; nothing else is left
+        again = generate_variants(
+            session_factory, local_storage, pool, skip=set(failed)
+        )
+        assert again == (0, [])
+
+    params = {"file_type": "TWO_D", "date": "2025-05-08"}
+    (original,) = client.get("/api/plant/FS01/images", params=params).json()
+    assert original["variant"] == "original"
+    (thumb,) = client.get(
+        "/api/plant/FS01/images", params={**params, "variant": "thumb"}
+    ).json()
+    assert thumb["variant"] == "thumb"
+    assert ".thumb.webp" in thumb["url"]
+
+    image = Image.open(BytesIO(client.get(thumb["url"]).content))
+    assert (image.format, image.size) == ("WEBP", (256, 256))
+    preview = local_storage.get(
+        variant_path(uploaded["file_path"], FileVariantEnum.PREVIEW)
+    )
+    assert Image.open(BytesIO(preview)).size == (600, 400)
+
+
+def test_point_cloud_lods(client, db_session, local_storage, plant_id):
+    xyz = np.random.default_rng(0).random((5000, 3), dtype=np.float32)
+    header = (
+        "ply\nformat binary_little_endian 1.0\nelement vertex 5000\n"
+        "property float x\nproperty float y\nproperty float z\nend_header\n"
+    )
+    uploaded = client.post(
+        f"/api/plant/{plant_id}/upload-file-v2",
+        data={"date": "2025-05-09", "file_type": "THREE_D"},
+        files={"file": ("cloud.ply", header.encode() + xyz.tobytes(), "text/plain")},
+    ).json()
+
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    with variant_pool(1) as pool:
+        _, failed = generate_variants(session_factory, local_storage, pool)
+    assert uploaded["db_id"] not in failed
+
+    (cloud,) = client.get(
+        "/api/plant/FS01/images", params={"file_type": "THREE_D", "date": "2025-05-09"}
+    ).json()
+    assert [lod["level"] for lod in cloud["lods"]] == [0, 1, 2]
+    assert cloud["lods"][2]["point_count"] == 5000
+    coarse = client.get(cloud["lods"][0]["url"]).content
+    assert len(decode_lod(coarse)[0]) == cloud["lods"][0]["point_count"] < 100
+
+
+def test_multi_file_upload(client, local_storage, plant_id):
+    manifest = [
+        {"filename": "a.png", "date": "2025-05-10", "file_type": "TWO_D"},
+        {"filename": "b.png", "date": "2025-05-10", "file_type": "TWO_D"},
+        {"filename": "c.ply", "date": "2025-05-10", "file_type": "THREE_D"},
+    ]
+    files = [
+        ("files", ("c.ply", b"ply-c", "text/plain")),
+        ("files", ("a.png", b"png-a", "image/png")),
+        ("files", ("b.png", b"png-b", "image/png")),
+    ]
+    response = client.post(
+        f"/api/plant/{plant_id}/upload-files",
+        data={"manifest": json.dumps(manifest)},
+        files=files,
+    )
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["filename"] for r in results] == ["a.png", "b.png", "c.ply"]
+    assert {r["status"] for r in results} == {"COMPLETED"}
+    assert local_storage.get(results[2]["file_path"]) == b"ply-c"
+    images = client.get(
+        "/api/plant/FS01/images", params={"file_type": "TWO_D", "date": "2025-05-10"}
+    ).json()
+    assert sorted(i["id"] for i in images) == [results[0]["db_id"], results[1]["db_id"]]
+
+    # nothing is stored when any entry is invalid
+    manifest[2]["file_type"] = "TWO_D"
+    response = client.post(
+        f"/api/plant/{plant_id}/upload-files",
+        data={"manifest": json.dumps(manifest)},
+        files=files,
+    )
+    assert response.status_code == 400
+    assert [e["filename"] for e in response.json()["detail"]["errors"]] == ["c.ply"]
+    assert len(list(local_storage.list())) == 3
+
+
+def test_reconciler_settles_sas_uploads(
+    monkeypatch, client, db_session, local_storage, plant_id
+):
+    def register():
+        return client.post(
+            f"/api/plant/{plant_id}/upload-file",
+            params={"date": "2025-05-11", "file_type": "TWO_D", "extension": "png"},
+        ).json()
+
+    uploaded, abandoned, in_flight = register(), register(), register()
+    local_storage.put(uploaded["blob_path"], b"png-bytes")
+    db_session.query(PlantFile).filter(PlantFile.id == abandoned["db_id"]).update(
+        {"created_at": datetime.utcnow() - timedelta(days=2)}
+    )
+    db_session.commit()
+
+    listings = []
+    list_blobs = local_storage.list
+    monkeypatch.setattr(
+        local_storage,
+        "list",
+        lambda prefix="": listings.append(prefix) or list_blobs(prefix),
+    )
+    monkeypatch.setattr(settings, "FILE_RECONCILE_MAX_LISTINGS", 1)
+    reconciler = FileReconciler(local_storage)
+    for _ in range(50):  # one listing per run until through the table
+        listings.clear()
+        reconciler.run(db_session)
+        assert len(listings) <= 1
+        if reconciler.after_id == 0:
+            break
+
+    def status(record):
+        file_record = db_session.get(PlantFile, record["db_id"])
+        db_session.refresh(file_record)
+        return file_record.status, file_record.size, file_record.etag is not None
+
+    assert status(uploaded) == (FileStatusEnum.COMPLETED, 9, True)
+    assert status(abandoned) == (FileStatusEnum.FAILED, None, False)
+    assert status(in_flight) == (FileStatusEnum.PENDING, None, False)
+
+
+def test_periodic_jobs_run_in_the_leading_process_only(db_session):
+    class Lock:
+        def __init__(self, leading):
+            self.leading = leading
+
+        def acquire(self):
+            return self.leading
+
+    runs = []
+
+    async def workers():
+        tasks = [
+            asyncio.create_task(
+                run_periodically(
+                    lambda worker=worker: runs.append(worker),
+                    None,
+                    0.01,
+                    "runs",
+                    Lock(worker == "leader"),
+                )
+            )
+            for worker in ("leader", "other", "another")
+        ]
+        await asyncio.sleep(0.1)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(workers())
+    assert runs and set(runs) == {"leader"}
+    # outside PostgreSQL every process leads
+    assert LeaderLock(db_session.get_bind(), JOBS_LOCK_KEY).acquire()
+    # on PostgreSQL the lock is held outside the app's pool
+    pg = create_engine("postgresql+psycopg2://bench@localhost/autotraits")
+    assert isinstance(LeaderLock(pg, JOBS_LOCK_KEY).engine.pool, NullPool)
+
+
+def test_reconciler_expires_uploads_that_died_unnamed(
+    db_session, local_storage, plant_id
+):
+    # upload-file-v2 names the blob only once stored; its worker died before
+    dead, running = (
+        PlantFile(
+            plant_id=plant_id,
+            file_type=FileTypeEnum.TWO_D,
+            status=FileStatusEnum.PENDING,
+            created_at=created_at,
+        )
+        for created_at in (datetime.utcnow() - timedelta(days=2), datetime.utcnow())
+    )
+    db_session.add_all([dead, running])
+    db_session.commit()
+
+    reconciler = FileReconciler(local_storage)
+    while reconciler.run(db_session) or reconciler.after_id:
+        pass
+    db_session.refresh(dead)
+    db_session.refresh(running)
+    assert (dead.status, running.status) == (
+        FileStatusEnum.FAILED,
+        FileStatusEnum.PENDING,
+    )
+
+
+def test_identical_uploads_share_a_blob(
+    monkeypatch, client, db_session, local_storage, plant_id
+):
+    png = BytesIO()
+    Image.new("RGB", (300, 200), "red").save(png, "PNG")
+    digest = hashlib.sha256(png.getvalue()).hexdigest()
+    writes = []
+    put = type(local_storage).put
+    monkeypatch.setattr(
+        type(local_storage),
+        "put",
+        lambda self, name, data: writes.append(name) or put(self, name, data),
+    )
+
+    def upload(filename):
+        return client.post(
+            f"/api/plant/{plant_id}/upload-file-v2",
+            data={"date": "2025-05-12", "file_type": "TWO_D"},
+            files={"file": (filename, png.getvalue(), "image/png")},
+        ).json()
+
+    first, retry = upload("strawberries.png"), upload("strawberries-1.png")
+    assert first["file_path"] == retry["file_path"] == f"{digest}.png"
+    assert first["db_id"] != retry["db_id"]
+    assert writes == [f"{digest}.png"]
+
+    # large uploads are hashed, then staged in blocks the same way
+    monkeypatch.setattr(settings, "UPLOAD_BLOCK_SIZE", 1000)
+    data = bytes(range(256)) * 30
+
+    async def upload_large():
+        file = UploadFile(BytesIO(data))
+        with pytest.raises(UploadTooLargeError):
+            await hash_upload(file, "ply", 7000)
+        await file.seek(0)
+        name = await hash_upload(file, "ply")
+        return await store_content_addressed(local_storage, name, file)
+
+    info = asyncio.run(upload_large())
+    assert (info.name, info.size) == (f"{hashlib.sha256(data).hexdigest()}.ply", 7680)
+    assert local_storage.get(info.name) == data
+    monkeypatch.setattr(settings, "UPLOAD_BLOCK_SIZE", 4 * 1024 * 1024)
+
+    # variants are rendered once and shared
+    session_factory = sessionmaker(bind=db_session.get_bind())
+    with variant_pool(1) as pool:
+        _, failed = generate_variants(session_factory, local_storage, pool)
+    assert {first["db_id"], retry["db_id"]}.isdisjoint(failed)
+    shared = [
+        sorted(v.file_path for v in db_session.get(PlantFile, r["db_id"]).variants)
+        for r in (first, retry)
+    ]
+    assert (
+        shared[0]
+        == shared[1]
+        == sorted(
+            variant_path(first["file_path"], v)
+            for v in (FileVariantEnum.THUMB, FileVariantEnum.PREVIEW)
+        )
+    )
+
+    # the blob goes with the last file referencing it
+    assert client.delete(f"/api/files/{first['db_id']}").json() == {
+        "deleted": first["db_id"]
+    }
+    assert local_storage.get(retry["file_path"]) == png.getvalue()
+    client.delete(f"/api/files/{retry['db_id']}")
+    assert client.delete(f"/api/files/{retry['db_id']}").status_code == 404
+    assert {blob.name for blob in local_storage.list()} == {info.name}
+
+
+def test_blob_referenced_before_it_is_stored_survives_release(
+    db_session, local_storage, plant_id
+):
+    data = b"ply\n" * 100
+    name = f"{hashlib.sha256(data).hexdigest()}.ply"
+    local_storage.put(name, data)
+    db_session.add(
+        PlantFile(
+            plant_id=plant_id,
+            file_path=name,
+            file_type=FileTypeEnum.THREE_D,
+            status=FileStatusEnum.PENDING,
+        )
+    )
+    db_session.commit()
+
+    # a delete racing the upload sees its reference and keeps the blob
+    assert release_blobs(db_session, local_storage, {name: []}) == 0
+    info = asyncio.run(
+        store_content_addressed(local_storage, name, UploadFile(BytesIO(data)))
+    )
+    assert local_storage.get(info.name) == data